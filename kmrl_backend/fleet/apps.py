@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class FleetConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fleet'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,108 @@
+"""
+On-disk store for fitted model parameters too large for ``MLModel.model_state``.
+
+Each training session that produces artifacts (e.g. a random forest's trees,
+see ``BaseMLModel.save_artifacts``) writes them to its own version directory,
+``ML_ARTIFACT_DIR/<model_id>/<session_id>/``, recorded in
+``MLTrainingSession.artifact_path``; ``MLModel.artifact_path`` names the
+version the model serves. A version is removed with its session.
+
+NumPy arrays are stored as ``.npy`` files and loaded memory-mapped and
+read-only: every worker process serving a model maps the same files, so the
+page cache holds one copy however many gunicorn workers load it. Other
+objects (the scikit-learn estimator, only needed to keep training a forest)
+are stored with joblib and loaded on first access.
+"""
+
+import json
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+from django.conf import settings
+
+MANIFEST_NAME = 'manifest.json'
+FORMAT_ARRAY = 'npy'
+FORMAT_JOBLIB = 'joblib'
+
+
+def get_storage_dir() -> Path:
+    return Path(getattr(settings, 'ML_ARTIFACT_DIR', Path(settings.BASE_DIR) / 'model_artifacts'))
+
+
+def write_artifacts(training_session, artifacts: Dict[str, Any]) -> str:
+    """
+    Write a training session's artifacts as a new version.
+
+    Args:
+        training_session: Saved MLTrainingSession that produced the artifacts
+        artifacts: Artifacts keyed by name, as from ``BaseMLModel.save_artifacts``
+
+    Returns:
+        Version directory, relative to ``ML_ARTIFACT_DIR``
+    """
+    path = f'{training_session.model_id}/{training_session.id}'
+    artifact_dir = get_storage_dir() / path
+    shutil.rmtree(artifact_dir, ignore_errors=True)
+    artifact_dir.mkdir(parents=True)
+
+    manifest = {'artifacts': []}
+    for idx, (name, value) in enumerate(artifacts.items()):
+        if isinstance(value, np.ndarray):
+            filename = f'{idx:04d}.npy'
+            np.save(artifact_dir / filename, np.ascontiguousarray(value), allow_pickle=False)
+            manifest['artifacts'].append({'name': name, 'file': filename, 'format': FORMAT_ARRAY,
+                                          'dtype': value.dtype.str})
+        else:
+            import joblib
+            filename = f'{idx:04d}.joblib'
+            joblib.dump(value, artifact_dir / filename)
+            manifest['artifacts'].append({'name': name, 'file': filename, 'format': FORMAT_JOBLIB})
+
+    # Written last: a version without a manifest is incomplete
+    with open(artifact_dir / MANIFEST_NAME, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    return path
+
+
+class ArtifactSet(Mapping):
+    """One stored version; each artifact is loaded on first access."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.directory = get_storage_dir() / path
+        with open(self.directory / MANIFEST_NAME) as manifest_file:
+            manifest = json.load(manifest_file)
+        self._entries = {entry['name']: entry for entry in manifest['artifacts']}
+        self._loaded = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            entry = self._entries[name]
+            if entry['format'] == FORMAT_ARRAY:
+                value = np.load(self.directory / entry['file'], mmap_mode='r', allow_pickle=False)
+            else:
+                import joblib
+                value = joblib.load(self.directory / entry['file'])
+            self._loaded[name] = value
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def load_artifacts(path: str) -> Optional[ArtifactSet]:
+    """Open a stored version (None for an empty path)."""
+    return ArtifactSet(path) if path else None
+
+
+def delete_artifacts(path: str):
+    """Remove a stored version, if any."""
+    if path:
+        shutil.rmtree(get_storage_dir() / path, ignore_errors=True)
@@ -0,0 +1,213 @@
+"""
+Async variants of the I/O-bound API endpoints, served under ``/api/async/``.
+
+Under an ASGI server (``uvicorn kmrl_backend.asgi:application``) a request
+waiting on the database no longer holds a worker thread: reads go through
+Django's async ORM, transactional writes run on the request's own thread via
+``sync_to_async``, and CPU-bound model scoring runs on a bounded thread pool
+(``ASYNC_SCORING_WORKERS``) so it cannot stall the event loop. Model
+instances live in the per-process ``model_cache``, which a process pool could
+not share, hence threads.
+
+The views take and return JSON and accept the same parameters as their
+synchronous counterparts in ``fleet.views``, with the same session
+authentication and CSRF rules. Under WSGI they still work, one request per
+thread as before.
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.authentication import CSRFCheck
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import readers
+from .ingestion import CSVIngestionEngine
+from .model_cache import model_cache
+from .models import CSVDataSource, CSVUpload, MLModel
+from .response_cache import cached_response
+from .views import _ingestion_payload, _load_model_instance, _ml_models_page, _ml_models_query, _predict_payload
+
+DEFAULT_SCORING_WORKERS = 4
+INVALID_BODY = {'error': 'Request body must be a JSON object'}
+
+_scoring_executor = None
+_lock = threading.Lock()
+
+
+def get_scoring_executor() -> ThreadPoolExecutor:
+    global _scoring_executor
+    with _lock:
+        if _scoring_executor is None:
+            max_workers = getattr(settings, 'ASYNC_SCORING_WORKERS', DEFAULT_SCORING_WORKERS)
+            _scoring_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ml-scoring')
+        return _scoring_executor
+
+
+async def run_cpu_bound(func, *args):
+    """Run ``func`` on the scoring pool, keeping the request context (stage timings)."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_scoring_executor(), partial(context.run, func, *args))
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    return JsonResponse(data, status=status_code, encoder=JSONEncoder, safe=False)
+
+
+def _csrf_failure(request):
+    """The CSRF check DRF's SessionAuthentication applies to unsafe methods"""
+    check = CSRFCheck(lambda request: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {})
+
+
+def async_api_view(methods):
+    """Restrict an async view to ``methods`` and require an authenticated session, as ``IsAuthenticated`` does"""
+    def decorator(view):
+        @require_http_methods(methods)
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if not user.is_authenticated:
+                return _json({'detail': 'Authentication credentials were not provided.'}, status.HTTP_403_FORBIDDEN)
+            if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+                reason = _csrf_failure(request)
+                if reason:
+                    return _json({'detail': f'CSRF Failed: {reason}'}, status.HTTP_403_FORBIDDEN)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _json_body(request):
+    """The request's JSON object body, or None if it is not one"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@async_api_view(['POST'])
+async def ingest_csv_data(request):
+    """Async ``ingest_csv_data``: the batched, atomic ingest runs on the request thread"""
+    data = _json_body(request)
+    if data is None:
+        return _json(INVALID_BODY, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        source_name = data.get('source')
+        filename = data.get('fileName')
+        headers = data.get('headers', [])
+        rows = data.get('rows', [])
+
+        if not all([source_name, filename, headers, rows]):
+            return _json({'error': 'Missing required fields'}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            engine = CSVIngestionEngine(batch_size=data.get('batch_size'), storage=data.get('storage'))
+        except ValueError as e:
+            return _json({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+        result = await sync_to_async(engine.ingest)(source_name, filename, headers, rows)
+
+        payload, status_code = _ingestion_payload(result, filename)
+        return _json(payload, status_code)
+
+    except Exception as e:
+        return _json({'error': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['GET'])
+async def get_csv_data(request):
+    """
+    Async ``get_csv_data``, always paginated.
+
+    Query params:
+        source: Restrict to one data source
+        limit, cursor: Cursor pagination over rows ordered by (upload_id, row_index)
+
+    Full dumps and NDJSON streams stay on the synchronous endpoint.
+    """
+    try:
+        uploads = CSVUpload.objects.all()
+        source_name = request.GET.get('source')
+        if source_name:
+            data_source = await CSVDataSource.objects.aget(name=source_name)
+            uploads = uploads.filter(source=data_source)
+
+        cursor = readers.decode_cursor(request.GET.get('cursor'))
+        limit = int(request.GET.get('limit', settings.CSV_DATA_PAGE_SIZE))
+        max_limit = settings.CSV_DATA_MAX_PAGE_SIZE
+        if not 1 <= limit <= max_limit:
+            return _json({'error': f'limit must be between 1 and {max_limit}'}, status.HTTP_400_BAD_REQUEST)
+
+        return _json(await readers.aread_page(uploads, cursor=cursor, limit=limit))
+
+    except CSVDataSource.DoesNotExist:
+        return _json({'error': 'Data source not found'}, status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return _json({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return _json({'error': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['POST'])
+async def predict_with_model(request):
+    """Async ``predict_with_model``: scoring runs on the scoring thread pool"""
+    data = _json_body(request)
+    if data is None:
+        return _json(INVALID_BODY, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        model_id = data.get('model_id')
+        input_data = data.get('input_data', [])
+
+        if not model_id:
+            return _json({'error': 'model_id is required'}, status.HTTP_400_BAD_REQUEST)
+
+        ml_model = await MLModel.objects.aget(id=model_id)
+        if not ml_model.is_active:
+            return _json({'error': 'Model is not active'}, status.HTTP_400_BAD_REQUEST)
+
+        # Cache hits need neither the database nor a thread
+        model_instance = model_cache.get(ml_model)
+        if model_instance is None:
+            model_instance = await sync_to_async(_load_model_instance)(ml_model)
+            model_cache.put(ml_model, model_instance)
+
+        fleet = None
+        if data.get('fleet'):
+            from .feature_store import get_fleet
+            fleet = await sync_to_async(get_fleet)()
+
+        return _json(await run_cpu_bound(_predict_payload, ml_model, model_instance, input_data, fleet))
+
+    except MLModel.DoesNotExist:
+        return _json({'error': 'Model not found'}, status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return _json({'error': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['GET'])
+@cached_response('ml_models')
+async def get_ml_models(request):
+    """Async ``get_ml_models``: same filters, cursor and single annotated query"""
+    try:
+        models, limit = _ml_models_query(request.GET)
+        page = [model async for model in models]
+        return _json(_ml_models_page(page, limit))
+
+    except ValueError as e:
+        return _json({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return _json({'error': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
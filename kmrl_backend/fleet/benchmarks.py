@@ -0,0 +1,595 @@
+"""
+Reproducible performance benchmarks for the fleet backend.
+
+Seeds a synthetic fleet and CSV feed at a given scale, then times the API
+endpoints and the raw ML models, recording wall time, SQL query count and
+peak Python memory (tracemalloc). Run through ``manage.py benchmark_fleet``.
+
+The ``concurrent_*`` benchmarks compare request throughput of one WSGI
+worker (one request at a time) with one ASGI worker (one event loop running
+the async views) under many concurrent clients. Every query is delayed by a
+simulated remote database round trip, the cost async views avoid holding a
+worker for.
+
+The ``startup_import`` benchmarks run ``python -X importtime`` in a fresh
+interpreter: Django set-up plus the URLconf, as every worker and management
+command pays, and the ML stack on top (``fleet.warmup``). The baseline
+comparison also fails when a heavy module (NumPy, pandas, ...) starts being
+imported at start-up.
+"""
+
+import asyncio
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from . import response_cache
+from .ingestion import CSVIngestionEngine
+from .ml_models import create_model
+from .model_cache import model_cache
+from .history import record_states
+from .models import CSVUploadStatistics, Train, TrainState
+from .training import create_training_session, load_training_frame, run_training_session
+
+SCALES = {
+    'small': {'trains': 25, 'csv_rows': 1_000},
+    'medium': {'trains': 100, 'csv_rows': 100_000},
+    'large': {'trains': 200, 'csv_rows': 1_000_000},
+}
+
+FEED_SOURCE = 'bench-feed'
+INGEST_SOURCE = 'bench-ingest'
+BENCH_USER = 'bench-user'
+
+CONCURRENT_REQUESTS = 64
+CONCURRENT_CLIENTS = 16
+SIMULATED_DB_LATENCY = 0.01  # seconds per query, roughly a hosted Postgres round trip
+
+# Rows the random forest benchmarks fit on (the formula backends use every row)
+SKLEARN_FIT_ROWS = 100_000
+
+# Days of fleet state history the history query benchmarks read
+HISTORY_DAYS = 365
+
+# Must stay out of start-up (see fleet.warmup)
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'sklearn', 'joblib')
+
+
+def synthetic_fleet_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """Random but reproducible train feature rows, shaped like the Train table."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'train_id': [f'TS-{idx + 1:02d}' for idx in range(n)],
+        'fc_rs': rng.random(n) > 0.1,
+        'fc_sig': rng.random(n) > 0.1,
+        'fc_tel': rng.random(n) > 0.15,
+        'open_jobs': rng.integers(0, 6, n),
+        'branding_shortfall': rng.integers(0, 13, n),
+        'mileage_km': rng.integers(700, 1200, n),
+        'cleaning_due': rng.random(n) > 0.7,
+        'stabling_penalty': rng.integers(0, 40, n),
+    })
+
+
+def synthetic_csv_rows(n: int, trains: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """CSV feed rows as the importer sends them: one dict per line, cycling over the fleet."""
+    df = synthetic_fleet_frame(n, seed)
+    df['train_id'] = [f'TS-{idx % trains + 1:02d}' for idx in range(n)]
+    return json.loads(df.to_json(orient='records'))
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    seconds: float
+    queries: int
+    peak_memory_bytes: int = None
+    rows: int = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = {
+            'seconds': round(self.seconds, 6),
+            'queries': self.queries,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'rows': self.rows,
+        }
+        result.update(self.extra)
+        return result
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int = 1, memory: bool = True,
+            rows: int = None) -> BenchmarkResult:
+    """
+    Time ``func`` (best of ``repeat``) and count its SQL queries; with
+    ``memory``, run it once more under tracemalloc for its peak allocation.
+    """
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        queries = len(captured)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(name=name, seconds=min(timings), queries=queries, peak_memory_bytes=peak, rows=rows)
+
+
+def _check(response, expected_status: int):
+    if response.status_code != expected_status:
+        data = getattr(response, 'data', None)
+        raise RuntimeError(f'Unexpected status {response.status_code}: {data}')
+    return response
+
+
+@contextmanager
+def simulated_db_latency(seconds: float):
+    """
+    Delay every SQL query by ``seconds``, on every thread's connection, and
+    count them. Yields a dict whose ``queries`` entry is the running count.
+    """
+    counter = {'queries': 0}
+    lock = threading.Lock()
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        with lock:
+            counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    current = connections.all(initialized_only=True)
+    for conn in current:
+        conn.execute_wrappers.append(delay)
+    connection_created.connect(install, weak=False)
+    try:
+        yield counter
+    finally:
+        connection_created.disconnect(install)
+        for conn in current:
+            conn.execute_wrappers.remove(delay)
+
+
+def import_profile(code: str) -> Dict[str, Any]:
+    """
+    Run ``code`` in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        ``seconds`` (total import time), ``modules`` (count imported),
+        ``heavy_modules`` (``HEAVY_MODULES`` that were imported) and ``top``
+        (the slowest top-level packages, cumulative seconds)
+    """
+    # DJANGO_SETTINGS_MODULE is inherited from this process
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=str(settings.BASE_DIR), capture_output=True, text=True, check=True
+    )
+
+    total = 0
+    modules = 0
+    imported = set()
+    packages = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, raw_name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():  # column header
+            continue
+        package = raw_name.strip().split('.')[0]
+        total += int(self_us)
+        modules += 1
+        imported.add(package)
+        if raw_name[:2] != '  ':  # top level; nested imports are indented further
+            packages[package] = packages.get(package, 0) + int(cumulative_us)
+
+    top = sorted(packages.items(), key=lambda item: -item[1])[:5]
+    return {
+        'seconds': total / 1e6,
+        'modules': modules,
+        'heavy_modules': sorted(imported.intersection(HEAVY_MODULES)),
+        'top': {package: round(us / 1e6, 4) for package, us in top},
+    }
+
+
+async def _asgi_get(app, path: str, query_string: str, cookie: str):
+    """Send one GET through an ASGI application. Returns ``(status, body)``."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Future()  # the client never disconnects
+
+    response = {'status': None, 'body': []}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return response['status'], b''.join(response['body'])
+
+
+class BenchmarkSuite:
+    """
+    Runs every benchmark at one scale against the current database.
+
+    Meant to run inside a throwaway test database: it creates a user, trains,
+    CSV sources and models.
+    """
+
+    def __init__(self, scale: str = 'small', repeat: int = 3, memory: bool = True, seed: int = 42):
+        if scale not in SCALES:
+            raise ValueError(f'Unknown scale: {scale}. Available scales: {list(SCALES)}')
+        self.scale = scale
+        self.trains = SCALES[scale]['trains']
+        self.csv_rows = SCALES[scale]['csv_rows']
+        self.repeat = repeat
+        self.memory = memory
+        self.seed = seed
+        self.results: List[BenchmarkResult] = []
+
+    def seed_data(self):
+        fleet = synthetic_fleet_frame(self.trains, self.seed)
+        Train.objects.bulk_create([Train(**record) for record in fleet.to_dict('records')])
+
+        # The response cache outlives the throwaway database
+        for resource in response_cache.RESOURCES:
+            response_cache.bump_version(resource)
+
+        self.feed_rows = synthetic_csv_rows(self.csv_rows, self.trains, self.seed + 1)
+        self.feed_headers = list(self.feed_rows[0])
+        self.feed_csv = pd.DataFrame(self.feed_rows).to_csv(index=False).encode()
+        CSVIngestionEngine().ingest(FEED_SOURCE, 'feed.csv', self.feed_headers, self.feed_rows)
+
+        user, _ = User.objects.get_or_create(username=BENCH_USER, defaults={'is_staff': True})
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        self.fleet_input = json.loads(fleet.drop(columns=['train_id']).to_json(orient='records'))
+
+    def add(self, name: str, func: Callable[[], Any], rows: int = None, repeat: int = None) -> BenchmarkResult:
+        result = measure(name, func, repeat=repeat or self.repeat, memory=self.memory, rows=rows)
+        self.results.append(result)
+        return result
+
+    def add_concurrent(self, name: str, sync_path: str, async_path: str, query_string: str,
+                       requests: int = CONCURRENT_REQUESTS, clients: int = CONCURRENT_CLIENTS,
+                       db_latency: float = SIMULATED_DB_LATENCY):
+        """
+        Throughput of ``requests`` GETs from ``clients`` concurrent clients:
+        one WSGI worker on ``sync_path`` versus one ASGI event loop on
+        ``async_path``, best of ``repeat``. Records ``{name}[wsgi]`` and
+        ``{name}[asgi]``; query counts cover all threads.
+        """
+        user = User.objects.get(username=BENCH_USER)
+        client = Client()
+        client.force_login(user)
+        cookie_name = settings.SESSION_COOKIE_NAME
+        cookie = f'{cookie_name}={client.cookies[cookie_name].value}'
+        app = ASGIHandler()
+
+        def wsgi_worker():
+            # A sync worker serves one request at a time, however many clients wait
+            for _ in range(requests):
+                _check(client.get(f'{sync_path}?{query_string}'), 200)
+
+        async def asgi_worker():
+            semaphore = asyncio.Semaphore(clients)
+
+            async def one():
+                async with semaphore:
+                    status_code, body = await _asgi_get(app, async_path, query_string, cookie)
+                if status_code != 200:
+                    raise RuntimeError(f'Unexpected status {status_code}: {body[:200]}')
+
+            await asyncio.gather(*(one() for _ in range(requests)))
+
+        results = {}
+        with simulated_db_latency(db_latency) as counter:
+            for server, func in (('wsgi', wsgi_worker), ('asgi', lambda: asyncio.run(asgi_worker()))):
+                timings = []
+                for _ in range(self.repeat):
+                    counter['queries'] = 0
+                    started = time.perf_counter()
+                    func()
+                    timings.append(time.perf_counter() - started)
+                seconds = min(timings)
+                results[server] = BenchmarkResult(
+                    name=f'{name}[{server}]', seconds=seconds, queries=counter['queries'], rows=requests,
+                    extra={
+                        'requests_per_second': round(requests / seconds, 2),
+                        'concurrent_clients': clients,
+                        'workers': 1,
+                        'db_latency_ms': db_latency * 1000
+                    }
+                )
+
+        results['asgi'].extra['speedup_vs_wsgi'] = round(results['wsgi'].seconds / results['asgi'].seconds, 2)
+        self.results.extend(results.values())
+        return results
+
+    def add_startup(self, name: str, code: str) -> BenchmarkResult:
+        """Best of ``repeat`` import profiles of ``code`` (see ``import_profile``)."""
+        profiles = [import_profile(code) for _ in range(self.repeat)]
+        best = min(profiles, key=lambda profile: profile['seconds'])
+        result = BenchmarkResult(name=name, seconds=best['seconds'], queries=0, extra={
+            'modules': best['modules'], 'heavy_modules': best['heavy_modules'], 'top': best['top']
+        })
+        self.results.append(result)
+        return result
+
+    def run(self) -> Dict[str, Any]:
+        # The JSON ingest payload at larger scales exceeds Django's default request size cap
+        with tempfile.TemporaryDirectory() as artifact_dir, \
+                override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=None, ML_ARTIFACT_DIR=Path(artifact_dir)):
+            return self._run()
+
+    def _run(self) -> Dict[str, Any]:
+        self.seed_data()
+        client = self.client
+
+        # Each run ingests into a fresh source: resending the same feed is deduplicated
+        run_ids = itertools.count()
+
+        def ingest_payload():
+            return {
+                'source': f'{INGEST_SOURCE}-{next(run_ids)}',
+                'fileName': 'ingest.csv',
+                'headers': self.feed_headers,
+                'rows': self.feed_rows
+            }
+
+        self.add('ingest_csv_data', lambda: _check(
+            client.post('/api/csv/ingest/', ingest_payload(), format='json'), 201
+        ), rows=self.csv_rows)
+        self.add('ingest_csv_stream', lambda: _check(client.post(
+            f'/api/csv/ingest/stream/?source={INGEST_SOURCE}-{next(run_ids)}&fileName=ingest.csv',
+            data=self.feed_csv, content_type='text/csv'
+        ), 201), rows=self.csv_rows)
+
+        duplicate_payload = {'source': FEED_SOURCE, 'fileName': 'feed.csv',
+                             'headers': self.feed_headers, 'rows': self.feed_rows}
+        self.add('ingest_csv_data_duplicate', lambda: _check(
+            client.post('/api/csv/ingest/', duplicate_payload, format='json'), 200
+        ), rows=self.csv_rows)
+
+        fleet_rows = json.loads(synthetic_fleet_frame(self.trains, self.seed).to_json(orient='records'))
+
+        def upsert_fleet():
+            # Every train's mileage moves on, so each run updates the whole fleet
+            run = next(run_ids)
+            payload = [{**row, 'mileage_km': row['mileage_km'] + run} for row in fleet_rows]
+            return _check(client.post('/api/trains/bulk-upsert/', payload, format='json'), 200)
+
+        self.add('bulk_upsert_trains', upsert_fleet, rows=self.trains)
+
+        # One train edited from the dashboard: the save and the history state it appends
+        edited = Train.objects.order_by('train_id').values_list('pk', flat=True).first()
+        self.add('update_train', lambda: _check(client.patch(
+            f'/api/trains/{edited}/', {'open_jobs': next(run_ids) % 5}, format='json'
+        ), 200))
+
+        # Dashboard polls: cached payload, then a conditional GET answered with 304
+        self.add('list_trains', lambda: _check(client.get('/api/trains/'), 200), rows=self.trains)
+        etag = _check(client.get('/api/trains/'), 200)['ETag']
+        self.add('list_trains_not_modified', lambda: _check(
+            client.get('/api/trains/', HTTP_IF_NONE_MATCH=etag), 304
+        ), rows=self.trains)
+
+        # A year of fleet history, one change per train a day. Each poll follows a change, so it
+        # misses the response cache; past fleet days are stored by the first one
+        today = datetime.now(timezone.utc)
+        states = synthetic_fleet_frame(self.trains, self.seed).to_dict('records')
+        for days_ago in range(HISTORY_DAYS, 0, -1):
+            states = [{**state, 'mileage_km': state['mileage_km'] + 1} for state in states]
+            record_states(states, TrainState.SOURCE_CHANGE, recorded_at=today - timedelta(days=days_ago))
+        year = {'start': (today - timedelta(days=HISTORY_DAYS)).date().isoformat(), 'end': today.date().isoformat()}
+
+        def get_history(params):
+            response_cache.bump_version('history')
+            return _check(client.get('/api/history/', params), 200)
+
+        get_history(year)
+        self.add('get_fleet_history[fleet,day]', lambda: get_history(year), rows=HISTORY_DAYS)
+        self.add('get_fleet_history[fleet,week]', lambda: get_history({**year, 'interval': 'week'}),
+                 rows=HISTORY_DAYS)
+        self.add('get_fleet_history[train,day]', lambda: get_history({**year, 'train_id': states[0]['train_id']}),
+                 rows=HISTORY_DAYS)
+
+        self.add('get_csv_data', lambda: _check(
+            client.get('/api/csv/data/', {'source': FEED_SOURCE}), 200
+        ), rows=self.csv_rows)
+        self.add('get_csv_data_page', lambda: _check(
+            client.get('/api/csv/data/', {'source': FEED_SOURCE, 'limit': 1000}), 200
+        ), rows=min(1000, self.csv_rows))
+        self.add('get_csv_data_ndjson', lambda: b''.join(_check(
+            client.get('/api/csv/data/', {'source': FEED_SOURCE, 'stream': 'ndjson'}), 200
+        ).streaming_content), rows=self.csv_rows)
+        self.add_concurrent('concurrent_csv_data', '/api/csv/data/', '/api/async/csv/data/',
+                            f'source={FEED_SOURCE}&limit=100')
+        self.add('query_csv_data[train_id]', lambda: _check(client.get('/api/csv/query/', {
+            'source': FEED_SOURCE, 'where': 'train_id:eq:TS-01', 'limit': 1000
+        }), 200))
+        self.add('query_csv_data[range]', lambda: _check(client.get('/api/csv/query/', {
+            'source': FEED_SOURCE, 'where': ['train_id:eq:TS-01', 'mileage_km:gt:1100'],
+            'fields': 'train_id,mileage_km', 'order_by': '-mileage_km', 'limit': 100
+        }), 200))
+
+        # Chunked, compacted load of the row-stored feed (peak memory with --memory)
+        loader_session = create_training_session('train_optimization', 'bench-loader', {}, [FEED_SOURCE])
+        self.add('load_training_frame', lambda: load_training_frame(loader_session), rows=self.csv_rows)
+
+        def train_model(model_type, config=None):
+            # The run /api/ml/train/ and /api/ml/jobs/ queue, in this thread
+            training_session = create_training_session(model_type, f'{model_type}_model', config or {}, [FEED_SOURCE])
+            run_training_session(training_session.id)
+            return training_session
+
+        for model_type in ('train_optimization', 'predictive_maintenance'):
+            def train_from_scratch(model_type=model_type):
+                CSVUploadStatistics.objects.all().delete()
+                return train_model(model_type)
+
+            self.add(f'train_ml_model[{model_type}]', train_from_scratch, rows=self.csv_rows)
+            # Per-upload statistics are already stored: nothing new to read
+            self.add(f'train_ml_model_incremental[{model_type}]', lambda model_type=model_type: train_model(model_type),
+                     rows=self.csv_rows)
+
+            model_id = train_model(model_type).model_id
+            predict_payload = {'model_id': model_id, 'input_data': self.fleet_input}
+            self.add(f'predict_with_model[{model_type}]', lambda payload=predict_payload: _check(
+                client.post('/api/ml/predict/', payload, format='json'), 200
+            ), rows=self.trains)
+            # The Train table, read from the in-process feature snapshot
+            fleet_payload = {'model_id': model_id, 'fleet': True}
+            self.add(f'predict_with_model[{model_type},fleet]', lambda payload=fleet_payload: _check(
+                client.post('/api/ml/predict/', payload, format='json'), 200
+            ), rows=self.trains)
+
+        # A stored forest: mapped from its artifact on a cache miss, then served from the model cache
+        model_id = train_model('train_optimization', {'backend': 'sklearn'}).model_id
+        predict_payload = {'model_id': model_id, 'input_data': self.fleet_input}
+
+        def predict_cold():
+            model_cache.clear()
+            return _check(client.post('/api/ml/predict/', predict_payload, format='json'), 200)
+
+        self.add('predict_with_model[train_optimization,sklearn,cold]', predict_cold, rows=self.trains)
+        self.add('predict_with_model[train_optimization,sklearn]', lambda: _check(
+            client.post('/api/ml/predict/', predict_payload, format='json'), 200
+        ), rows=self.trains)
+
+        setup = f'import django; django.setup(); import {settings.ROOT_URLCONF}'
+        self.add_startup('startup_import', setup)
+        self.add_startup('startup_import[ml_preload]', f'{setup}; from fleet.warmup import warm_up; warm_up()')
+
+        frame = synthetic_fleet_frame(self.csv_rows, self.seed + 2)
+        for model_type in ('train_optimization', 'predictive_maintenance'):
+            model_instance = create_model(model_type)
+            self.add(f'{model_type}.train', lambda m=model_instance: m.train(frame), rows=self.csv_rows)
+            self.add(f'{model_type}.predict', lambda m=model_instance: m.predict(frame), rows=self.csv_rows)
+
+        # Learned backend against the formula: all cores, one core, and growing a fitted forest
+        fit_frame = frame.head(SKLEARN_FIT_ROWS)
+        for label, config in (('sklearn', {}), ('sklearn,n_jobs=1', {'n_jobs': 1})):
+            model_instance = create_model('train_optimization', {'backend': 'sklearn', **config})
+            self.add(f'train_optimization[{label}].train', lambda m=model_instance: m.train(fit_frame),
+                     rows=len(fit_frame))
+            self.add(f'train_optimization[{label}].predict', lambda m=model_instance: m.predict(frame),
+                     rows=self.csv_rows)
+        model_instance = create_model('train_optimization', {'backend': 'sklearn', 'warm_start': True, 'n_estimators': 10})
+        model_instance.train(fit_frame)
+        self.add('train_optimization[sklearn,warm_start].train', lambda: model_instance.train(fit_frame),
+                 rows=len(fit_frame))
+
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        import django
+        return {
+            'meta': {
+                'scale': self.scale,
+                'trains': self.trains,
+                'csv_rows': self.csv_rows,
+                'repeat': self.repeat,
+                'seed': self.seed,
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+            },
+            'results': {result.name: result.as_dict() for result in self.results}
+        }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.25, min_seconds: float = 0.005) -> List[str]:
+    """
+    Compare a report against a stored baseline.
+
+    A benchmark regresses when it is more than ``tolerance`` (fractional) and
+    ``min_seconds`` (absolute, to ignore timer noise) slower, issues more SQL
+    queries, or peaks more than ``tolerance`` higher in memory than the baseline.
+
+    Returns:
+        Human-readable regression messages (empty if none)
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+
+        slowdown = current['seconds'] - previous['seconds']
+        if current['seconds'] > previous['seconds'] * (1 + tolerance) and slowdown > min_seconds:
+            regressions.append(
+                f"{name}: {current['seconds']:.4f}s vs baseline {previous['seconds']:.4f}s"
+            )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f"{name}: {current['queries']} queries vs baseline {previous['queries']}"
+            )
+        new_heavy = set(current.get('heavy_modules') or ()) - set(previous.get('heavy_modules') or ())
+        if new_heavy:
+            regressions.append(f"{name}: now imports {', '.join(sorted(new_heavy))}")
+        if current.get('peak_memory_bytes') and previous.get('peak_memory_bytes'):
+            if current['peak_memory_bytes'] > previous['peak_memory_bytes'] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: peak {current['peak_memory_bytes']} bytes vs baseline {previous['peak_memory_bytes']}"
+                )
+    return regressions
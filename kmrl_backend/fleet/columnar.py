@@ -0,0 +1,267 @@
+"""
+Columnar storage backend for CSV uploads.
+
+An upload stored in columnar mode keeps its data as one typed ``.npy`` file per
+column under ``CSV_COLUMNAR_STORAGE_DIR/<upload_id>/`` instead of one
+``CSVDataRow`` per line. Columns are loaded memory-mapped, so building a
+DataFrame for training does not deserialize any JSON.
+"""
+
+import itertools
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+MANIFEST_NAME = 'manifest.json'
+ROW_HASHES_NAME = 'row_hashes.npy'
+ROW_HASH_DTYPE = np.dtype('S32')  # fleet.ingestion.row_hash hex digests
+BOOL_TOKENS = {'true': True, 'false': False, 'yes': True, 'no': False}
+KIND_DTYPES = {'bool': np.bool_, 'int': np.int64, 'float': np.float64}  # 'str' is fixed-width unicode
+DEFAULT_CHUNK_SIZE = 10_000
+SPILL_SUFFIX = '.spill'
+
+
+def get_storage_dir() -> Path:
+    return Path(getattr(settings, 'CSV_COLUMNAR_STORAGE_DIR', Path(settings.BASE_DIR) / 'columnar_data'))
+
+
+def get_upload_dir(upload) -> Path:
+    return get_storage_dir() / upload.data_path
+
+
+def _tokens(values: Iterable[Any]) -> List[str]:
+    return ['' if value is None else str(value).strip() for value in values]
+
+
+def _infer_kind(tokens: List[str]) -> str:
+    """The most specific of ``KINDS`` that every token converts to."""
+    lowered = [token.lower() for token in tokens]
+
+    if lowered and all(token in BOOL_TOKENS for token in lowered):
+        return 'bool'
+
+    if all(lowered):
+        try:
+            np.array(tokens).astype(np.int64)
+            return 'int'
+        except (ValueError, OverflowError):
+            pass
+
+    try:
+        np.array([token if token else 'nan' for token in tokens]).astype(np.float64)
+        return 'float'
+    except ValueError:
+        pass
+
+    return 'str'
+
+
+def _combine_kinds(kinds: Set[str]) -> str:
+    """Kind of a whole column from the kinds of its chunks, as ``_infer_kind`` would infer it."""
+    if not kinds:
+        return 'int'  # what _infer_kind gives an empty column
+    if kinds == {'bool'}:
+        return 'bool'
+    # Boolean tokens are neither numbers nor empty
+    if 'bool' in kinds or 'str' in kinds:
+        return 'str'
+    return 'float' if 'float' in kinds else 'int'
+
+
+def _convert(tokens: List[str], kind: str, dtype=None) -> np.ndarray:
+    if kind == 'bool':
+        return np.array([BOOL_TOKENS[token.lower()] for token in tokens], dtype=np.bool_)
+    if kind == 'int':
+        return np.array(tokens).astype(np.int64)
+    if kind == 'float':
+        return np.array([token if token else 'nan' for token in tokens]).astype(np.float64)
+    return np.array(tokens, dtype=dtype or np.str_)
+
+
+def infer_column(values: List[Any]) -> np.ndarray:
+    """
+    Convert raw CSV cell values to the most specific NumPy array.
+
+    Tries bool, then int64, then float64 (empty cells become NaN), and falls
+    back to a fixed-width unicode array.
+    """
+    tokens = _tokens(values)
+    return _convert(tokens, _infer_kind(tokens))
+
+
+class _ColumnSpill:
+    """
+    One column's cells, appended a chunk at a time to a temporary file while
+    the column's type is inferred, then converted into its ``.npy`` file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.kinds = set()
+        self.width = 1
+        self._file = open(path, 'w')
+
+    def append(self, values: List[Any]):
+        tokens = _tokens(values)
+        self.kinds.add(_infer_kind(tokens))
+        self.width = max(self.width, max(map(len, tokens)))
+        self._file.write(json.dumps(tokens) + '\n')
+
+    def write_array(self, path: Path, row_count: int) -> np.dtype:
+        """Write the column as a typed ``.npy`` file, one chunk in memory at a time."""
+        self._file.close()
+        kind = _combine_kinds(self.kinds)
+        dtype = np.dtype(KIND_DTYPES.get(kind, f'<U{self.width}'))
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(row_count,))
+        offset = 0
+        with open(self.path) as spill_file:
+            for line in spill_file:
+                chunk = _convert(json.loads(line), kind, dtype)
+                array[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+        array.flush()
+        del array
+        self.path.unlink()
+        return dtype
+
+    def discard(self):
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class _RowHashSpill:
+    """Row hashes, appended a chunk at a time as fixed-width bytes, then written as one ``.npy`` file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'wb')
+
+    def append(self, row_hashes: Iterable[str]):
+        self._file.write(np.array(row_hashes, dtype=ROW_HASH_DTYPE).tobytes())
+
+    def write_array(self, path: Path, row_count: int, chunk_size: int):
+        self._file.close()
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=ROW_HASH_DTYPE, shape=(row_count,))
+        with open(self.path, 'rb') as spill_file:
+            for offset in range(0, row_count, chunk_size):
+                chunk = np.fromfile(spill_file, dtype=ROW_HASH_DTYPE, count=chunk_size)
+                array[offset:offset + len(chunk)] = chunk
+        array.flush()
+        del array
+        self.path.unlink()
+
+    def discard(self):
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def write_upload(upload, headers: List[str], rows: Iterable[Tuple[Dict[str, Any], str]],
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Write an upload's rows as typed columns and point ``upload.data_path`` at them.
+
+    Rows are consumed ``chunk_size`` at a time: each chunk is spilled to a
+    temporary file per column (and one for the row hashes), and the typed
+    column files are written once every row has been seen, so memory stays
+    flat however long the upload is.
+
+    Args:
+        upload: Saved CSVUpload instance
+        headers: Column headers
+        rows: Iterable of ``(row dict, content hash hex)`` pairs; the hashes
+            are stored next to the columns
+        chunk_size: Rows held in memory at a time
+
+    Returns:
+        Number of rows written
+    """
+    upload.data_path = str(upload.id)
+    upload_dir = get_upload_dir(upload)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    spills = [_ColumnSpill(upload_dir / f'{idx:04d}{SPILL_SUFFIX}') for idx in range(len(headers))]
+    hash_spill = _RowHashSpill(upload_dir / f'{ROW_HASHES_NAME}{SPILL_SUFFIX}')
+    try:
+        row_count = 0
+        for chunk in _chunks(rows, chunk_size):
+            for header, spill in zip(headers, spills):
+                spill.append([row_data.get(header) for row_data, _ in chunk])
+            hash_spill.append([row_hash_hex for _, row_hash_hex in chunk])
+            row_count += len(chunk)
+
+        manifest = {'row_count': row_count, 'columns': [], 'row_hashes': ROW_HASHES_NAME}
+        for idx, (header, spill) in enumerate(zip(headers, spills)):
+            filename = f'{idx:04d}.npy'
+            dtype = spill.write_array(upload_dir / filename, row_count)
+            manifest['columns'].append({'name': header, 'file': filename, 'dtype': dtype.str})
+        hash_spill.write_array(upload_dir / ROW_HASHES_NAME, row_count, chunk_size)
+    finally:
+        for spill in spills:
+            spill.discard()
+        hash_spill.discard()
+
+    with open(upload_dir / MANIFEST_NAME, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    return row_count
+
+
+def _chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_upload_frame(upload, columns: List[str] = None, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a columnar upload into a DataFrame.
+
+    Args:
+        upload: CSVUpload stored in columnar mode
+        columns: Optional subset of columns to load
+        mmap: Memory-map the column files instead of reading them into memory
+
+    Returns:
+        DataFrame with typed columns
+    """
+    upload_dir = get_upload_dir(upload)
+    with open(upload_dir / MANIFEST_NAME) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    data = {}
+    for column in manifest['columns']:
+        if columns is not None and column['name'] not in columns:
+            continue
+        data[column['name']] = np.load(upload_dir / column['file'], mmap_mode='r' if mmap else None)
+
+    return pd.DataFrame(data, copy=False)
+
+
+def load_row_hashes(upload) -> Optional[np.ndarray]:
+    """Load an upload's per-row content hashes (hex strings), or None if it was stored without them."""
+    upload_dir = get_upload_dir(upload)
+    with open(upload_dir / MANIFEST_NAME) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if 'row_hashes' not in manifest:
+        return None
+    return np.load(upload_dir / manifest['row_hashes']).astype(np.str_)
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to JSON-safe row dicts (NaN becomes None)."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def delete_upload(upload):
+    """Remove an upload's column files, if any."""
+    if upload.data_path:
+        shutil.rmtree(get_upload_dir(upload), ignore_errors=True)
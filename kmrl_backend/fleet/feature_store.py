@@ -0,0 +1,166 @@
+"""
+In-process snapshot of the Train table's model features, as NumPy arrays.
+
+Scoring the live fleet (predictions, scenarios, induction plans) reads a
+``FleetSnapshot`` instead of querying the table and building a DataFrame
+every time. A snapshot holds one read-only array per feature that
+``TrainOptimizationModel`` and ``PredictiveMaintenanceModel`` consume, with
+trains in ``train_id`` order, and supports the ``columns`` / ``[name]`` /
+``len()`` access the models and ``fleet.scenarios`` use on a DataFrame.
+
+Freshness across processes comes from ``FleetVersion``, a counter bumped in
+the same transaction as every change to the table: by the Train
+``post_save`` / ``post_delete`` signals and by ``fleet.trains.upsert_trains``.
+A process compares its snapshot's version with the counter (one primary-key
+lookup) and reloads when they differ. The process that saved a train also
+applies the change to its own snapshot once the transaction commits, if no
+other change came in between, so it does not reload after its own writes.
+
+Writes that bypass signals (``QuerySet.update``, ``bulk_create``) must call
+``bump_version`` in their transaction.
+"""
+
+import threading
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import FleetVersion, Train
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+FEATURES = (
+    'fc_rs', 'fc_sig', 'fc_tel', 'open_jobs', 'branding_shortfall',
+    'mileage_km', 'cleaning_due', 'stabling_penalty'
+)
+# NumPy dtype names: NumPy and pandas are imported on first use, so saving a train does not load them
+DTYPES = {
+    'fc_rs': 'bool', 'fc_sig': 'bool', 'fc_tel': 'bool', 'cleaning_due': 'bool',
+    'open_jobs': 'int64', 'branding_shortfall': 'int64', 'mileage_km': 'int64', 'stabling_penalty': 'int64',
+}
+VERSION_PK = 1
+
+
+def _frozen(array: 'np.ndarray') -> 'np.ndarray':
+    array.flags.writeable = False
+    return array
+
+
+class FleetSnapshot:
+    """Immutable feature arrays of every train, as of ``version``."""
+
+    def __init__(self, version: int, pks: 'np.ndarray', train_ids: 'np.ndarray', features: Dict[str, 'np.ndarray']):
+        self.version = version
+        self.pks = _frozen(pks)
+        self.train_ids = _frozen(train_ids)
+        self.features = {name: _frozen(values) for name, values in features.items()}
+
+    @classmethod
+    def from_rows(cls, version: int, rows: Iterable[Tuple]) -> 'FleetSnapshot':
+        """Build from ``(pk, train_id, *FEATURES)`` tuples, in any order."""
+        import numpy as np
+        rows = sorted(rows, key=lambda row: row[1])
+        columns = list(zip(*rows)) or [()] * (len(FEATURES) + 2)
+        return cls(
+            version,
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=object),
+            {name: np.array(values, dtype=DTYPES[name]) for name, values in zip(FEATURES, columns[2:])}
+        )
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return ('train_id', *FEATURES)
+
+    def __getitem__(self, name: str) -> 'np.ndarray':
+        return self.train_ids if name == 'train_id' else self.features[name]
+
+    def __len__(self) -> int:
+        return len(self.train_ids)
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """A DataFrame with the ``Train`` feature columns, for code that needs one."""
+        import pandas as pd
+        return pd.DataFrame({name: self[name] for name in self.columns})
+
+    def replace(self, version: int, pk: int, row: Tuple = None) -> 'FleetSnapshot':
+        """A copy with train ``pk`` replaced by ``row`` (``(train_id, *FEATURES)``), or removed if None."""
+        import numpy as np
+        keep = self.pks != pk
+        pks, train_ids = self.pks[keep], self.train_ids[keep]
+        features = {name: values[keep] for name, values in self.features.items()}
+        if row is not None:
+            position = int(np.searchsorted(train_ids, row[0])) if len(train_ids) else 0
+            pks = np.insert(pks, position, pk)
+            train_ids = np.insert(train_ids, position, row[0])
+            features = {
+                name: np.insert(features[name], position, value) for name, value in zip(FEATURES, row[1:])
+            }
+        return FleetSnapshot(version, pks, train_ids, features)
+
+
+def current_version() -> int:
+    return FleetVersion.objects.filter(pk=VERSION_PK).values_list('version', flat=True).first() or 0
+
+
+def bump_version() -> int:
+    """
+    Count a change to the Train table. Call inside the writing transaction:
+    the counter row stays locked until it commits, so the returned version
+    belongs to this change alone.
+    """
+    with transaction.atomic():
+        if not FleetVersion.objects.filter(pk=VERSION_PK).update(version=F('version') + 1):
+            FleetVersion.objects.get_or_create(pk=VERSION_PK)
+            FleetVersion.objects.filter(pk=VERSION_PK).update(version=F('version') + 1)
+        return current_version()
+
+
+class FeatureStore:
+    """Thread-safe holder of this process's current ``FleetSnapshot``."""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> FleetSnapshot:
+        """The snapshot of the current Train table, reloaded if another change was made."""
+        version = current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        # Version first: a change made while the rows are read bumps it again
+        snapshot = FleetSnapshot.from_rows(version, Train.objects.values_list('pk', 'train_id', *FEATURES))
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version < version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def record_change(self, train: Train, deleted: bool = False):
+        """Bump the version for a saved or deleted train and apply it here once committed."""
+        version = bump_version()
+        row = None if deleted else (train.train_id, *(getattr(train, name) for name in FEATURES))
+        transaction.on_commit(partial(self._apply, version, train.pk, row))
+
+    def _apply(self, version: int, pk: int, row: Tuple):
+        with self._lock:
+            snapshot = self._snapshot
+            # Otherwise changes were missed: the next get() reloads
+            if snapshot is not None and snapshot.version == version - 1:
+                self._snapshot = snapshot.replace(version, pk, row)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+
+feature_store = FeatureStore()
+
+
+def get_fleet() -> FleetSnapshot:
+    return feature_store.get()
@@ -0,0 +1,91 @@
+"""
+Random forests as flat NumPy arrays, for memory-mapped serving.
+
+``flatten`` turns a fitted scikit-learn forest into a few arrays with one
+entry per node of every tree (children as forest-wide node indices), which
+``fleet.artifacts`` stores as ``.npy`` files. Loaded memory-mapped, the nodes
+stay in the page cache shared by all worker processes; an unpickled
+scikit-learn tree always copies its nodes into private memory, even from a
+memory-mapped joblib file.
+
+``predict`` walks every tree one level at a time for a block of rows and
+reproduces the estimator's own predictions: inputs are compared as float32,
+as scikit-learn does, and missing values follow each node's
+``missing_go_to_left``.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+ARRAYS = ('feature', 'threshold', 'children', 'missing_go_to_left', 'leaf_value', 'roots', 'depth')
+BLOCK_NODES = 1 << 22  # (tree, row) pairs walked at once
+
+
+def flatten(estimator, output_index: int = None) -> Dict[str, np.ndarray]:
+    """
+    Flatten a fitted random forest.
+
+    Args:
+        estimator: Fitted ``RandomForestRegressor`` or ``RandomForestClassifier``
+        output_index: For a classifier, the class whose probability is predicted
+
+    Returns:
+        Arrays keyed by ``ARRAYS``
+    """
+    trees = [tree.tree_ for tree in estimator.estimators_]
+    counts = np.array([tree.node_count for tree in trees], dtype=np.int32)
+    roots = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int32)
+
+    parts = {name: [] for name in ARRAYS[:-2]}
+    for root, tree in zip(roots, trees):
+        nodes = np.arange(tree.node_count, dtype=np.int32) + root
+        leaf = tree.children_left < 0
+        parts['feature'].append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        parts['threshold'].append(tree.threshold.astype(np.float64))
+        # (left, right) per node; leaves point at themselves, so every tree
+        # can be walked to the forest's depth
+        children = np.column_stack((tree.children_left, tree.children_right)) + root
+        parts['children'].append(np.where(leaf[:, None], nodes[:, None], children).astype(np.int32))
+        parts['missing_go_to_left'].append(tree.missing_go_to_left.astype(np.bool_))
+
+        values = tree.value[:, 0, :]
+        if output_index is None:
+            parts['leaf_value'].append(values[:, 0].astype(np.float64))
+        else:
+            totals = values.sum(axis=1)
+            parts['leaf_value'].append(values[:, output_index] / np.where(totals == 0, 1.0, totals))
+
+    forest = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+    forest['children'] = forest['children'].ravel()
+    forest['roots'] = roots
+    forest['depth'] = np.array([max(tree.max_depth for tree in trees)], dtype=np.int64)
+    return forest
+
+
+def predict(forest: Dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+    """Mean leaf value over the trees for every row of ``X`` (rows x features)."""
+    feature, threshold, children, missing_left, leaf_value, roots = (
+        np.asarray(forest[name]) for name in ARRAYS[:-1]
+    )
+    depth = int(forest['depth'][0])
+    # Rounded to float32 like scikit-learn's input, compared against float64 thresholds
+    X = np.asarray(X, dtype=np.float32).astype(np.float64)
+    has_missing = bool(np.isnan(X).any())
+
+    predictions = np.empty(len(X), dtype=np.float64)
+    block = max(1, BLOCK_NODES // len(roots))
+    for start in range(0, len(X), block):
+        rows = X[start:start + block]
+        flat_rows = rows.ravel()
+        row_offset = np.arange(len(rows), dtype=np.int64) * rows.shape[1]
+        node = np.repeat(roots[:, None], len(rows), axis=1)  # trees x rows
+        for _ in range(depth):
+            value = flat_rows[row_offset + feature[node]]
+            go_right = ~(value <= threshold[node])
+            if has_missing:
+                missing = np.isnan(value)
+                go_right[missing] = ~missing_left[node[missing]]
+            node = children[2 * node + go_right]
+        predictions[start:start + block] = leaf_value[node].mean(axis=0)
+    return predictions
@@ -0,0 +1,424 @@
+"""
+Append-only history of the fleet's state, for the History page and trend charts.
+
+Every change to a train (a save, a delete, a bulk upsert) and every induction
+run appends one ``TrainState`` row per train: its certificates, jobs, mileage,
+branding shortfall and the other ``Train`` features, the composite score and,
+for induction runs, the assignment. Rows are never updated, apart from being
+marked rolled up; they are indexed by ``(train_id, day)`` and by ``day``.
+Appending is a single INSERT and imports neither NumPy nor pandas (the score
+comes from ``fleet.scoring``), so saving a train stays cheap.
+
+Range queries read ``TrainStateDaily`` instead: one row per train and day with
+the day's last state, the number of recorded states and their score
+sum/min/max. New states are folded into it by ``roll_up_pending`` before each
+query, all of them in one pass under the ``HistoryRollup`` row lock. Weekly
+buckets are folded from the daily rows, so a year-long series reads at most
+366 rows per train however often trains change. Buckets without changes
+carry the previous state forward.
+
+Whole-fleet series read ``FleetStateDaily``: the fleet aggregates of each
+past day, stored when first queried, so a year-long fleet chart reads 365
+rows and computes only today from the train rollups.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .feature_store import FEATURES
+from .models import FleetStateDaily, HistoryRollup, TrainState, TrainStateDaily
+from .response_cache import bump_version_on_commit
+from .scoring import train_score
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ASSIGNMENTS = ('', 'service', 'standby', 'ibl')  # codes of TrainState.assignment in range queries
+BOOL_FIELDS = ('fc_rs', 'fc_sig', 'fc_tel', 'cleaning_due')
+STATE_FIELDS = ('train_id', *FEATURES)
+ROLLUP_FIELDS = (
+    'samples', 'last_recorded_at', 'removed', 'assignment', *FEATURES,
+    'score', 'score_sum', 'score_min', 'score_max'
+)
+QUERY_COLUMNS = (
+    'train_id', 'day', 'samples', 'removed', 'assignment', *FEATURES,
+    'score', 'score_sum', 'score_min', 'score_max'
+)
+RAW_COLUMNS = ('id', 'train_id', 'recorded_at', 'source', 'assignment', *FEATURES, 'score')
+ROLLUP_PK = 1
+ROLLUP_BATCH = 5000  # pending states folded per pass
+
+
+def state_of(train) -> Dict[str, Any]:
+    """The fields of a ``Train`` that ``record_states`` stores."""
+    return {name: getattr(train, name) for name in STATE_FIELDS}
+
+
+def record_states(states: List[Dict[str, Any]], source: str, assignments: Dict[str, str] = None,
+                  recorded_at: datetime = None) -> List[TrainState]:
+    """
+    Append the state of some trains; the next range query folds them into
+    the daily rollups.
+
+    Args:
+        states: Dicts with ``train_id`` and the ``Train`` feature fields (see ``state_of``)
+        source: One of ``TrainState.SOURCE_CHOICES``
+        assignments: Induction assignment by train_id, for induction runs
+        recorded_at: When the states were observed (default: now)
+
+    Returns:
+        The created TrainState rows
+    """
+    if not states:
+        return []
+    recorded_at = recorded_at or timezone.now()
+    day = timezone.localdate(recorded_at)
+    assignments = assignments or {}
+
+    rows = [
+        TrainState(
+            recorded_at=recorded_at, day=day, source=source, score=round(train_score(state), 2),
+            assignment=assignments.get(state['train_id'], ''),
+            **{name: state[name] for name in STATE_FIELDS}
+        )
+        for state in states
+    ]
+    TrainState.objects.bulk_create(rows)
+    bump_version_on_commit('history')
+    return rows
+
+
+def _lock_rollup():
+    """Lock the HistoryRollup row until the surrounding transaction ends."""
+    # An UPDATE rather than SELECT ... FOR UPDATE: it also takes SQLite's write lock up front
+    if not HistoryRollup.objects.filter(pk=ROLLUP_PK).update(rolled_up_at=timezone.now()):
+        HistoryRollup.objects.get_or_create(pk=ROLLUP_PK)
+        HistoryRollup.objects.filter(pk=ROLLUP_PK).update(rolled_up_at=timezone.now())
+
+
+def roll_up_pending():
+    """
+    Fold every state not yet rolled up into its TrainStateDaily row, in
+    recording order, and drop the stored fleet aggregates of the days they
+    change. A no-op (one query) when nothing is pending.
+    """
+    pending = TrainState.objects.filter(rolled_up=False)
+    if not pending.exists():
+        return
+    with transaction.atomic():
+        # Concurrent queries wait here, then find nothing left to fold
+        _lock_rollup()
+        first_day = None
+        while True:
+            rows = list(pending.order_by('recorded_at', 'id')[:ROLLUP_BATCH])
+            if not rows:
+                break
+            _roll_up(rows)
+            TrainState.objects.filter(id__in=[row.id for row in rows]).update(rolled_up=True)
+            day = min(row.day for row in rows)
+            first_day = day if first_day is None else min(first_day, day)
+        if first_day is not None:
+            # Fleet aggregates stored for these days or later no longer hold
+            FleetStateDaily.objects.filter(day__gte=first_day).delete()
+
+
+def _roll_up(rows: List[TrainState]):
+    """Fold states, in recording order, into their TrainStateDaily rows."""
+    keys = {(row.train_id, row.day) for row in rows}
+    # Create missing rollups first, so that every key has a row to fold into
+    TrainStateDaily.objects.bulk_create(
+        [TrainStateDaily(train_id=train_id, day=day) for train_id, day in keys], ignore_conflicts=True
+    )
+    candidates = TrainStateDaily.objects.filter(
+        day__in={day for _, day in keys}, train_id__in={train_id for train_id, _ in keys}
+    )
+    daily = {
+        (rollup.train_id, rollup.day): rollup for rollup in candidates if (rollup.train_id, rollup.day) in keys
+    }
+
+    for row in rows:
+        rollup = daily[row.train_id, row.day]
+        rollup.samples += 1
+        rollup.score_sum += row.score
+        rollup.score_min = row.score if rollup.score_min is None else min(rollup.score_min, row.score)
+        rollup.score_max = row.score if rollup.score_max is None else max(rollup.score_max, row.score)
+        if rollup.last_recorded_at is None or row.recorded_at >= rollup.last_recorded_at:
+            rollup.last_recorded_at = row.recorded_at
+            rollup.removed = row.source == TrainState.SOURCE_REMOVED
+            rollup.score = row.score
+            for name in FEATURES:
+                setattr(rollup, name, getattr(row, name))
+        if row.assignment:
+            rollup.assignment = row.assignment
+
+    # One upsert statement: bulk_update's CASE expressions cost more than the rows
+    TrainStateDaily.objects.bulk_create(
+        list(daily.values()), update_conflicts=True, unique_fields=['train_id', 'day'], update_fields=ROLLUP_FIELDS
+    )
+
+
+def _bucket_starts(start: date, end: date, interval: str) -> List[date]:
+    """First day of every bucket overlapping ``[start, end]``; weeks start on Monday."""
+    if interval == 'week':
+        first, step = start - timedelta(days=start.weekday()), timedelta(days=7)
+    else:
+        first, step = start, timedelta(days=1)
+    count = (end - first) // step + 1
+    return [first + step * index for index in range(count)]
+
+
+def _states_before(start: date, train_id: str = None) -> List[Tuple]:
+    """Each train's last daily rollup before ``start`` (``QUERY_COLUMNS``): the state carried into the range."""
+    earlier = TrainStateDaily.objects.filter(day__lt=start)
+    if train_id:
+        earlier = earlier.filter(train_id=train_id)
+    last_days = dict(earlier.values('train_id').annotate(last_day=Max('day')).values_list('train_id', 'last_day'))
+    if not last_days:
+        return []
+    rows = TrainStateDaily.objects.filter(
+        train_id__in=list(last_days), day__in=set(last_days.values())
+    ).values_list(*QUERY_COLUMNS)
+    return [row for row in rows if row[1] == last_days[row[0]]]
+
+
+def _daily_matrix(start: date, end: date, train_id: str = None) -> Tuple[List[str], Dict[str, 'np.ndarray']]:
+    """
+    Daily rollups as (trains x days) float arrays keyed by ``QUERY_COLUMNS``
+    (assignments as codes into ``ASSIGNMENTS``), plus a ``recorded`` mask.
+    Column 0 holds the state carried into the range, column ``i`` day
+    ``start + i - 1``; days without a rollup are NaN.
+    """
+    import numpy as np
+    rows = _states_before(start, train_id)
+    daily = TrainStateDaily.objects.filter(day__range=(start, end))
+    if train_id:
+        daily = daily.filter(train_id=train_id)
+    rows += daily.values_list(*QUERY_COLUMNS)
+
+    train_ids = sorted({row[0] for row in rows})
+    shape = (len(train_ids), (end - start).days + 2)
+    position = {train: index for index, train in enumerate(train_ids)}
+    columns = list(zip(*rows)) or [()] * len(QUERY_COLUMNS)
+    cells = (
+        np.array([position[train] for train in columns[0]], dtype=np.intp),
+        np.array([max((day - start).days + 1, 0) for day in columns[1]], dtype=np.intp)
+    )
+
+    matrix = {'recorded': np.zeros(shape, dtype=bool)}
+    matrix['recorded'][cells] = True
+    for name, values in zip(QUERY_COLUMNS[2:], columns[2:]):
+        if name == 'assignment':
+            values = [ASSIGNMENTS.index(value) if value in ASSIGNMENTS else 0 for value in values]
+        matrix[name] = np.full(shape, np.nan)
+        matrix[name][cells] = np.array(values, dtype=np.float64)
+    return train_ids, matrix
+
+
+def _bucket_arrays(start: date, end: date, interval: str,
+                   train_id: str = None) -> Tuple[List[date], List[str], Dict[str, 'np.ndarray']]:
+    """
+    Bucket starts, train ids and (trains x buckets) arrays: ``known`` (a state
+    was recorded by the bucket's end), the state at the bucket's end, and the
+    ``samples``, ``score_mean``/``score_min``/``score_max`` and last
+    ``assignment`` of the states recorded in the bucket (of its last state
+    when none were).
+    """
+    import numpy as np
+    starts = _bucket_starts(start, end, interval)
+    train_ids, daily = _daily_matrix(start, end, train_id)
+    width = daily['recorded'].shape[1]
+    # First and last matrix column of each bucket, the carried column 0 left out
+    firsts = np.array([max((bucket - start).days, 0) for bucket in starts], dtype=np.intp) + 1
+    lasts = np.append(firsts[1:] - 1, width - 1)
+
+    # Carry each train's last recorded state forward
+    columns = np.arange(width)
+    latest = np.maximum.accumulate(np.where(daily['recorded'], columns, -1), axis=1)[:, lasts]
+    buckets = {'known': latest >= 0}
+    latest = np.maximum(latest, 0)
+    for name in (*FEATURES, 'removed', 'score'):
+        buckets[name] = np.take_along_axis(daily[name], latest, axis=1)
+
+    in_range = {name: daily[name][:, 1:] for name in ('samples', 'score_sum', 'score_min', 'score_max')}
+    offsets = firsts - 1
+    samples = np.add.reduceat(np.nan_to_num(in_range['samples']), offsets, axis=1)
+    score_sum = np.add.reduceat(np.nan_to_num(in_range['score_sum']), offsets, axis=1)
+    recorded = samples > 0
+    buckets['samples'] = samples
+    buckets['score_mean'] = np.where(recorded, score_sum / np.where(recorded, samples, 1), buckets['score'])
+    buckets['score_min'] = np.where(recorded, np.fmin.reduceat(in_range['score_min'], offsets, axis=1),
+                                    buckets['score'])
+    buckets['score_max'] = np.where(recorded, np.fmax.reduceat(in_range['score_max'], offsets, axis=1),
+                                    buckets['score'])
+
+    # Last day in each bucket with an induction assignment
+    codes = np.nan_to_num(daily['assignment'][:, 1:]).astype(np.intp)
+    assigned = np.maximum.reduceat(np.where(codes > 0, columns[1:] - 1, -1), offsets, axis=1)
+    buckets['assignment'] = np.where(assigned >= 0, np.take_along_axis(codes, np.maximum(assigned, 0), axis=1), 0)
+    return starts, train_ids, buckets
+
+
+def _train_series(start: date, end: date, interval: str, train_id: str) -> List[Dict[str, Any]]:
+    """One train's buckets, from the first one with a known state."""
+    starts, train_ids, buckets = _bucket_arrays(start, end, interval, train_id)
+    if not train_ids:
+        return []
+    train = {name: values[0] for name, values in buckets.items()}
+    return [
+        {
+            'start': bucket_start.isoformat(),
+            'removed': bool(train['removed'][index]),
+            **{name: bool(train[name][index]) if name in BOOL_FIELDS else int(train[name][index])
+               for name in FEATURES},
+            'score': float(train['score'][index]),
+            'samples': int(train['samples'][index]),
+            'score_mean': round(float(train['score_mean'][index]), 2),
+            'score_min': float(train['score_min'][index]),
+            'score_max': float(train['score_max'][index]),
+            'assignment': ASSIGNMENTS[train['assignment'][index]],
+        }
+        for index, bucket_start in enumerate(starts) if train['known'][index]
+    ]
+
+
+def _compute_fleet_days(start: date, end: date) -> List[FleetStateDaily]:
+    """Whole-fleet aggregates of every day in ``[start, end]``, over the trains not removed."""
+    import numpy as np
+    starts, train_ids, buckets = _bucket_arrays(start, end, 'day')
+    if not train_ids:
+        return [FleetStateDaily(day=day, trains=0, samples=0, certified=0, cleaning_due=0, open_jobs=0,
+                                branding_shortfall=0) for day in starts]
+
+    active = buckets['known'] & (buckets['removed'] == 0)
+    trains = active.sum(axis=0)
+    certified = (buckets['fc_rs'] > 0) & (buckets['fc_sig'] > 0) & (buckets['fc_tel'] > 0)
+
+    def total(values):
+        return np.where(active, values, 0).sum(axis=0)
+
+    def mean(values):
+        return total(values) / np.maximum(trains, 1)
+
+    fleet = {
+        'samples': total(buckets['samples']),
+        'certified': total(certified),
+        'cleaning_due': total(buckets['cleaning_due']),
+        'open_jobs': total(buckets['open_jobs']),
+        'branding_shortfall': total(buckets['branding_shortfall']),
+        'mileage_km_mean': mean(buckets['mileage_km']),
+        'score_mean': mean(buckets['score_mean']),
+        'score_min': np.where(active, buckets['score_min'], np.inf).min(axis=0),
+        'score_max': np.where(active, buckets['score_max'], -np.inf).max(axis=0),
+    }
+    days = []
+    for index, day in enumerate(starts):
+        counts = {name: int(fleet[name][index])
+                  for name in ('samples', 'certified', 'cleaning_due', 'open_jobs', 'branding_shortfall')}
+        if not trains[index]:
+            days.append(FleetStateDaily(day=day, trains=0, **counts))
+            continue
+        codes, code_counts = np.unique(buckets['assignment'][active[:, index], index], return_counts=True)
+        days.append(FleetStateDaily(
+            day=day, trains=int(trains[index]), **counts,
+            mileage_km_mean=round(float(fleet['mileage_km_mean'][index]), 1),
+            score_mean=round(float(fleet['score_mean'][index]), 2),
+            score_min=float(fleet['score_min'][index]),
+            score_max=float(fleet['score_max'][index]),
+            assignments={ASSIGNMENTS[code]: int(count) for code, count in zip(codes, code_counts) if code}
+        ))
+    return days
+
+
+def fleet_days(start: date, end: date) -> List[FleetStateDaily]:
+    """
+    Whole-fleet aggregates of every day in ``[start, end]``. Past days are
+    stored when first computed; ``roll_up_pending`` drops the stored days a
+    backdated state changes. Today and later are always computed.
+    """
+    roll_up_pending()
+    today = timezone.localdate()
+    stored = {row.day: row for row in FleetStateDaily.objects.filter(day__range=(start, end))}
+    missing = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    missing = [day for day in missing if day not in stored]
+    if missing:
+        computed = _compute_fleet_days(missing[0], end)
+        FleetStateDaily.objects.bulk_create(
+            [row for row in computed if row.day < today and row.day not in stored], ignore_conflicts=True
+        )
+        stored.update((row.day, row) for row in computed if row.day not in stored)
+    return [stored[day] for day in sorted(stored)]
+
+
+def _fleet_bucket(bucket_start: date, days: List[FleetStateDaily]) -> Dict[str, Any]:
+    """Fold a bucket's fleet days: the state at its last day, the other aggregates over all of them."""
+    last = days[-1]
+    assigned = [day.assignments for day in days if day.assignments]
+    return {
+        'start': bucket_start.isoformat(),
+        'trains': last.trains,
+        'samples': sum(day.samples for day in days),
+        'certified': last.certified,
+        'cleaning_due': last.cleaning_due,
+        'open_jobs': last.open_jobs,
+        'branding_shortfall': last.branding_shortfall,
+        'mileage_km_mean': last.mileage_km_mean,
+        'score_mean': round(sum(day.score_mean for day in days) / len(days), 2),
+        'score_min': min(day.score_min for day in days),
+        'score_max': max(day.score_max for day in days),
+        'assignments': assigned[-1] if assigned else {},
+    }
+
+
+def state_history(start: date, end: date, interval: str = 'day', train_id: str = None) -> List[Dict[str, Any]]:
+    """
+    Downsampled state history over ``[start, end]``.
+
+    Args:
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        interval: 'day' or 'week' (Monday-based) buckets
+        train_id: One train's buckets; otherwise whole-fleet aggregates per bucket
+
+    Returns:
+        Buckets in time order, from the first one with a known state. A
+        train's bucket holds its last state, the number of states recorded in
+        it (0 when carried forward) and their score mean/min/max. A fleet
+        bucket holds, over the trains not removed, the counts and totals at
+        its last day, the states recorded in it, the mean of its daily score
+        means, the score extremes and the latest induction assignments.
+    """
+    if interval not in ('day', 'week'):
+        raise ValueError(f'Unknown interval: {interval}')
+    if train_id:
+        roll_up_pending()
+        return _train_series(start, end, interval, train_id)
+
+    buckets = defaultdict(list)
+    for day in fleet_days(start, end):
+        if day.trains:
+            bucket_start = day.day - timedelta(days=day.day.weekday()) if interval == 'week' else day.day
+            buckets[bucket_start].append(day)
+    return [_fleet_bucket(bucket_start, days) for bucket_start, days in buckets.items()]
+
+
+def raw_states(start: date, end: date, train_id: str = None, cursor: int = None,
+               limit: int = 1000) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Recorded states over ``[start, end]`` in recording order, one page at a time.
+
+    Returns:
+        ``(states, next_cursor)``; pass ``next_cursor`` back for the next page
+    """
+    states = TrainState.objects.filter(day__range=(start, end))
+    if train_id:
+        states = states.filter(train_id=train_id)
+    if cursor is not None:
+        states = states.filter(id__gt=cursor)
+    page = list(states.order_by('id').values(*RAW_COLUMNS)[:limit + 1])
+    next_cursor = page[limit - 1]['id'] if len(page) > limit else None
+    return page[:limit], next_cursor
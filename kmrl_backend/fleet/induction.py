@@ -0,0 +1,197 @@
+"""
+Nightly induction plan solver.
+
+Assigns every trainset to revenue service, standby or the inspection bay
+line (IBL) so that the fleet-level targets are met and the total suitability
+of the plan is maximal, subject to the hard rules from the Rules page:
+
+- Fitness certificates (rolling stock, signalling, telecom) must all be valid
+  for service or standby.
+- Open job-cards block service and standby until closed.
+- Trains due for deep-cleaning can only be inducted if a cleaning bay slot is
+  free; bays are limited to ``cleaning_capacity``.
+
+Branding exposure, mileage balancing and stabling geometry enter the
+objective: per-train values come from the ``TrainOptimizationModel``
+composite score, with a branding bonus for service and a mileage-relief
+bonus for standby. The assignment is solved exactly as a small 0/1 program.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from .ml_models import (
+    DEFAULT_SCORE_WEIGHTS, MILEAGE_TOLERANCE, TARGET_MILEAGE,
+    combine_sub_scores, compute_sub_scores
+)
+
+SERVICE = 'service'
+STANDBY = 'standby'
+IBL = 'ibl'
+
+FEATURE_COLUMNS = [
+    'train_id', 'fc_rs', 'fc_sig', 'fc_tel', 'open_jobs', 'branding_shortfall',
+    'mileage_km', 'cleaning_due', 'stabling_penalty'
+]
+
+
+@dataclass
+class InductionTargets:
+    """Fleet-level targets for one induction run."""
+    service: int
+    standby: int = 0
+    cleaning_capacity: int = None  # None: unlimited
+    weights: Dict[str, float] = None  # overrides for DEFAULT_SCORE_WEIGHTS
+    branding_weight: float = 2.0  # service bonus points per hour of branding shortfall (capped at 10 h)
+    mileage_relief_weight: float = 10.0  # standby bonus points for trains at or above target + tolerance
+    target_mileage: float = TARGET_MILEAGE
+
+    def validate(self):
+        if self.service < 0 or self.standby < 0:
+            raise ValueError('service and standby targets must be non-negative')
+        if self.cleaning_capacity is not None and self.cleaning_capacity < 0:
+            raise ValueError('cleaning_capacity must be non-negative')
+        unknown = set(self.weights or {}) - set(DEFAULT_SCORE_WEIGHTS)
+        if unknown:
+            raise ValueError(f'Unknown score weights: {sorted(unknown)}')
+
+
+def _block_reasons(fleet: pd.DataFrame) -> List[List[str]]:
+    reasons = []
+    for fc_rs, fc_sig, fc_tel, open_jobs in zip(fleet['fc_rs'], fleet['fc_sig'], fleet['fc_tel'], fleet['open_jobs']):
+        train_reasons = []
+        if not fc_rs:
+            train_reasons.append('Rolling-Stock FC missing')
+        if not fc_sig:
+            train_reasons.append('Signalling FC missing')
+        if not fc_tel:
+            train_reasons.append('Telecom FC missing')
+        if open_jobs > 0:
+            train_reasons.append(f'{open_jobs} open job-card(s)')
+        reasons.append(train_reasons)
+    return reasons
+
+
+def solve_induction_plan(fleet: pd.DataFrame, targets: InductionTargets) -> Dict[str, Any]:
+    """
+    Solve the induction plan for a fleet.
+
+    Args:
+        fleet: One row per train with the ``Train`` model's feature columns
+        targets: Service/standby counts, cleaning bay capacity and weights
+
+    Returns:
+        Dictionary with ``assignments`` (one entry per train, with reasons)
+        and ``summary`` (targets, filled counts, objective and solve time)
+    """
+    targets.validate()
+    started = time.perf_counter()
+
+    fleet = fleet.reset_index(drop=True)
+    n = len(fleet)
+    weights = {**DEFAULT_SCORE_WEIGHTS, **(targets.weights or {})}
+
+    scores = combine_sub_scores(compute_sub_scores(fleet, targets.target_mileage), weights)
+    branding = np.minimum(np.asarray(fleet['branding_shortfall'], dtype=np.float64), 10)
+    mileage_excess = np.asarray(fleet['mileage_km'], dtype=np.float64) - targets.target_mileage
+    mileage_relief = np.clip(mileage_excess / MILEAGE_TOLERANCE, 0, 1)
+
+    service_value = scores + targets.branding_weight * branding
+    standby_value = scores + targets.mileage_relief_weight * mileage_relief
+
+    block_reasons = _block_reasons(fleet)
+    eligible = np.array([not reasons for reasons in block_reasons], dtype=bool)
+    cleaning_due = np.asarray(fleet['cleaning_due'], dtype=bool)
+
+    cleaning_capacity = n if targets.cleaning_capacity is None else targets.cleaning_capacity
+    available = int((eligible & ~cleaning_due).sum()) + min(int((eligible & cleaning_due).sum()), cleaning_capacity)
+    service_filled = min(targets.service, available)
+    standby_filled = min(targets.standby, available - service_filled)
+
+    assignment = np.full(n, IBL, dtype=object)
+    objective = 0.0
+    if n and service_filled + standby_filled:
+        # x = [service_0..service_n-1, standby_0..standby_n-1]
+        cost = -np.concatenate([service_value, standby_value])
+        one_role = np.hstack([np.eye(n), np.eye(n)])
+        counts = np.vstack([
+            np.concatenate([np.ones(n), np.zeros(n)]),
+            np.concatenate([np.zeros(n), np.ones(n)]),
+        ])
+        cleaning = np.concatenate([cleaning_due, cleaning_due]).astype(np.float64)[None, :]
+        constraints = [
+            LinearConstraint(one_role, 0, 1),
+            LinearConstraint(counts, [service_filled, standby_filled], [service_filled, standby_filled]),
+            LinearConstraint(cleaning, 0, cleaning_capacity),
+        ]
+        upper = np.concatenate([eligible, eligible]).astype(np.float64)
+        result = milp(cost, constraints=constraints, integrality=np.ones(2 * n),
+                      bounds=Bounds(np.zeros(2 * n), upper))
+        if not result.success:
+            raise ValueError(f'Induction plan could not be solved: {result.message}')
+
+        chosen = np.round(result.x).astype(bool)
+        assignment[chosen[:n]] = SERVICE
+        assignment[chosen[n:]] = STANDBY
+        objective = float(-result.fun)
+
+    # Per-train explanations
+    cleaning_slots_used = int((cleaning_due & (assignment != IBL)).sum())
+    assignments = []
+    for idx in range(n):
+        row = fleet.iloc[idx]
+        role = assignment[idx]
+        reasons = []
+        if role == SERVICE:
+            reasons.append('All fitness certificates valid and no open job-cards')
+            if branding[idx] > 0:
+                reasons.append(f'{int(row["branding_shortfall"])}h branding shortfall prioritised for exposure')
+        elif role == STANDBY:
+            reasons.append('Eligible for service; held as standby')
+            if mileage_relief[idx] > 0:
+                reasons.append(f'Mileage {int(mileage_excess[idx])} km above target, resting reduces wear')
+        elif block_reasons[idx]:
+            reasons.extend(block_reasons[idx])
+        elif cleaning_due[idx] and cleaning_slots_used >= cleaning_capacity:
+            reasons.append('Deep-clean due and no cleaning bay slot available')
+        else:
+            reasons.append('Surplus to service and standby targets')
+
+        if role != IBL and cleaning_due[idx]:
+            reasons.append('Deep-clean due; cleaning bay slot allocated')
+        if row['stabling_penalty'] > 20:
+            reasons.append('Unfavourable stabling position')
+
+        assignments.append({
+            'train_id': row['train_id'],
+            'assignment': role,
+            'score': round(float(scores[idx]), 2),
+            'cleaning_slot': bool(role != IBL and cleaning_due[idx]),
+            'reasons': reasons
+        })
+
+    role_order = {SERVICE: 0, STANDBY: 1, IBL: 2}
+    assignments.sort(key=lambda item: (role_order[item['assignment']], -item['score'], item['train_id']))
+
+    return {
+        'assignments': assignments,
+        'summary': {
+            'trains': n,
+            'service_target': targets.service,
+            'standby_target': targets.standby,
+            'service_assigned': service_filled,
+            'standby_assigned': standby_filled,
+            'service_shortfall': targets.service - service_filled,
+            'standby_shortfall': targets.standby - standby_filled,
+            'ibl_assigned': n - service_filled - standby_filled,
+            'cleaning_capacity': targets.cleaning_capacity,
+            'cleaning_slots_used': cleaning_slots_used,
+            'objective': round(objective, 4),
+            'solve_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+    }
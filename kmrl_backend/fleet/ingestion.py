@@ -0,0 +1,336 @@
+"""
+Bulk CSV ingestion engine for R.O.P.S.
+Writes CSV rows in batches inside a single transaction per upload.
+
+Every row is hashed on the way in, and the upload gets a content hash over
+its headers and row hashes. Re-sending a feed that is already stored for the
+same data source is a no-op that returns the existing upload.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .models import CSVDataSource, CSVUpload, CSVDataRow
+
+DEFAULT_BATCH_SIZE = 1000
+INGEST_METHODS = ('auto', 'bulk', 'copy')
+STREAM_CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def row_hash(row_data: Dict[str, Any]) -> str:
+    """Content hash of one row, independent of key order."""
+    canonical = json.dumps(row_data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def extract_train_id(row_data: Dict[str, Any]) -> str:
+    """Value of the row's ``train_id`` key as stored in ``CSVDataRow.train_id`` ('' if absent)."""
+    train_id = row_data.get('train_id')
+    return '' if train_id is None else str(train_id)[:64]
+
+
+class UploadHasher:
+    """Builds an upload's content hash from its headers and row hashes, in order."""
+
+    def __init__(self, headers: List[str]):
+        self._digest = hashlib.sha256(json.dumps(headers, separators=(',', ':')).encode())
+
+    def update(self, row_hash_hex: str):
+        self._digest.update(row_hash_hex.encode())
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class DuplicateUpload(Exception):
+    """Raised inside the ingest transaction to roll back a copy of an existing upload."""
+
+    def __init__(self, upload: CSVUpload):
+        super().__init__(f'Upload {upload.id} has the same content')
+        self.upload = upload
+
+
+@dataclass
+class IngestionResult:
+    """Outcome of a single upload ingestion."""
+    upload: CSVUpload
+    row_count: int
+    elapsed: float
+    duplicate: bool = False  # True if the content was already stored; ``upload`` is the existing one
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return float(self.row_count)
+        return self.row_count / self.elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'upload_id': self.upload.id,
+            'row_count': self.row_count,
+            'elapsed_seconds': round(self.elapsed, 4),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'duplicate': self.duplicate,
+        }
+
+
+class CSVIngestionEngine:
+    """
+    Stores an upload and its rows atomically.
+
+    Rows are written in batches of ``batch_size`` using ``bulk_create``, or
+    PostgreSQL ``COPY`` when the method is ``copy`` (or ``auto`` on PostgreSQL).
+    With ``storage='columnar'`` the rows go to typed column files instead
+    (see ``fleet.columnar``). Any failure rolls back the whole upload,
+    including the ``CSVUpload`` record.
+    """
+
+    def __init__(self, batch_size: int = None, method: str = None, storage: str = None):
+        if batch_size is None or batch_size == '':
+            batch_size = getattr(settings, 'CSV_INGEST_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.method = method or getattr(settings, 'CSV_INGEST_METHOD', 'auto')
+        self.storage = storage or getattr(settings, 'CSV_STORAGE_FORMAT', CSVUpload.STORAGE_ROWS)
+
+        try:
+            self.batch_size = int(batch_size)
+        except (TypeError, ValueError):
+            raise ValueError(f'batch_size must be a positive integer, got {batch_size!r}')
+        if self.batch_size < 1:
+            raise ValueError(f'batch_size must be a positive integer, got {batch_size!r}')
+        if self.method not in INGEST_METHODS:
+            raise ValueError(f'Unknown ingest method: {self.method}. Available methods: {list(INGEST_METHODS)}')
+        if self.storage not in dict(CSVUpload.STORAGE_CHOICES):
+            raise ValueError(f'Unknown storage format: {self.storage}. Available formats: {list(dict(CSVUpload.STORAGE_CHOICES))}')
+
+    def ingest(self, source_name: str, filename: str, headers: List[str],
+               rows: Iterable[Dict[str, Any]]) -> IngestionResult:
+        """
+        Ingest one CSV upload.
+
+        An upload whose content hash matches an upload already stored for the
+        same source is not stored again; the result then has ``duplicate`` set
+        and refers to the existing upload. Rows given as a sequence are hashed
+        before anything is written; streamed rows are written as they arrive
+        and rolled back if they turn out to be a duplicate.
+
+        Args:
+            source_name: Name of the data source (created if missing)
+            filename: Original file name
+            headers: Column headers
+            rows: Iterable of row dicts; consumed lazily, one batch at a time
+
+        Returns:
+            IngestionResult with the stored upload and throughput
+        """
+        started = time.perf_counter()
+
+        hasher = UploadHasher(headers)
+        row_hashes = None
+        if isinstance(rows, Sequence):
+            row_hashes = [row_hash(row_data) for row_data in rows]
+            for row_hash_hex in row_hashes:
+                hasher.update(row_hash_hex)
+
+            existing = CSVUpload.objects.filter(
+                source__name=source_name, content_hash=hasher.hexdigest()
+            ).order_by('id').first()
+            if existing:
+                return self._duplicate_result(existing, started)
+
+        try:
+            with transaction.atomic():
+                upload, row_count = self._store(source_name, filename, headers, rows, hasher, row_hashes)
+        except DuplicateUpload as duplicate:
+            return self._duplicate_result(duplicate.upload, started)
+        except IntegrityError:
+            # A concurrent request stored the same content first
+            existing = CSVUpload.objects.filter(
+                source__name=source_name, content_hash=hasher.hexdigest()
+            ).order_by('id').first()
+            if existing is None:
+                raise
+            return self._duplicate_result(existing, started)
+
+        return IngestionResult(upload=upload, row_count=row_count, elapsed=time.perf_counter() - started)
+
+    def _store(self, source_name: str, filename: str, headers: List[str], rows: Iterable[Dict[str, Any]],
+               hasher: UploadHasher, row_hashes: List[str] = None) -> Tuple[CSVUpload, int]:
+        data_source, _ = CSVDataSource.objects.get_or_create(
+            name=source_name,
+            defaults={'description': f'Data source for {source_name}'}
+        )
+        upload = CSVUpload.objects.create(
+            source=data_source,
+            filename=filename,
+            row_count=0,
+            headers=headers,
+            storage_format=self.storage
+        )
+
+        if row_hashes is None:
+            # Hash streamed rows as they are consumed; each batch's hashes go out with its rows
+            hashed_rows = self._hash_rows(rows, hasher)
+        else:
+            hashed_rows = zip(rows, row_hashes)
+
+        if self.storage == CSVUpload.STORAGE_COLUMNAR:
+            from . import columnar  # NumPy/pandas, only needed for columnar storage
+            try:
+                row_count = columnar.write_upload(upload, headers, hashed_rows, chunk_size=self.batch_size)
+                self._finish(upload, data_source, row_count, hasher, ['row_count', 'data_path', 'content_hash'])
+            except Exception:
+                columnar.delete_upload(upload)
+                raise
+        else:
+            row_count = self._write_hashed_rows(upload, hashed_rows)
+            self._finish(upload, data_source, row_count, hasher, ['row_count', 'content_hash'])
+
+        return upload, row_count
+
+    def _finish(self, upload: CSVUpload, data_source: CSVDataSource, row_count: int,
+                hasher: UploadHasher, update_fields: List[str]):
+        upload.row_count = row_count
+        upload.content_hash = hasher.hexdigest()
+
+        existing = CSVUpload.objects.filter(
+            source=data_source, content_hash=upload.content_hash
+        ).exclude(id=upload.id).order_by('id').first()
+        if existing:
+            raise DuplicateUpload(existing)
+
+        upload.save(update_fields=update_fields)
+
+    @staticmethod
+    def _hash_rows(rows: Iterable[Dict[str, Any]], hasher: UploadHasher) -> Iterator[Tuple[Dict[str, Any], str]]:
+        for row_data in rows:
+            row_hash_hex = row_hash(row_data)
+            hasher.update(row_hash_hex)
+            yield row_data, row_hash_hex
+
+    @staticmethod
+    def _duplicate_result(upload: CSVUpload, started: float) -> IngestionResult:
+        return IngestionResult(upload=upload, row_count=upload.row_count,
+                               elapsed=time.perf_counter() - started, duplicate=True)
+
+    def write_rows(self, upload: CSVUpload, rows: Iterable[Dict[str, Any]], row_hashes: Iterable[str] = None) -> int:
+        """
+        Write rows for an existing upload in batches. Returns the number of rows written.
+
+        ``row_hashes`` are the rows' content hashes, in order; without them
+        the rows are hashed here.
+        """
+        if row_hashes is None:
+            return self._write_hashed_rows(upload, ((row_data, row_hash(row_data)) for row_data in rows))
+        return self._write_hashed_rows(upload, zip(rows, row_hashes))
+
+    def _write_hashed_rows(self, upload: CSVUpload, hashed_rows: Iterable[Tuple[Dict[str, Any], str]]) -> int:
+        write_batch = self._copy_batch if self.uses_copy() else self._bulk_create_batch
+
+        row_count = 0
+        batch, hashes = [], []
+        for row_data, row_hash_hex in hashed_rows:
+            batch.append(row_data)
+            hashes.append(row_hash_hex)
+            if len(batch) >= self.batch_size:
+                write_batch(upload, batch, hashes, row_count)
+                row_count += len(batch)
+                batch, hashes = [], []
+
+        if batch:
+            write_batch(upload, batch, hashes, row_count)
+            row_count += len(batch)
+
+        return row_count
+
+    def uses_copy(self) -> bool:
+        if self.method == 'bulk':
+            return False
+        if connection.vendor != 'postgresql':
+            if self.method == 'copy':
+                raise ValueError('COPY ingestion requires a PostgreSQL database')
+            return False
+        return True
+
+    def _bulk_create_batch(self, upload: CSVUpload, batch: List[Dict[str, Any]], hashes: List[str], offset: int):
+        CSVDataRow.objects.bulk_create([
+            CSVDataRow(upload=upload, row_data=row_data, row_index=offset + idx, row_hash=row_hash_hex,
+                       train_id=extract_train_id(row_data))
+            for idx, (row_data, row_hash_hex) in enumerate(zip(batch, hashes))
+        ], batch_size=self.batch_size)
+
+    def _copy_batch(self, upload: CSVUpload, batch: List[Dict[str, Any]], hashes: List[str], offset: int):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for idx, (row_data, row_hash_hex) in enumerate(zip(batch, hashes)):
+            writer.writerow([upload.id, json.dumps(row_data), offset + idx, row_hash_hex, extract_train_id(row_data)])
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(CSVDataRow._meta.db_table)
+        sql = f'COPY {table} (upload_id, row_data, row_index, row_hash, train_id) FROM STDIN WITH (FORMAT csv)'
+
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy_expert'):
+                # psycopg2
+                raw_cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+class _RawStream(io.RawIOBase):
+    """Adapts any object with ``read(size)`` (e.g. an HttpRequest) to the io stack."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_csv_stream(stream, encoding: str = 'utf-8-sig') -> Tuple[List[str], Iterator[Dict[str, str]]]:
+    """
+    Open a binary CSV stream, gzip'd or plain, for incremental parsing.
+
+    The stream is read in chunks of ``STREAM_CHUNK_SIZE`` bytes; gzip input is
+    detected from its magic number. Rows are yielded as dicts keyed by header,
+    matching the JSON payload the frontend importer sends: missing cells become
+    empty strings and blank records are skipped.
+
+    Args:
+        stream: Binary file-like object with a ``read(size)`` method
+        encoding: Text encoding of the CSV data
+
+    Returns:
+        Tuple of (headers, row iterator). Headers are empty for an empty stream.
+    """
+    binary = io.BufferedReader(_RawStream(stream), buffer_size=STREAM_CHUNK_SIZE)
+    if binary.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+        binary = gzip.GzipFile(fileobj=binary, mode='rb')
+
+    reader = csv.reader(io.TextIOWrapper(binary, encoding=encoding, newline=''))
+    headers = next(reader, [])
+
+    def rows() -> Iterator[Dict[str, str]]:
+        for record in reader:
+            if not any(record):
+                continue
+            yield {header: (record[idx] if idx < len(record) else '') for idx, header in enumerate(headers)}
+
+    return headers, rows()
@@ -0,0 +1,253 @@
+"""
+Background executor for ML training sessions.
+
+Training runs in a local ``concurrent.futures`` pool (processes by default,
+threads with ``ML_TRAINING_EXECUTOR = 'thread'``), so no external broker is
+needed. Job state lives in ``MLTrainingSession``, which lets any worker
+process answer status polls and cancel requests.
+
+A process refreshes ``heartbeat_at`` of the sessions it has queued or is
+running. Sessions whose heartbeat stopped for ``ML_TRAINING_STALE_SECONDS``
+(their API worker exited or crashed) are marked failed when the next job is
+admitted, so they no longer count against ``ML_TRAINING_MAX_PENDING``.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Dict, Optional, Set
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MLTrainingSession, TrainingQueue
+from .response_cache import bump_version_on_commit
+from .training import TERMINAL_STATUSES, TrainingCancelled, run_training_session
+
+DEFAULT_MAX_WORKERS = 1
+DEFAULT_MAX_PENDING = 4
+DEFAULT_HEARTBEAT_SECONDS = 30
+DEFAULT_STALE_SECONDS = 300
+ACTIVE_STATUSES = ('pending', 'training')
+QUEUE_PK = 1
+
+_executor = None
+_futures: Dict[int, Future] = {}
+_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _run_job(training_session_id: int) -> str:
+    """Executor entry point. Returns the final session status."""
+    try:
+        run_training_session(training_session_id)
+        return 'completed'
+    except TrainingCancelled:
+        return 'cancelled'
+    except Exception:
+        return 'failed'
+    finally:
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            max_workers = getattr(settings, 'ML_TRAINING_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+            if getattr(settings, 'ML_TRAINING_EXECUTOR', 'process') == 'thread':
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ml-training')
+            else:
+                # spawn: children must not inherit the parent's open DB connections
+                _executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+        return _executor
+
+
+class Heartbeat:
+    """
+    Refreshes ``heartbeat_at`` of this process's queued and running sessions
+    from one daemon thread, started with the first session.
+    """
+
+    def __init__(self):
+        self._ids: Set[int] = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, training_session_id: int):
+        with self._lock:
+            self._ids.add(training_session_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ml-training-heartbeat', daemon=True)
+                self._thread.start()
+
+    def discard(self, training_session_id: int):
+        with self._lock:
+            self._ids.discard(training_session_id)
+
+    @contextmanager
+    def beating(self, training_session_id: int):
+        """Keep the session's heartbeat fresh for the duration of the block."""
+        self.add(training_session_id)
+        try:
+            yield
+        finally:
+            self.discard(training_session_id)
+
+    def beat(self) -> int:
+        with self._lock:
+            ids = list(self._ids)
+        if not ids:
+            return 0
+        return MLTrainingSession.objects.filter(
+            id__in=ids, status__in=ACTIVE_STATUSES
+        ).update(heartbeat_at=timezone.now())
+
+    def _run(self):
+        while True:
+            time.sleep(getattr(settings, 'ML_TRAINING_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS))
+            try:
+                self.beat()
+            except DatabaseError:
+                pass  # Retried on the next beat; a session only goes stale after several misses
+            finally:
+                connections.close_all()
+
+
+heartbeat = Heartbeat()
+
+
+def active_job_count() -> int:
+    """Pending or running sessions across all API workers."""
+    return MLTrainingSession.objects.filter(status__in=ACTIVE_STATUSES).count()
+
+
+def reap_stale_sessions() -> int:
+    """
+    Mark pending or running sessions failed whose heartbeat (or, before the
+    first beat, start) is older than ``ML_TRAINING_STALE_SECONDS``.
+
+    Returns:
+        Number of sessions marked failed
+    """
+    stale_seconds = getattr(settings, 'ML_TRAINING_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=stale_seconds)
+    reaped = MLTrainingSession.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status__in=ACTIVE_STATUSES
+    ).update(
+        status='failed',
+        error=f'Training worker stopped responding for over {stale_seconds} seconds',
+        completed_at=now
+    )
+    if reaped:
+        bump_version_on_commit('ml_models')
+    return reaped
+
+
+def _lock_queue():
+    """Lock the TrainingQueue row until the surrounding transaction ends."""
+    # An UPDATE rather than SELECT ... FOR UPDATE: it also takes SQLite's write lock up front
+    if not TrainingQueue.objects.filter(pk=QUEUE_PK).update(admitted_at=timezone.now()):
+        TrainingQueue.objects.get_or_create(pk=QUEUE_PK)
+        TrainingQueue.objects.filter(pk=QUEUE_PK).update(admitted_at=timezone.now())
+
+
+def enqueue_training(create: Callable[[], MLTrainingSession]) -> Optional[MLTrainingSession]:
+    """
+    Create a pending session with ``create`` and queue it for background
+    execution, unless ``ML_TRAINING_MAX_PENDING`` sessions are already
+    pending or running.
+
+    Stale sessions are reaped first. Counting and creating happen under the
+    TrainingQueue row lock, so concurrent requests cannot both take the last
+    slot.
+
+    Returns:
+        The queued session, or None if the queue is full
+    """
+    max_pending = getattr(settings, 'ML_TRAINING_MAX_PENDING', DEFAULT_MAX_PENDING)
+    with transaction.atomic():
+        _lock_queue()
+        reap_stale_sessions()
+        if active_job_count() >= max_pending:
+            return None
+        training_session = create()
+    submit_training(training_session.id)
+    return training_session
+
+
+def _on_done(training_session_id: int, future: Future):
+    with _lock:
+        _futures.pop(training_session_id, None)
+    heartbeat.discard(training_session_id)
+
+    # A crashed worker process never gets to record its own failure
+    if future.cancelled() or future.exception() is not None:
+        try:
+            MLTrainingSession.objects.filter(
+                id=training_session_id
+            ).exclude(status__in=TERMINAL_STATUSES).update(
+                status='failed',
+                error=str(future.exception()) if not future.cancelled() else 'Job was cancelled before it started',
+                completed_at=timezone.now()
+            )
+        finally:
+            connections.close_all()
+
+
+def submit_training(training_session_id: int) -> Future:
+    """Queue a pending training session for background execution."""
+    heartbeat.add(training_session_id)
+    future = get_executor().submit(_run_job, training_session_id)
+    with _lock:
+        _futures[training_session_id] = future
+    future.add_done_callback(lambda f: _on_done(training_session_id, f))
+    return future
+
+
+def cancel_training(training_session: MLTrainingSession) -> bool:
+    """
+    Cancel a pending or running training session.
+
+    Queued jobs are dropped from this process's pool; running jobs (in any
+    worker) stop at their next progress checkpoint.
+
+    Returns:
+        False if the session had already finished
+    """
+    updated = MLTrainingSession.objects.filter(
+        id=training_session.id,
+        status__in=ACTIVE_STATUSES
+    ).update(status='cancelled', completed_at=timezone.now())
+    if updated:
+        bump_version_on_commit('ml_models')
+
+    with _lock:
+        future = _futures.get(training_session.id)
+    if future is not None:
+        future.cancel()
+
+    return bool(updated)
+
+
+def shutdown(wait: bool = True):
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from fleet.benchmarks import SCALES, BenchmarkSuite, compare_to_baseline
+
+
+class Command(BaseCommand):
+    help = 'Run the fleet backend performance benchmarks in a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', action='append', choices=list(SCALES),
+                            help='Scale to run (repeatable, default: small)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (best is kept)')
+        parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory pass')
+        parser.add_argument('--output', default='benchmark_results.json', help='Where to write the JSON results')
+        parser.add_argument('--baseline', help='Baseline JSON to compare against; regressions fail the command')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed fractional slowdown / memory growth versus the baseline')
+        parser.add_argument('--min-seconds', type=float, default=0.005,
+                            help='Ignore slowdowns smaller than this many seconds (timer noise)')
+
+    def handle(self, *args, **options):
+        scales = options['scale'] or ['small']
+        reports = {}
+
+        for scale in scales:
+            self.stdout.write(f'Running {scale} benchmarks...')
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                suite = BenchmarkSuite(scale=scale, repeat=options['repeat'], memory=not options['no_memory'])
+                reports[scale] = suite.run()
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+            for name, result in reports[scale]['results'].items():
+                peak = result['peak_memory_bytes']
+                peak_text = f"{peak / 1024 / 1024:8.1f} MiB" if peak is not None else '       n/a'
+                self.stdout.write(f"  {name:52s} {result['seconds'] * 1000:10.2f} ms {result['queries']:6d} queries {peak_text}")
+
+        with open(options['output'], 'w') as output_file:
+            json.dump(reports, output_file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+            regressions = []
+            for scale, report in reports.items():
+                if scale in baseline:
+                    regressions.extend(f'[{scale}] {message}' for message in
+                                       compare_to_baseline(report, baseline[scale], options['tolerance'],
+                                                           options['min_seconds']))
+
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
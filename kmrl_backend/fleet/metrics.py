@@ -0,0 +1,184 @@
+"""
+In-process request performance metrics, rendered in Prometheus text format.
+
+``PerformanceMetricsMiddleware`` records one observation per sampled request;
+code inside a request can attribute time to named stages (e.g. ``pandas`` or
+``model``) with ``timed``. Metrics are per process: with several gunicorn
+workers, each worker reports its own series.
+
+SQL queries are attributed through a context variable rather than a
+per-connection wrapper: under ASGI, async views run their ORM calls on
+executor threads with their own connections, and the request context
+follows them there.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('stage_timings', default=None)
+_query_stats: ContextVar[Optional[Dict[str, float]]] = ContextVar('query_stats', default=None)
+
+
+@contextmanager
+def timed(stage: str):
+    """Attribute the enclosed time to ``stage`` of the current request, if it is being measured."""
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def start_request_timings() -> Tuple[Dict[str, float], object]:
+    timings = {}
+    return timings, _stage_timings.set(timings)
+
+
+def end_request_timings(token):
+    _stage_timings.reset(token)
+
+
+def start_query_stats() -> Tuple[Dict[str, float], object]:
+    stats = {'queries': 0, 'seconds': 0.0}
+    return stats, _query_stats.set(stats)
+
+
+def end_query_stats(token):
+    _query_stats.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries and their time against the current request, if measured."""
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats['queries'] += 1
+        stats['seconds'] += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver: attach ``record_query`` to every new connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-view request metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+            self.db_seconds = defaultdict(float)
+            self.response_bytes = defaultdict(int)
+            self.stage_seconds = defaultdict(float)
+
+    def observe(self, view: str, method: str, status: int, duration: float, query_count: int,
+                db_seconds: float, response_bytes: int, stages: Dict[str, float]):
+        labels = (view, method, str(status))
+        with self._lock:
+            self.latency[labels].observe(duration)
+            self.queries[view].observe(query_count)
+            self.db_seconds[view] += db_seconds
+            self.response_bytes[view] += response_bytes
+            for stage, seconds in stages.items():
+                self.stage_seconds[(view, stage)] += seconds
+
+    def render(self, sample_rate: float) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = [
+            '# HELP kmrl_metrics_sample_rate Fraction of requests that are measured',
+            '# TYPE kmrl_metrics_sample_rate gauge',
+            f'kmrl_metrics_sample_rate {sample_rate}',
+        ]
+        with self._lock:
+            lines += [
+                '# HELP kmrl_http_request_duration_seconds Request latency by view',
+                '# TYPE kmrl_http_request_duration_seconds histogram',
+            ]
+            for (view, method, status), histogram in sorted(self.latency.items()):
+                labels = f'view="{_escape(view)}",method="{method}",status="{status}"'
+                lines += histogram.render('kmrl_http_request_duration_seconds', labels)
+
+            lines += [
+                '# HELP kmrl_http_request_db_queries SQL queries per request by view',
+                '# TYPE kmrl_http_request_db_queries histogram',
+            ]
+            for view, histogram in sorted(self.queries.items()):
+                lines += histogram.render('kmrl_http_request_db_queries', f'view="{_escape(view)}"')
+
+            lines += [
+                '# HELP kmrl_http_request_db_seconds_total Time spent in SQL queries by view',
+                '# TYPE kmrl_http_request_db_seconds_total counter',
+            ]
+            lines += [f'kmrl_http_request_db_seconds_total{{view="{_escape(view)}"}} {seconds}'
+                      for view, seconds in sorted(self.db_seconds.items())]
+
+            lines += [
+                '# HELP kmrl_http_response_size_bytes_total Response body bytes by view (streaming responses excluded)',
+                '# TYPE kmrl_http_response_size_bytes_total counter',
+            ]
+            lines += [f'kmrl_http_response_size_bytes_total{{view="{_escape(view)}"}} {size}'
+                      for view, size in sorted(self.response_bytes.items())]
+
+            lines += [
+                '# HELP kmrl_request_stage_seconds_total Time attributed to named stages (pandas, model) by view',
+                '# TYPE kmrl_request_stage_seconds_total counter',
+            ]
+            lines += [f'kmrl_request_stage_seconds_total{{view="{_escape(view)}",stage="{_escape(stage)}"}} {seconds}'
+                      for (view, stage), seconds in sorted(self.stage_seconds.items())]
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,129 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+
+class PerformanceMetricsMiddleware:
+    """
+    Records latency, SQL query count/time, response size and stage timings
+    (see ``fleet.metrics.timed``) for a sample of requests.
+
+    Runs natively under both WSGI and ASGI, so async views are not pushed
+    back onto a thread by a synchronous middleware.
+
+    Settings:
+        PERF_METRICS_SAMPLE_RATE: Fraction of requests to measure (0-1)
+        PERF_SERVER_TIMING: Always add a Server-Timing header to measured responses.
+            Otherwise it is added on demand, when the request sends
+            ``X-Server-Timing: 1``; such requests are always measured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _should_measure(self, request):
+        server_timing = getattr(settings, 'PERF_SERVER_TIMING', False) or request.headers.get('X-Server-Timing') == '1'
+        sample_rate = getattr(settings, 'PERF_METRICS_SAMPLE_RATE', 1.0)
+        measure = server_timing or (sample_rate > 0 and random.random() < sample_rate)
+        return measure, server_timing
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        measure, server_timing = self._should_measure(request)
+        if not measure:
+            return self.get_response(request)
+
+        stages, stage_token = metrics.start_request_timings()
+        db, db_token = metrics.start_query_stats()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_query_stats(db_token)
+            metrics.end_request_timings(stage_token)
+        return self._record(request, response, time.perf_counter() - started, db, stages, server_timing)
+
+    async def __acall__(self, request):
+        measure, server_timing = self._should_measure(request)
+        if not measure:
+            return await self.get_response(request)
+
+        stages, stage_token = metrics.start_request_timings()
+        db, db_token = metrics.start_query_stats()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_query_stats(db_token)
+            metrics.end_request_timings(stage_token)
+        return self._record(request, response, time.perf_counter() - started, db, stages, server_timing)
+
+    def _record(self, request, response, duration, db, stages, server_timing):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unresolved'
+        response_bytes = 0 if response.streaming else len(response.content)
+
+        metrics.registry.observe(
+            view=view,
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            query_count=db['queries'],
+            db_seconds=db['seconds'],
+            response_bytes=response_bytes,
+            stages=stages
+        )
+
+        if server_timing:
+            entries = [
+                f'total;dur={duration * 1000:.2f}',
+                f'db;dur={db["seconds"] * 1000:.2f};desc="{db["queries"]} queries"',
+            ]
+            entries += [f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in stages.items()]
+            response['Server-Timing'] = ', '.join(entries)
+
+        return response
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, usable natively under ASGI as well as WSGI.
+
+    The stock middleware is synchronous only; under uvicorn that would run
+    every request, including the async API views, through a thread. Static
+    lookups are in-memory, only serving a file is handed to a thread.
+
+    The async path uses WhiteNoiseMiddleware internals (``files``,
+    ``find_file``, ``autorefresh``, ``serve``), so whitenoise is pinned to
+    the tested release; re-run ``StaticFilesTests`` before upgrading it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
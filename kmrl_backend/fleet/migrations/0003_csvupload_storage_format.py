@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0002_csvdatasource_mlmodel_csvupload_csvdatarow_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csvupload',
+            name='data_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='csvupload',
+            name='storage_format',
+            field=models.CharField(choices=[('rows', 'Rows'), ('columnar', 'Columnar')], default='rows', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0003_csvupload_storage_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mlmodel',
+            name='model_state',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0004_mlmodel_model_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='progress',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='mltrainingsession',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('training', 'Training'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0005_mltrainingsession_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CSVUploadStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_type', models.CharField(max_length=50)),
+                ('config_key', models.CharField(max_length=64)),
+                ('statistics', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='training_statistics', to='fleet.csvupload')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('upload', 'model_type', 'config_key'), name='unique_upload_statistics')],
+            },
+        ),
+    ]
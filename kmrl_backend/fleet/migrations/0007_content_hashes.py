@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0006_csvuploadstatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csvdatarow',
+            name='row_hash',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='csvupload',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='deduplicate_rows',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='csvupload',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash', ''), _negated=True), fields=('source', 'content_hash'), name='unique_upload_content'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:36
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+POSTGRES_INDEXES = [
+    # Containment (row_data @> '{"key": value}') for equality filters on any key
+    ('csvdatarow_row_data_gin', 'USING gin (row_data jsonb_path_ops)'),
+    # Range filters and sorting on mileage, matching Django's key transform (row_data -> 'key')
+    ('csvdatarow_mileage_km', "((row_data -> 'mileage_km'))"),
+]
+
+
+def backfill_train_id(apps, schema_editor):
+    CSVDataRow = apps.get_model('fleet', 'CSVDataRow')
+    batch = []
+    for row in CSVDataRow.objects.only('id', 'row_data').iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        train_id = row.row_data.get('train_id') if isinstance(row.row_data, dict) else None
+        if train_id is None:
+            continue
+        row.train_id = str(train_id)[:64]
+        batch.append(row)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            CSVDataRow.objects.bulk_update(batch, ['train_id'])
+            batch = []
+    if batch:
+        CSVDataRow.objects.bulk_update(batch, ['train_id'])
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name('fleet_csvdatarow')
+    for name, definition in POSTGRES_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}')
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0007_content_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csvdatarow',
+            name='train_id',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='csvdatarow',
+            index=models.Index(fields=['upload', 'row_index'], name='csvdatarow_upload_row'),
+        ),
+        migrations.AddIndex(
+            model_name='csvdatarow',
+            index=models.Index(fields=['train_id', 'upload', 'row_index'], name='csvdatarow_train_id'),
+        ),
+        migrations.RunPython(backfill_train_id, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0008_csvdatarow_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mltrainingsession',
+            index=models.Index(fields=['model', 'status', 'completed_at'], name='trainingsession_latest'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_trainingsession_latest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mlmodel',
+            name='artifact_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='artifact_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0010_model_artifacts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='row_limit',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mltrainingsession',
+            name='sample_fraction',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0011_training_sampling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
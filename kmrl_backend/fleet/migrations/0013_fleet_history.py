@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0012_fleet_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetStateDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('trains', models.IntegerField()),
+                ('samples', models.IntegerField()),
+                ('certified', models.IntegerField()),
+                ('cleaning_due', models.IntegerField()),
+                ('open_jobs', models.IntegerField()),
+                ('branding_shortfall', models.IntegerField()),
+                ('mileage_km_mean', models.FloatField(null=True)),
+                ('score_mean', models.FloatField(null=True)),
+                ('score_min', models.FloatField(null=True)),
+                ('score_max', models.FloatField(null=True)),
+                ('assignments', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrainState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('train_id', models.CharField(max_length=10)),
+                ('recorded_at', models.DateTimeField()),
+                ('day', models.DateField()),
+                ('source', models.CharField(choices=[('change', 'Change'), ('removed', 'Removed'), ('induction', 'Induction run')], max_length=10)),
+                ('assignment', models.CharField(blank=True, max_length=10)),
+                ('fc_rs', models.BooleanField()),
+                ('fc_sig', models.BooleanField()),
+                ('fc_tel', models.BooleanField()),
+                ('open_jobs', models.IntegerField()),
+                ('branding_shortfall', models.IntegerField()),
+                ('mileage_km', models.IntegerField()),
+                ('cleaning_due', models.BooleanField()),
+                ('stabling_penalty', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['train_id', 'day'], name='trainstate_train_day'), models.Index(fields=['day'], name='trainstate_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrainStateDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('train_id', models.CharField(max_length=10)),
+                ('day', models.DateField()),
+                ('samples', models.IntegerField(default=0)),
+                ('last_recorded_at', models.DateTimeField(null=True)),
+                ('removed', models.BooleanField(default=False)),
+                ('assignment', models.CharField(blank=True, max_length=10)),
+                ('fc_rs', models.BooleanField(default=False)),
+                ('fc_sig', models.BooleanField(default=False)),
+                ('fc_tel', models.BooleanField(default=False)),
+                ('open_jobs', models.IntegerField(default=0)),
+                ('branding_shortfall', models.IntegerField(default=0)),
+                ('mileage_km', models.IntegerField(default=0)),
+                ('cleaning_due', models.BooleanField(default=False)),
+                ('stabling_penalty', models.IntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_min', models.FloatField(null=True)),
+                ('score_max', models.FloatField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='trainstatedaily_day')],
+                'constraints': [models.UniqueConstraint(fields=('train_id', 'day'), name='unique_train_state_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:48
+
+from django.db import migrations, models
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
+from django.db.models.lookups import Regex
+
+# fleet.queries.NUMBER_PATTERN at the time of this migration
+NUMBER_PATTERN = r'^\s*[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]{1,2})?\s*$'
+OLD_INDEX = 'csvdatarow_mileage_km'
+NUMERIC_INDEX = 'csvdatarow_mileage_km_number'
+
+
+def _numeric_index():
+    # Built like fleet.queries.numeric_key('mileage_km'), so numeric filters and sorting can use it
+    text = KeyTextTransform('mileage_km', 'row_data')
+    expression = models.Case(
+        models.When(Regex(text, NUMBER_PATTERN), then=Cast(text, models.FloatField())),
+        output_field=models.FloatField()
+    )
+    return models.Index(expression, name=NUMERIC_INDEX)
+
+
+def create_numeric_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {OLD_INDEX}')
+    schema_editor.add_index(apps.get_model('fleet', 'CSVDataRow'), _numeric_index())
+
+
+def drop_numeric_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {NUMERIC_INDEX}')
+    table = schema_editor.quote_name('fleet_csvdatarow')
+    schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {OLD_INDEX} ON {table} ((row_data -> 'mileage_km'))")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0014_training_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_numeric_index, drop_numeric_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:13
+
+from django.db import migrations, models
+
+
+def mark_rolled_up(apps, schema_editor):
+    # States recorded so far were folded into TrainStateDaily as they were written
+    apps.get_model('fleet', 'TrainState').objects.update(rolled_up=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0015_csvdatarow_numeric_mileage_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rolled_up_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='trainstate',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_rolled_up, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='trainstate',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['recorded_at', 'id'], name='trainstate_pending'),
+        ),
+    ]
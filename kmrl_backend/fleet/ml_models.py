@@ -6,10 +6,144 @@ Allows easy integration of different ML models for train optimization.
 import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
-import json
+from typing import Dict, List, Any, Mapping, Tuple
+import base64
+import io
+import time
 from datetime import datetime
 
+from . import running_stats
+# Composite suitability score constants, shared with the single-train scorer
+from .scoring import (
+    CLEANING_DUE_SCORE, DEFAULT_SCORE_WEIGHTS, MILEAGE_TOLERANCE, SCORE_FEATURES, TARGET_MILEAGE
+)
+
+def _column(data: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    """Return a column as float64, or a constant array if the column is missing."""
+    if name in data.columns:
+        return np.asarray(data[name], dtype=np.float64)
+    return np.full(len(data), default, dtype=np.float64)
+
+def _numeric(data: pd.DataFrame, name: str) -> np.ndarray:
+    """Return a column as float64; values that are not numbers become NaN."""
+    try:
+        return np.asarray(data[name], dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(data[name], errors='coerce').to_numpy(dtype=np.float64)
+
+BOOL_TEXT = {'true': 1.0, 'false': 0.0}
+
+def _as_float(column: pd.Series) -> np.ndarray:
+    """
+    Return a column as float64 for a learned model: booleans (also as
+    'True'/'False' text) become 1/0, anything else that is not a number NaN.
+    """
+    try:
+        return np.asarray(column, dtype=np.float64)
+    except (TypeError, ValueError):
+        values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+        text = column.astype(str).str.strip().str.lower().map(BOOL_TEXT).to_numpy(dtype=np.float64)
+        return np.where(np.isnan(values), text, values)
+
+def _target_values(column: pd.Series) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Split a target column into ``(values, known, classification)``: numeric
+    targets are regressed, anything else (e.g. past induction decisions) is
+    classified by its text label. ``known`` masks rows with a target.
+    """
+    known = column.notna().to_numpy()
+    numeric = _as_float(column)
+    if np.isnan(numeric[known]).any():
+        return column.astype(str).to_numpy(dtype=object), known, True
+    return numeric, known & ~np.isnan(numeric), False
+
+def _load_estimator(payload: str):
+    """Deserialise an estimator saved inline in ``model_state`` (before the artifact store)."""
+    import joblib
+    return joblib.load(io.BytesIO(base64.b64decode(payload)))
+
+def _floor_zero(values: np.ndarray) -> np.ndarray:
+    """Vectorized ``max(0, x)``, including its NaN -> 0 behaviour."""
+    return np.where(values > 0, values, 0.0)
+
+
+def score_feature_arrays(data: pd.DataFrame, target_mileage: float = TARGET_MILEAGE) -> Dict[str, np.ndarray]:
+    """Extract the composite score inputs as float64 arrays; missing columns use their defaults."""
+    return {
+        'fc_rs': _column(data, 'fc_rs', False),
+        'fc_sig': _column(data, 'fc_sig', False),
+        'fc_tel': _column(data, 'fc_tel', False),
+        'open_jobs': _column(data, 'open_jobs', 0),
+        'mileage_km': _column(data, 'mileage_km', target_mileage),
+        'stabling_penalty': _column(data, 'stabling_penalty', 0),
+        'cleaning_due': _column(data, 'cleaning_due', False)
+    }
+
+def score_components(features: Dict[str, np.ndarray], target_mileage=TARGET_MILEAGE) -> Dict[str, np.ndarray]:
+    """
+    Compute the composite score components from feature arrays.
+    
+    Works element-wise on arrays of any shape, so a (scenarios x trains)
+    feature matrix with a (scenarios x 1) ``target_mileage`` scores every
+    scenario at once.
+    
+    Args:
+        features: Arrays keyed by ``SCORE_FEATURES``, as from ``score_feature_arrays``
+        target_mileage: Mileage that scores highest (scalar or broadcastable array)
+    
+    Returns:
+        Dictionary of sub-score arrays keyed like the score weights
+    """
+    fc_score = (
+        features['fc_rs'].astype(np.int64) +
+        features['fc_sig'].astype(np.int64) +
+        features['fc_tel'].astype(np.int64)
+    ) / 3.0
+    
+    job_penalty = _floor_zero(1 - (features['open_jobs'] * 0.2))
+    
+    mileage_dev = np.abs(features['mileage_km'] - target_mileage)
+    mileage_score = _floor_zero(1 - (mileage_dev / MILEAGE_TOLERANCE))
+    
+    stabling_score = _floor_zero(1 - (features['stabling_penalty'] / 100))
+    
+    cleaning_due = features['cleaning_due'].astype(bool)
+    cleaning_score = np.where(cleaning_due, CLEANING_DUE_SCORE, 1.0)
+    
+    return {
+        'fc': fc_score,
+        'jobs': job_penalty,
+        'mileage': mileage_score,
+        'stabling': stabling_score,
+        'cleaning': cleaning_score
+    }
+
+def compute_sub_scores(data: pd.DataFrame, target_mileage: float = TARGET_MILEAGE) -> Dict[str, np.ndarray]:
+    """
+    Compute the composite score components for every row of a frame at once.
+    
+    Args:
+        data: Train features (fc_rs, fc_sig, fc_tel, open_jobs, mileage_km,
+            stabling_penalty, cleaning_due); missing columns use their defaults
+        target_mileage: Mileage that scores highest
+    
+    Returns:
+        Dictionary of sub-score arrays keyed like the score weights
+    """
+    return score_components(score_feature_arrays(data, target_mileage), target_mileage)
+
+def combine_sub_scores(sub_scores: Dict[str, np.ndarray], weights: Dict[str, float]) -> np.ndarray:
+    """Weight the sub-scores into a composite score scaled to 0-100."""
+    composite = (
+        sub_scores['fc'] * weights['fc'] +
+        sub_scores['jobs'] * weights['jobs'] +
+        sub_scores['mileage'] * weights['mileage'] +
+        sub_scores['stabling'] * weights['stabling'] +
+        sub_scores['cleaning'] * weights['cleaning']
+    )
+    scaled = _floor_zero(composite * 100)
+    return np.where(scaled < 100, scaled, 100.0)
+
 class BaseMLModel(ABC):
     """
     Abstract base class for all ML models in the system.
@@ -23,6 +157,7 @@ class BaseMLModel(ABC):
         self.is_trained = False
         self.model = None
         self.training_metrics = {}
+        self.statistics = None  # Merged partial_statistics of the training data
     
     @abstractmethod
     def train(self, data: pd.DataFrame, target_column: str = None) -> Dict[str, float]:
@@ -74,6 +209,59 @@ class BaseMLModel(ABC):
         """
         return data
     
+    def statistics_features(self) -> List[str]:
+        """Columns summarised per upload by ``partial_statistics``."""
+        return []
+    
+    def partial_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Summarise one chunk of training data (typically one upload) into
+        mergeable statistics: the row count and per-feature aggregates.
+        Override together with ``merge_statistics`` to add model-specific terms.
+        
+        Args:
+            data: Training data chunk
+        
+        Returns:
+            JSON-serialisable statistics
+        """
+        processed_data = self.preprocess_data(data)
+        return {
+            'data_points': len(processed_data),
+            'features': {
+                name: running_stats.summarize(_numeric(processed_data, name))
+                for name in self.statistics_features() if name in processed_data.columns
+            }
+        }
+    
+    def merge_statistics(self, a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the statistics of two chunks into those of their union."""
+        return {
+            'data_points': a['data_points'] + b['data_points'],
+            'features': {
+                name: running_stats.merge(
+                    a['features'].get(name, running_stats.EMPTY),
+                    b['features'].get(name, running_stats.EMPTY)
+                )
+                for name in sorted(set(a['features']) | set(b['features']))
+            }
+        }
+    
+    def train_from_statistics(self, statistics: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Train from merged ``partial_statistics`` instead of raw rows.
+        Models that implement this are retrained incrementally: only uploads
+        not seen before are read (see ``fleet.training``).
+        
+        Returns:
+            Dictionary of training metrics
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental training")
+    
+    @property
+    def supports_incremental(self) -> bool:
+        return type(self).train_from_statistics is not BaseMLModel.train_from_statistics
+    
     def save_model_state(self) -> Dict[str, Any]:
         """
         Save the current model state for persistence.
@@ -86,21 +274,81 @@ class BaseMLModel(ABC):
             'model_type': self.model_type,
             'config': self.config,
             'is_trained': self.is_trained,
-            'training_metrics': self.training_metrics
+            'training_metrics': self.training_metrics,
+            'statistics': self.statistics
         }
+    
+    def load_model_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore model state produced by ``save_model_state``.
+        Override this method (together with ``save_model_state``) for models
+        with fitted parameters.
+        
+        Args:
+            state: Dictionary containing model state
+        """
+        self.config.update(state.get('config', {}))
+        self.is_trained = state.get('is_trained', False)
+        self.training_metrics = state.get('training_metrics', {})
+        self.statistics = state.get('statistics')
+    
+    def save_artifacts(self) -> Dict[str, Any]:
+        """
+        Fitted parameters too large for ``save_model_state``, keyed by name.
+        Training stores them as a versioned artifact (see ``fleet.artifacts``):
+        NumPy arrays as memory-mapped files, anything else with joblib.
+        
+        Returns:
+            Dictionary of artifacts (empty if the model has none)
+        """
+        return {}
+    
+    def load_artifacts(self, artifacts: Mapping[str, Any]) -> None:
+        """
+        Restore what ``save_artifacts`` returned, after ``load_model_state``.
+        Arrays arrive memory-mapped and read-only; other artifacts are loaded
+        when first looked up.
+        
+        Args:
+            artifacts: Mapping of artifact name to value
+        """
+        pass
 
 class TrainOptimizationModel(BaseMLModel):
     """
-    ML Model for train optimization using random forest or similar algorithms.
-    Predicts optimal train selection based on multiple criteria.
+    ML Model for train optimization.
+    Predicts train suitability scores based on multiple criteria.
+    
+    Two backends, selected with the ``backend`` config key:
+    
+    - ``formula`` (default): the weighted composite score. Training only
+      records score statistics, so it supports incremental training.
+    - ``sklearn``: a scikit-learn random forest fitted on the ``features``
+      columns against ``target``. Numeric targets (e.g. ``suitability_score``)
+      are regressed; label targets (e.g. past induction decisions) are
+      classified and predicted as 100 x the probability of
+      ``positive_label``. Without a target column the forest learns the
+      formula score. ``n_jobs`` parallelises fitting and prediction across
+      cores; with ``warm_start``, training a fitted model again adds
+      ``n_estimators`` trees fitted on the new data and keeps the old ones.
+      The fitted forest is stored as an artifact: a model loaded from the
+      store predicts from its memory-mapped node arrays (``fleet.forest``)
+      and reads the scikit-learn estimator back only to keep training it.
     """
     
+    BACKENDS = ('formula', 'sklearn')
+    
     def __init__(self, config: Dict[str, Any] = None):
         default_config = {
+            'backend': 'formula',
             'algorithm': 'random_forest',
             'n_estimators': 100,
             'max_depth': 10,
             'random_state': 42,
+            'n_jobs': -1,  # all cores
+            'warm_start': False,
+            'target': 'suitability_score',
+            'positive_label': 'service',
             'features': [
                 'fc_rs', 'fc_sig', 'fc_tel', 'open_jobs', 
                 'branding_shortfall', 'mileage_km', 'cleaning_due', 'stabling_penalty'
@@ -109,40 +357,160 @@ class TrainOptimizationModel(BaseMLModel):
         if config:
             default_config.update(config)
         
+        if default_config['backend'] not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {default_config['backend']}. Available backends: {list(self.BACKENDS)}")
+        if default_config['backend'] == 'sklearn' and default_config['algorithm'] != 'random_forest':
+            raise ValueError(f"Unsupported algorithm for the sklearn backend: {default_config['algorithm']}")
+        
         super().__init__('TrainOptimization', 'classification', default_config)
+        self.forest = None  # Flattened forest arrays, when loaded from artifacts
+        self.feature_importances = None
+        self._artifacts = None
+    
+    @property
+    def is_learned(self) -> bool:
+        return self.config['backend'] == 'sklearn'
+    
+    @property
+    def supports_incremental(self) -> bool:
+        # A forest is fitted on rows, not on summary statistics
+        return not self.is_learned
     
-    def train(self, data: pd.DataFrame, target_column: str = 'suitability_score') -> Dict[str, float]:
+    def train(self, data: pd.DataFrame, target_column: str = None) -> Dict[str, float]:
         """
         Train the model to predict train suitability scores.
+        
+        Args:
+            data: Training data
+            target_column: Target for the sklearn backend (default: the ``target`` config)
         """
         try:
-            # For now, implement a simple scoring algorithm
-            # In a real implementation, you'd use sklearn or similar
             processed_data = self.preprocess_data(data)
             
-            # Calculate a simple composite score based on the criteria
-            scores = []
-            for _, row in processed_data.iterrows():
-                score = self._calculate_composite_score(row)
-                scores.append(score)
+            if self.is_learned:
+                metrics = self._fit_estimator(processed_data, target_column or self.config['target'])
+            else:
+                # Composite score statistics are all the formula needs
+                metrics = self.train_from_statistics(self.partial_statistics(processed_data))
             
             # Store the training data for future predictions
             self.training_data = processed_data
-            self.is_trained = True
-            
-            # Calculate some basic metrics
-            self.training_metrics = {
-                'data_points': len(data),
-                'mean_score': np.mean(scores),
-                'std_score': np.std(scores),
-                'training_completed': datetime.now().isoformat()
-            }
             
-            return self.training_metrics
+            return metrics
             
         except Exception as e:
             raise Exception(f"Training failed: {str(e)}")
     
+    def statistics_features(self) -> List[str]:
+        return list(self.config['features'])
+    
+    def partial_statistics(self, data: pd.DataFrame) -> Dict[str, Any]:
+        statistics = super().partial_statistics(data)
+        statistics['score'] = running_stats.summarize(self.score_frame(self.preprocess_data(data)))
+        return statistics
+    
+    def merge_statistics(self, a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+        statistics = super().merge_statistics(a, b)
+        statistics['score'] = running_stats.merge(a['score'], b['score'])
+        return statistics
+    
+    def train_from_statistics(self, statistics: Dict[str, Any]) -> Dict[str, float]:
+        self.statistics = statistics
+        self.is_trained = True
+        
+        # Calculate some basic metrics
+        self.training_metrics = {
+            'data_points': statistics['data_points'],
+            'mean_score': statistics['score']['mean'],
+            'std_score': running_stats.std(statistics['score']),
+            'training_completed': datetime.now().isoformat()
+        }
+        
+        return self.training_metrics
+    
+    def feature_matrix(self, data: pd.DataFrame) -> np.ndarray:
+        """The configured ``features`` as a float64 (rows x features) matrix; missing values are NaN."""
+        features = self.config['features']
+        matrix = np.full((len(data), len(features)), np.nan)
+        for idx, name in enumerate(features):
+            if name in data.columns:
+                matrix[:, idx] = _as_float(data[name])
+        return matrix
+    
+    def _fit_estimator(self, data: pd.DataFrame, target: str) -> Dict[str, float]:
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        
+        started = time.perf_counter()
+        X = self.feature_matrix(data)
+        if target in data.columns:
+            y, known, classification = _target_values(data[target])
+        else:
+            y, known, classification, target = self.score_frame(data), np.ones(len(data), dtype=bool), False, 'formula_score'
+        if not known.any():
+            raise ValueError(f"No rows with a {target} value to train on")
+        X, y = X[known], y[known]
+        
+        estimator_class = RandomForestClassifier if classification else RandomForestRegressor
+        if self.config['warm_start'] and isinstance(self.fitted_estimator(), estimator_class):
+            # Keep the fitted trees and grow the forest on this data
+            self.model.set_params(n_estimators=self.model.n_estimators + int(self.config['n_estimators']),
+                                  n_jobs=self.config['n_jobs'])
+        else:
+            self.model = estimator_class(
+                n_estimators=int(self.config['n_estimators']),
+                max_depth=self.config['max_depth'],
+                random_state=self.config['random_state'],
+                n_jobs=self.config['n_jobs'],
+                warm_start=bool(self.config['warm_start'])
+            )
+        self.model.fit(X, y)
+        self.forest = None
+        
+        if classification and str(self.config['positive_label']) not in self.model.classes_:
+            raise ValueError(f"positive_label {self.config['positive_label']!r} is not a {target} value "
+                             f"(found {list(self.model.classes_)})")
+        
+        fitted = self._predict_estimator(X)
+        if classification:
+            predicted_labels = self.model.classes_[self.model.predict_proba(X).argmax(axis=1)]
+            fit_metric = {'train_accuracy': float(np.mean(predicted_labels == y))}
+        else:
+            total = float(np.sum((y - y.mean()) ** 2))
+            fit_metric = {'train_r2': 1 - float(np.sum((y - fitted) ** 2)) / total if total else 1.0}
+        
+        self.statistics = None
+        self.is_trained = True
+        self.training_metrics = {
+            'data_points': int(len(y)),
+            'backend': 'sklearn',
+            'algorithm': self.config['algorithm'],
+            'target': target,
+            'n_estimators': len(self.model.estimators_),
+            **fit_metric,
+            'mean_score': float(np.mean(fitted)),
+            'std_score': float(np.std(fitted)),
+            'fit_seconds': round(time.perf_counter() - started, 4),
+            'training_completed': datetime.now().isoformat()
+        }
+        return self.training_metrics
+    
+    def fitted_estimator(self):
+        """The fitted scikit-learn estimator, read from the artifacts on first use (None if unavailable)."""
+        if self.model is None and self._artifacts is not None and 'estimator' in self._artifacts:
+            self.model = self._artifacts['estimator']
+        return self.model
+    
+    def _positive_index(self) -> int:
+        return list(self.model.classes_).index(str(self.config['positive_label']))
+    
+    def _predict_estimator(self, X: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            from . import forest
+            return forest.predict(self.forest, X)
+        if not hasattr(self.model, 'predict_proba'):
+            return self.model.predict(X)
+        return self.model.predict_proba(X)[:, self._positive_index()] * 100
+    
     def predict(self, data: pd.DataFrame) -> np.ndarray:
         """
         Predict suitability scores for given train data.
@@ -151,20 +519,25 @@ class TrainOptimizationModel(BaseMLModel):
             raise ValueError("Model must be trained before making predictions")
         
         processed_data = self.preprocess_data(data)
-        scores = []
-        
-        for _, row in processed_data.iterrows():
-            score = self._calculate_composite_score(row)
-            scores.append(score)
-        
-        return np.array(scores)
+        if self.is_learned:
+            if self.model is None and self.forest is None:
+                raise ValueError("Fitted estimator is not available; retrain the model")
+            return self._predict_estimator(self.feature_matrix(processed_data))
+        return self.score_frame(processed_data)
     
     def get_feature_importance(self) -> Dict[str, float]:
         """
-        Return feature importance based on the configured weights.
+        Return the fitted forest's feature importances, or fixed
+        importances reflecting the formula weights.
         """
-        # This is a simplified version - in real ML models, 
-        # this would come from the trained model
+        if self.is_learned and self.model is not None:
+            return {
+                name: float(importance)
+                for name, importance in zip(self.config['features'], self.model.feature_importances_)
+            }
+        if self.is_learned and self.feature_importances:
+            return dict(self.feature_importances)
+        
         importance = {
             'fc_rs': 0.25,
             'fc_sig': 0.25, 
@@ -175,45 +548,44 @@ class TrainOptimizationModel(BaseMLModel):
         }
         return importance
     
-    def _calculate_composite_score(self, row: pd.Series) -> float:
+    def save_model_state(self) -> Dict[str, Any]:
+        state = super().save_model_state()
+        if self.is_learned and self.model is not None:
+            # Kept with the state, so serving never needs the estimator itself
+            state['feature_importances'] = self.get_feature_importance()
+        return state
+    
+    def load_model_state(self, state: Dict[str, Any]) -> None:
+        super().load_model_state(state)
+        self.feature_importances = state.get('feature_importances')
+        if state.get('estimator'):
+            self.model = _load_estimator(state['estimator'])
+    
+    def save_artifacts(self) -> Dict[str, Any]:
+        if not self.is_learned or self.fitted_estimator() is None:
+            return {}
+        
+        from . import forest
+        if hasattr(self.model, 'predict_proba'):
+            arrays = forest.flatten(self.model, self._positive_index())
+            arrays['leaf_value'] = arrays['leaf_value'] * 100
+        else:
+            arrays = forest.flatten(self.model)
+        return {**arrays, 'estimator': self.model}
+    
+    def load_artifacts(self, artifacts: Mapping[str, Any]) -> None:
+        from . import forest
+        if all(name in artifacts for name in forest.ARRAYS):
+            self.model = None
+            self.forest = {name: artifacts[name] for name in forest.ARRAYS}
+            self._artifacts = artifacts
+    
+    def score_frame(self, data: pd.DataFrame) -> np.ndarray:
         """
-        Calculate a composite suitability score for a train.
+        Calculate composite suitability scores for every train in a frame.
         """
-        # Fitness Certificate score (0-1)
-        fc_score = (
-            int(row.get('fc_rs', False)) +
-            int(row.get('fc_sig', False)) +
-            int(row.get('fc_tel', False))
-        ) / 3.0
-        
-        # Job penalty (0-1, where fewer open jobs = higher score)
-        job_penalty = max(0, 1 - (row.get('open_jobs', 0) * 0.2))
-        
-        # Mileage score (simplified)
-        target_mileage = 950
-        mileage_dev = abs(row.get('mileage_km', target_mileage) - target_mileage)
-        mileage_score = max(0, 1 - (mileage_dev / 250))
-        
-        # Stabling penalty (0-1)
-        stabling_score = max(0, 1 - (row.get('stabling_penalty', 0) / 100))
-        
-        # Cleaning penalty
-        cleaning_score = 0.65 if row.get('cleaning_due', False) else 1.0
-        
-        # Weighted composite score
-        weights = self.config.get('weights', {
-            'fc': 0.4, 'jobs': 0.2, 'mileage': 0.2, 'stabling': 0.1, 'cleaning': 0.1
-        })
-        
-        composite = (
-            fc_score * weights['fc'] +
-            job_penalty * weights['jobs'] +
-            mileage_score * weights['mileage'] +
-            stabling_score * weights['stabling'] +
-            cleaning_score * weights['cleaning']
-        )
-        
-        return min(100, max(0, composite * 100))  # Scale to 0-100
+        weights = self.config.get('weights', DEFAULT_SCORE_WEIGHTS)
+        return combine_sub_scores(compute_sub_scores(data), weights)
 
 class PredictiveMaintenanceModel(BaseMLModel):
     """
@@ -223,7 +595,8 @@ class PredictiveMaintenanceModel(BaseMLModel):
     def __init__(self, config: Dict[str, Any] = None):
         default_config = {
             'prediction_horizon': 30,  # days
-            'maintenance_threshold': 0.7
+            'maintenance_threshold': 0.7,
+            'mileage_window_days': 7  # mileage_km is the total over this many days
         }
         if config:
             default_config.update(config)
@@ -231,29 +604,73 @@ class PredictiveMaintenanceModel(BaseMLModel):
         super().__init__('PredictiveMaintenance', 'regression', default_config)
     
     def train(self, data: pd.DataFrame, target_column: str = 'maintenance_needed') -> Dict[str, float]:
+        return self.train_from_statistics(self.partial_statistics(data))
+    
+    def statistics_features(self) -> List[str]:
+        return ['open_jobs', 'mileage_km', 'stabling_penalty']
+    
+    def train_from_statistics(self, statistics: Dict[str, Any]) -> Dict[str, float]:
         # Simplified implementation
+        self.statistics = statistics
         self.is_trained = True
         self.training_metrics = {
-            'data_points': len(data),
+            'data_points': statistics['data_points'],
             'training_completed': datetime.now().isoformat()
         }
         return self.training_metrics
     
     def predict(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Predict today's maintenance risk (0-1) for each train.
+        """
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
-        # Simplified prediction based on open jobs and mileage
-        predictions = []
-        for _, row in data.iterrows():
-            risk_score = (
-                row.get('open_jobs', 0) * 0.3 +
-                (row.get('mileage_km', 0) / 1000) * 0.4 +
-                row.get('stabling_penalty', 0) / 100 * 0.3
-            )
-            predictions.append(min(1.0, risk_score))
+        return self.predict_horizon(data)['risk'][:, 0]
+    
+    def predict_horizon(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Forecast maintenance risk for every day of the prediction horizon.
+        
+        Mileage accrues at each train's current rate (``mileage_km`` is the
+        total over the last ``mileage_window_days``), so the mileage term grows
+        day by day while open jobs and stabling stay at today's values.
+        Day 0 is today and matches ``predict``.
+        
+        Args:
+            data: Train features (open_jobs, mileage_km, stabling_penalty)
         
-        return np.array(predictions)
+        Returns:
+            Dictionary with ``days`` (horizon,), ``risk`` (trains x horizon)
+            and boolean ``maintenance_needed`` (risk >= maintenance_threshold)
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        horizon = int(self.config['prediction_horizon'])
+        if horizon < 1:
+            raise ValueError("prediction_horizon must be at least 1 day")
+        
+        days = np.arange(horizon)
+        open_jobs = _column(data, 'open_jobs', 0)
+        mileage = _column(data, 'mileage_km', 0)
+        stabling = _column(data, 'stabling_penalty', 0)
+        
+        daily_mileage = mileage / self.config['mileage_window_days']
+        projected_mileage = mileage[:, None] + days[None, :] * daily_mileage[:, None]
+        
+        risk = (
+            (open_jobs * 0.3)[:, None] +
+            (projected_mileage / 1000) * 0.4 +
+            (stabling / 100 * 0.3)[:, None]
+        )
+        risk = np.where(risk < 1.0, risk, 1.0)
+        
+        return {
+            'days': days,
+            'risk': risk,
+            'maintenance_needed': risk >= self.config['maintenance_threshold']
+        }
     
     def get_feature_importance(self) -> Dict[str, float]:
         return {
@@ -287,4 +704,22 @@ def create_model(model_type: str, config: Dict[str, Any] = None) -> BaseMLModel:
         raise ValueError(f"Unknown model type: {model_type}. Available types: {list(MODEL_REGISTRY.keys())}")
     
     model_class = MODEL_REGISTRY[model_type]
-    return model_class(config)
\ No newline at end of file
+    return model_class(config)
+
+def load_model(model_type: str, state: Dict[str, Any], artifacts: Mapping[str, Any] = None) -> BaseMLModel:
+    """
+    Recreate a trained model from a saved state, without retraining.
+    
+    Args:
+        model_type: Type of model to create
+        state: State returned by ``BaseMLModel.save_model_state``
+        artifacts: Stored ``save_artifacts`` of the same training run, if any
+    
+    Returns:
+        Model instance ready for prediction
+    """
+    model_instance = create_model(model_type, state.get('config'))
+    model_instance.load_model_state(state)
+    if artifacts is not None:
+        model_instance.load_artifacts(artifacts)
+    return model_instance
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Per-process cache of loaded ML model instances.
+
+Entries are keyed by ``(MLModel.id, MLModel.updated_at)``: retraining or
+editing a model bumps ``updated_at``, so stale instances are never served.
+Eviction is LRU with a maximum size and a time-to-live.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+if TYPE_CHECKING:  # importing the models would load pandas/NumPy on start-up
+    from .ml_models import BaseMLModel
+
+DEFAULT_CACHE_SIZE = 32
+DEFAULT_CACHE_TTL = 3600  # seconds
+
+
+class ModelCache:
+    """Thread-safe LRU + TTL cache of model instances."""
+
+    def __init__(self, max_size: int = None, ttl: float = None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is None:
+            return int(getattr(settings, 'ML_MODEL_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+        return self._max_size
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is None:
+            return float(getattr(settings, 'ML_MODEL_CACHE_TTL', DEFAULT_CACHE_TTL))
+        return self._ttl
+
+    def get(self, ml_model) -> Optional['BaseMLModel']:
+        key = (ml_model.id, ml_model.updated_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            loaded_at, model_instance = entry
+            if time.monotonic() - loaded_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return model_instance
+
+    def put(self, ml_model, model_instance: 'BaseMLModel') -> None:
+        key = (ml_model.id, ml_model.updated_at)
+        with self._lock:
+            # Older versions of the same model can never be requested again
+            for stale_key in [k for k in self._entries if k[0] == ml_model.id and k != key]:
+                del self._entries[stale_key]
+            self._entries[key] = (time.monotonic(), model_instance)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, ml_model, loader: Callable[[Any], 'BaseMLModel']) -> 'BaseMLModel':
+        """
+        Return the cached instance for ``ml_model``, loading it on a miss.
+
+        Args:
+            ml_model: MLModel record
+            loader: Callable building a ready-to-predict instance from the record
+        """
+        model_instance = self.get(ml_model)
+        if model_instance is None:
+            model_instance = loader(ml_model)
+            self.put(ml_model, model_instance)
+        return model_instance
+
+    def invalidate(self, model_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == model_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+model_cache = ModelCache()
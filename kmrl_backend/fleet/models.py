@@ -15,6 +15,102 @@ class Train(models.Model):
     def __str__(self):
         return self.train_id
 
+class FleetVersion(models.Model):
+    """Change counter of the Train table, bumped in each writing transaction (see fleet.feature_store)"""
+    version = models.BigIntegerField(default=0)
+
+class TrainState(models.Model):
+    """Append-only record of a train's state after a change or induction run (see fleet.history)"""
+    SOURCE_CHANGE = 'change'
+    SOURCE_REMOVED = 'removed'
+    SOURCE_INDUCTION = 'induction'
+    SOURCE_CHOICES = [
+        (SOURCE_CHANGE, 'Change'),
+        (SOURCE_REMOVED, 'Removed'),
+        (SOURCE_INDUCTION, 'Induction run')
+    ]
+
+    train_id = models.CharField(max_length=10)
+    recorded_at = models.DateTimeField()
+    day = models.DateField()
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    assignment = models.CharField(max_length=10, blank=True)  # induction runs only
+    fc_rs = models.BooleanField()
+    fc_sig = models.BooleanField()
+    fc_tel = models.BooleanField()
+    open_jobs = models.IntegerField()
+    branding_shortfall = models.IntegerField()
+    mileage_km = models.IntegerField()
+    cleaning_due = models.BooleanField()
+    stabling_penalty = models.IntegerField()
+    score = models.FloatField()
+    rolled_up = models.BooleanField(default=False)  # folded into TrainStateDaily
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['train_id', 'day'], name='trainstate_train_day'),
+            models.Index(fields=['day'], name='trainstate_day'),
+            models.Index(fields=['recorded_at', 'id'], condition=models.Q(rolled_up=False),
+                         name='trainstate_pending'),
+        ]
+
+    def __str__(self):
+        return f"{self.train_id} - {self.recorded_at:%Y-%m-%d %H:%M}"
+
+class TrainStateDaily(models.Model):
+    """One train's TrainState rows of one day: the last state plus score aggregates"""
+    train_id = models.CharField(max_length=10)
+    day = models.DateField()
+    samples = models.IntegerField(default=0)
+    last_recorded_at = models.DateTimeField(null=True)
+    removed = models.BooleanField(default=False)
+    assignment = models.CharField(max_length=10, blank=True)  # last induction assignment of the day
+    fc_rs = models.BooleanField(default=False)
+    fc_sig = models.BooleanField(default=False)
+    fc_tel = models.BooleanField(default=False)
+    open_jobs = models.IntegerField(default=0)
+    branding_shortfall = models.IntegerField(default=0)
+    mileage_km = models.IntegerField(default=0)
+    cleaning_due = models.BooleanField(default=False)
+    stabling_penalty = models.IntegerField(default=0)
+    score = models.FloatField(default=0)
+    score_sum = models.FloatField(default=0)
+    score_min = models.FloatField(null=True)
+    score_max = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['train_id', 'day'], name='unique_train_state_day')
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='trainstatedaily_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.train_id} - {self.day}"
+
+class HistoryRollup(models.Model):
+    """Singleton row locked while TrainState rows are folded into TrainStateDaily (see fleet.history)"""
+    rolled_up_at = models.DateTimeField(null=True)
+
+class FleetStateDaily(models.Model):
+    """Whole-fleet aggregates of one past day, derived from TrainStateDaily when first queried"""
+    day = models.DateField(unique=True)
+    trains = models.IntegerField()  # trains with a known state, not removed
+    samples = models.IntegerField()
+    certified = models.IntegerField()
+    cleaning_due = models.IntegerField()
+    open_jobs = models.IntegerField()
+    branding_shortfall = models.IntegerField()
+    mileage_km_mean = models.FloatField(null=True)
+    score_mean = models.FloatField(null=True)
+    score_min = models.FloatField(null=True)
+    score_max = models.FloatField(null=True)
+    assignments = models.JSONField(default=dict)
+
+    def __str__(self):
+        return str(self.day)
+
 class CSVDataSource(models.Model):
     """Model to store information about CSV data sources"""
     name = models.CharField(max_length=100)
@@ -27,11 +123,30 @@ class CSVDataSource(models.Model):
 
 class CSVUpload(models.Model):
     """Model to store CSV upload metadata"""
+    STORAGE_ROWS = 'rows'
+    STORAGE_COLUMNAR = 'columnar'
+    STORAGE_CHOICES = [
+        (STORAGE_ROWS, 'Rows'),
+        (STORAGE_COLUMNAR, 'Columnar')
+    ]
+
     source = models.ForeignKey(CSVDataSource, on_delete=models.CASCADE)
     filename = models.CharField(max_length=255)
     row_count = models.IntegerField()
     headers = models.JSONField()  # Store column headers as JSON array
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    storage_format = models.CharField(max_length=20, choices=STORAGE_CHOICES, default=STORAGE_ROWS)
+    data_path = models.CharField(max_length=255, blank=True)  # Columnar data directory, relative to CSV_COLUMNAR_STORAGE_DIR
+    content_hash = models.CharField(max_length=64, blank=True)  # SHA-256 over headers and row hashes (see fleet.ingestion)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'content_hash'],
+                condition=~models.Q(content_hash=''),
+                name='unique_upload_content'
+            )
+        ]
     
     def __str__(self):
         return f"{self.source.name} - {self.filename}"
@@ -41,9 +156,15 @@ class CSVDataRow(models.Model):
     upload = models.ForeignKey(CSVUpload, on_delete=models.CASCADE, related_name='data_rows')
     row_data = models.JSONField()  # Store row data as JSON object
     row_index = models.IntegerField()  # Original row index in CSV
+    row_hash = models.CharField(max_length=32, blank=True)  # Content hash of row_data (see fleet.ingestion.row_hash)
+    train_id = models.CharField(max_length=64, blank=True)  # row_data['train_id'], extracted for indexed lookups
     
     class Meta:
         ordering = ['row_index']
+        indexes = [
+            models.Index(fields=['upload', 'row_index'], name='csvdatarow_upload_row'),
+            models.Index(fields=['train_id', 'upload', 'row_index'], name='csvdatarow_train_id'),
+        ]
     
     def __str__(self):
         return f"{self.upload.filename} - Row {self.row_index}"
@@ -54,6 +175,8 @@ class MLModel(models.Model):
     description = models.TextField(blank=True)
     model_type = models.CharField(max_length=50)  # e.g., 'classification', 'regression'
     configuration = models.JSONField(default=dict)  # Store model hyperparameters
+    model_state = models.JSONField(default=dict, blank=True)  # Trained state from BaseMLModel.save_model_state
+    artifact_path = models.CharField(max_length=255, blank=True)  # Artifact version in use, relative to ML_ARTIFACT_DIR
     is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -69,11 +192,45 @@ class MLTrainingSession(models.Model):
         ('pending', 'Pending'),
         ('training', 'Training'),
         ('completed', 'Completed'),
-        ('failed', 'Failed')
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled')
     ])
     metrics = models.JSONField(default=dict)  # Store training metrics
+    progress = models.FloatField(default=0)  # Percent complete, updated while training
+    deduplicate_rows = models.BooleanField(default=False)  # Skip rows whose row_hash was already loaded
+    row_limit = models.PositiveIntegerField(null=True, blank=True)  # Train on at most this many rows
+    sample_fraction = models.FloatField(null=True, blank=True)  # Train on a random sample of the rows
+    artifact_path = models.CharField(max_length=255, blank=True)  # Artifact version written by this session
+    error = models.TextField(blank=True)
     started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # Refreshed while queued or running (see fleet.jobs)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            # Latest completed session per model (see get_ml_models)
+            models.Index(fields=['model', 'status', 'completed_at'], name='trainingsession_latest'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model.name} - {self.started_at.strftime('%Y-%m-%d %H:%M')}"
+
+class TrainingQueue(models.Model):
+    """Single row locked while a training job is admitted, so the queue limit holds across API workers (see fleet.jobs)"""
+    admitted_at = models.DateTimeField(null=True)
+
+class CSVUploadStatistics(models.Model):
+    """Mergeable training statistics of one upload, reused by later retrains"""
+    upload = models.ForeignKey(CSVUpload, on_delete=models.CASCADE, related_name='training_statistics')
+    model_type = models.CharField(max_length=50)
+    config_key = models.CharField(max_length=64)  # Hash of the model configuration the statistics depend on
+    statistics = models.JSONField()  # From BaseMLModel.partial_statistics
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['upload', 'model_type', 'config_key'], name='unique_upload_statistics')
+        ]
+
     def __str__(self):
-        return f"{self.model.name} - {self.started_at.strftime('%Y-%m-%d %H:%M')}"
\ No newline at end of file
+        return f"{self.upload} - {self.model_type}"
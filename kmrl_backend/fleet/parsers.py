@@ -0,0 +1,16 @@
+from rest_framework.parsers import BaseParser
+
+class CSVStreamParser(BaseParser):
+    """
+    Leaves raw CSV request bodies unparsed so views can read them incrementally
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+class GzipCSVStreamParser(CSVStreamParser):
+    """
+    Same as CSVStreamParser for gzip-compressed CSV bodies
+    """
+    media_type = 'application/gzip'
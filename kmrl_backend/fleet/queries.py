@@ -0,0 +1,218 @@
+"""
+Server-side filtering, projection and sorting over row-stored CSV data.
+
+Filters address keys of ``CSVDataRow.row_data`` and are written
+``<key>:<op>:<value>``, e.g. ``train_id:eq:TS-12`` or ``mileage_km:gt:900``.
+Values are parsed as JSON where possible (``900``, ``true``), otherwise kept
+as strings; ``in`` takes a comma-separated list.
+
+CSV feeds store every cell as a string, so number values compare by value
+with stored numbers and numeric strings alike (``numeric_key``): ``'1200'``
+is greater than ``900``, and values that are not numbers never match. Range
+filters with a text value (e.g. ISO dates) compare as text. Sorting puts
+numbers first, in numeric order, then other values in text order. Projected
+fields are returned as stored.
+
+Lookups are index-backed where possible:
+
+- ``train_id`` filters and sorting use the extracted, indexed
+  ``CSVDataRow.train_id`` column, on every database.
+- Other text equality filters use JSON containment on PostgreSQL, served by
+  the GIN index on ``row_data``; elsewhere they compare the extracted key.
+- On PostgreSQL, numeric filters and sorting on ``mileage_km`` use an
+  expression index on its ``numeric_key``.
+
+Columnar uploads have no ``CSVDataRow`` rows and are not searched; their ids
+are returned as ``skipped_uploads``, so a result that leaves data out says so.
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, QuerySet, TextField, When
+from django.db.models.fields.json import KeyTextTransform, KeyTransform, compile_json_path
+from django.db.models.functions import Cast
+from django.db.models.lookups import Regex
+
+from .models import CSVDataRow, CSVUpload
+
+OPERATORS = {
+    'eq': 'exact',
+    'ne': 'exact',
+    'gt': 'gt',
+    'gte': 'gte',
+    'lt': 'lt',
+    'lte': 'lte',
+    'in': 'in',
+}
+RANGE_OPERATORS = ('gt', 'gte', 'lt', 'lte')
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9_\- ]{1,64}$')
+# Decimal numbers, as text; the exponent is bounded so every match fits a double
+NUMBER_PATTERN = r'^\s*[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]{1,2})?\s*$'
+INDEXED_KEY = 'train_id'
+
+
+@dataclass
+class RowFilter:
+    key: str
+    op: str
+    value: Any
+
+
+def _check_key(key: str) -> str:
+    if not KEY_PATTERN.match(key):
+        raise ValueError(f'Invalid key: {key!r}')
+    return key
+
+
+class StoredKeyTransform(KeyTransform):
+    """
+    ``row_data[key]`` as stored. SQLite's ``KeyTransform`` extracts strings
+    unquoted, so a numeric string such as ``'950'`` would decode as a number.
+    """
+
+    def as_sqlite(self, compiler, connection):
+        lhs, params, key_transforms = self.preprocess_lhs(compiler, connection)
+        json_path = compile_json_path(key_transforms)
+        sql = (
+            "(CASE JSON_TYPE({lhs}, %s) WHEN 'text' THEN JSON_QUOTE(JSON_EXTRACT({lhs}, %s)) "
+            "WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' WHEN 'null' THEN 'null' "
+            "ELSE JSON_EXTRACT({lhs}, %s) END)"
+        ).format(lhs=lhs)
+        return sql, (*params, json_path, *params, json_path, *params, json_path)
+
+
+def numeric_key(key: str) -> Case:
+    """``row_data[key]`` as a float if it is a number or a numeric string, else NULL."""
+    text = KeyTextTransform(key, 'row_data')
+    return Case(When(Regex(text, NUMBER_PATTERN), then=Cast(text, FloatField())), output_field=FloatField())
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def parse_value(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_filter(token: str) -> RowFilter:
+    """Parse ``<key>:<op>:<value>``. Raises ValueError if malformed."""
+    parts = token.split(':', 2)
+    if len(parts) != 3:
+        raise ValueError(f'Invalid filter {token!r}, expected <key>:<op>:<value>')
+
+    key, op, raw = parts
+    if op not in OPERATORS:
+        raise ValueError(f'Unknown operator {op!r}. Available operators: {list(OPERATORS)}')
+
+    value = [parse_value(item) for item in raw.split(',')] if op == 'in' else parse_value(raw)
+    return RowFilter(key=_check_key(key), op=op, value=value)
+
+
+def parse_order(token: str) -> List[Tuple[str, bool]]:
+    """Parse ``key,-other_key`` into ``[(key, descending)]``."""
+    order = []
+    for item in filter(None, (part.strip() for part in token.split(','))):
+        descending = item.startswith('-')
+        order.append((_check_key(item.lstrip('-')), descending))
+    return order
+
+
+def parse_fields(token: str) -> List[str]:
+    return [_check_key(part.strip()) for part in token.split(',') if part.strip()]
+
+
+def _apply_filter(queryset: QuerySet, row_filter: RowFilter, idx: int) -> QuerySet:
+    if row_filter.key == INDEXED_KEY and row_filter.op in ('eq', 'ne', 'in'):
+        if row_filter.op == 'in':
+            return queryset.filter(train_id__in=[str(value) for value in row_filter.value])
+        condition = {'train_id': str(row_filter.value)}
+        return queryset.exclude(**condition) if row_filter.op == 'ne' else queryset.filter(**condition)
+
+    alias = f'filter_{idx}'
+    if row_filter.op == 'in':
+        numbers = [float(value) for value in row_filter.value if _is_number(value)]
+        others = [value for value in row_filter.value if not _is_number(value)]
+        queryset = queryset.alias(**{
+            alias: numeric_key(row_filter.key),
+            f'{alias}_json': KeyTransform(row_filter.key, 'row_data')
+        })
+        return queryset.filter(Q(**{f'{alias}__in': numbers}) | Q(**{f'{alias}_json__in': others}))
+
+    if _is_number(row_filter.value):
+        expression, value = numeric_key(row_filter.key), float(row_filter.value)
+    elif row_filter.op in RANGE_OPERATORS:
+        if not isinstance(row_filter.value, str):
+            raise ValueError(f'{row_filter.op} needs a number or text value, got {row_filter.value!r}')
+        # A plain text comparison: key transform lookups would decode the value as JSON
+        expression, value = Cast(KeyTextTransform(row_filter.key, 'row_data'), TextField()), row_filter.value
+    elif row_filter.op == 'eq' and connection.vendor == 'postgresql':
+        return queryset.filter(row_data__contains={row_filter.key: row_filter.value})
+    else:
+        expression, value = KeyTransform(row_filter.key, 'row_data'), row_filter.value
+
+    condition = {f'{alias}__{OPERATORS[row_filter.op]}': value}
+    queryset = queryset.alias(**{alias: expression})
+    return queryset.exclude(**condition) if row_filter.op == 'ne' else queryset.filter(**condition)
+
+
+def build_queryset(uploads: QuerySet, filters: List[RowFilter] = (), order: List[Tuple[str, bool]] = (),
+                   fields: List[str] = None) -> QuerySet:
+    """
+    Rows of ``uploads`` matching every filter, sorted by ``order`` and then
+    ``(upload_id, row_index)``, as dicts with ``upload_id``, ``row_index``
+    and either ``row_data`` or one entry per projected field.
+    """
+    queryset = CSVDataRow.objects.filter(upload__in=uploads)
+    for idx, row_filter in enumerate(filters):
+        queryset = _apply_filter(queryset, row_filter, idx)
+
+    ordering = []
+    for key, descending in order:
+        if key == INDEXED_KEY:
+            expressions = [F('train_id')]
+        else:
+            # Numbers by value, then everything else as text
+            expressions = [numeric_key(key), KeyTextTransform(key, 'row_data')]
+        for expression in expressions:
+            ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+    queryset = queryset.order_by(*ordering, 'upload_id', 'row_index')
+
+    if fields is None:
+        return queryset.values('upload_id', 'row_index', 'row_data')
+    projection = {f'field_{idx}': StoredKeyTransform(field, 'row_data') for idx, field in enumerate(fields)}
+    return queryset.values('upload_id', 'row_index', **projection)
+
+
+def run_query(uploads: QuerySet, filters: List[RowFilter] = (), order: List[Tuple[str, bool]] = (),
+              fields: List[str] = None, limit: int = 1000, offset: int = 0) -> Dict[str, Any]:
+    """
+    Run a filtered query and return one page.
+
+    Returns:
+        Dictionary with ``rows`` (``upload_id``, ``row_index``, ``row_data``),
+        ``next_offset`` (None on the last page) and ``skipped_uploads``, the
+        ids of columnar uploads among ``uploads``, which were not searched
+    """
+    queryset = build_queryset(uploads, filters, order, fields)
+    records = list(queryset[offset:offset + limit + 1])
+    has_more = len(records) > limit
+
+    rows = []
+    for record in records[:limit]:
+        if fields is None:
+            row_data = record['row_data']
+        else:
+            row_data = {field: record[f'field_{idx}'] for idx, field in enumerate(fields)}
+        rows.append({'upload_id': record['upload_id'], 'row_index': record['row_index'], 'row_data': row_data})
+
+    skipped = uploads.filter(storage_format=CSVUpload.STORAGE_COLUMNAR).order_by('id').values_list('id', flat=True)
+    return {'rows': rows, 'next_offset': offset + limit if has_more else None, 'skipped_uploads': list(skipped)}
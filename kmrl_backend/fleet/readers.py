@@ -0,0 +1,212 @@
+"""
+Bounded-memory readers over stored CSV uploads.
+
+Rows are addressed by ``(upload_id, row_index)``, which doubles as the cursor
+for paginated and streamed reads of ``get_csv_data``.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import CSVUpload, CSVDataRow
+
+DEFAULT_CHUNK_SIZE = 2000
+
+Cursor = Tuple[int, int]
+
+
+def encode_cursor(upload_id: int, row_index: int) -> str:
+    return f'{upload_id}:{row_index}'
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Cursor]:
+    """Parse an ``<upload_id>:<row_index>`` cursor. Raises ValueError if malformed."""
+    if not token:
+        return None
+    try:
+        upload_id, row_index = token.split(':', 1)
+        return int(upload_id), int(row_index)
+    except ValueError:
+        raise ValueError(f'Invalid cursor: {token}')
+
+
+def get_chunk_size() -> int:
+    return int(getattr(settings, 'CSV_DATA_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+
+def serialize_upload(upload: CSVUpload) -> Dict[str, Any]:
+    """Upload metadata as returned by get_csv_data (``source`` must be select_related)."""
+    return {
+        'upload_id': upload.id,
+        'source': upload.source.name,
+        'filename': upload.filename,
+        'headers': upload.headers,
+        'row_count': upload.row_count,
+        'uploaded_at': upload.uploaded_at,
+    }
+
+
+def iter_upload_rows(upload: CSVUpload, after_index: int = -1,
+                     chunk_size: int = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield ``(row_index, row_data)`` for one upload, in row order, starting after ``after_index``.
+
+    Row-stored uploads are read with a server-side iterator in chunks of
+    ``chunk_size``; columnar uploads are sliced from their memory-mapped columns.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+
+    if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+        from . import columnar  # NumPy/pandas, only needed for columnar uploads
+        df = columnar.load_upload_frame(upload)
+        for start in range(after_index + 1, len(df), chunk_size):
+            records = columnar.frame_to_records(df.iloc[start:start + chunk_size])
+            for offset, row_data in enumerate(records):
+                yield start + offset, row_data
+        return
+
+    rows = (
+        CSVDataRow.objects
+        .filter(upload_id=upload.id, row_index__gt=after_index)
+        .order_by('row_index')
+        .values_list('row_index', 'row_data')
+    )
+    yield from rows.iterator(chunk_size=chunk_size)
+
+
+def iter_rows(uploads, cursor: Cursor = None,
+              chunk_size: int = None) -> Iterator[Tuple[CSVUpload, int, Dict[str, Any]]]:
+    """
+    Yield ``(upload, row_index, row_data)`` across uploads ordered by id, resuming after ``cursor``.
+
+    Args:
+        uploads: CSVUpload queryset (will be ordered by id and iterated in chunks)
+        cursor: ``(upload_id, row_index)`` of the last row already returned
+        chunk_size: Rows fetched per database round trip
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    uploads = uploads.select_related('source').order_by('id')
+    if cursor:
+        uploads = uploads.filter(id__gte=cursor[0])
+
+    for upload in uploads.iterator(chunk_size=chunk_size):
+        after_index = cursor[1] if cursor and upload.id == cursor[0] else -1
+        for row_index, row_data in iter_upload_rows(upload, after_index, chunk_size):
+            yield upload, row_index, row_data
+
+
+def iter_ndjson(uploads, cursor: Cursor = None, limit: int = None) -> Iterable[str]:
+    """
+    Render rows as newline-delimited JSON.
+
+    Each upload is announced by a ``{"type": "upload", ...}`` line, followed by
+    one ``{"type": "row", ...}`` line per row. When ``limit`` stops the stream
+    early, a final ``{"type": "cursor", "next_cursor": ...}`` line is emitted.
+    """
+    encoder = JSONEncoder()
+    current_upload_id = None
+    last = None
+    emitted = 0
+
+    for upload, row_index, row_data in iter_rows(uploads, cursor):
+        if limit is not None and emitted >= limit:
+            yield encoder.encode({'type': 'cursor', 'next_cursor': encode_cursor(*last)}) + '\n'
+            return
+
+        if upload.id != current_upload_id:
+            current_upload_id = upload.id
+            yield encoder.encode({'type': 'upload', **serialize_upload(upload)}) + '\n'
+
+        yield encoder.encode({
+            'type': 'row',
+            'upload_id': upload.id,
+            'row_index': row_index,
+            'row_data': row_data
+        }) + '\n'
+        last = (upload.id, row_index)
+        emitted += 1
+
+
+def read_page(uploads, cursor: Cursor = None, limit: int = 1000) -> Dict[str, Any]:
+    """
+    Read one cursor page of rows.
+
+    Returns:
+        Dict with ``uploads`` (metadata for uploads on this page), ``rows`` and
+        ``next_cursor`` (None on the last page)
+    """
+    page_uploads = {}
+    rows = []
+    next_cursor = None
+
+    for upload, row_index, row_data in iter_rows(uploads, cursor, chunk_size=min(limit + 1, get_chunk_size())):
+        if len(rows) >= limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(last['upload_id'], last['row_index'])
+            break
+        if upload.id not in page_uploads:
+            page_uploads[upload.id] = serialize_upload(upload)
+        rows.append({'upload_id': upload.id, 'row_index': row_index, 'row_data': row_data})
+
+    return {
+        'uploads': list(page_uploads.values()),
+        'rows': rows,
+        'next_cursor': next_cursor
+    }
+
+
+def _columnar_rows(upload: CSVUpload, after_index: int, count: int) -> List[Tuple[int, Dict[str, Any]]]:
+    from . import columnar
+    df = columnar.load_upload_frame(upload)
+    start = after_index + 1
+    return list(enumerate(columnar.frame_to_records(df.iloc[start:start + count]), start))
+
+
+async def aread_page(uploads, cursor: Cursor = None, limit: int = 1000) -> Dict[str, Any]:
+    """
+    ``read_page`` on the async ORM, for the async API views.
+
+    Each upload on the page costs one row query, bounded by the rows the page
+    still needs; columnar uploads are sliced on a worker thread.
+    """
+    uploads = uploads.select_related('source').order_by('id')
+    if cursor:
+        uploads = uploads.filter(id__gte=cursor[0])
+
+    page_uploads = {}
+    rows = []
+    next_cursor = None
+
+    async for upload in uploads.aiterator(chunk_size=get_chunk_size()):
+        after_index = cursor[1] if cursor and upload.id == cursor[0] else -1
+        wanted = limit + 1 - len(rows)
+        if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+            records = await sync_to_async(_columnar_rows)(upload, after_index, wanted)
+        else:
+            queryset = (
+                CSVDataRow.objects
+                .filter(upload_id=upload.id, row_index__gt=after_index)
+                .order_by('row_index')
+                .values_list('row_index', 'row_data')
+            )
+            records = [record async for record in queryset[:wanted]]
+
+        for row_index, row_data in records:
+            if len(rows) >= limit:
+                last = rows[-1]
+                next_cursor = encode_cursor(last['upload_id'], last['row_index'])
+                break
+            if upload.id not in page_uploads:
+                page_uploads[upload.id] = serialize_upload(upload)
+            rows.append({'upload_id': upload.id, 'row_index': row_index, 'row_data': row_data})
+        if next_cursor is not None:
+            break
+
+    return {
+        'uploads': list(page_uploads.values()),
+        'rows': rows,
+        'next_cursor': next_cursor
+    }
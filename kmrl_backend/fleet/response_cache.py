@@ -0,0 +1,166 @@
+"""
+Conditional-GET caching for polled listings (trains, ML models, state history).
+
+Each cached resource has a version token in the ``responses`` cache, replaced
+whenever one of its models is saved or deleted (see ``fleet.signals``), after
+the transaction commits. A listing's ETag is derived from the token, so an
+unchanged poll is answered with 304 from the token alone, and a poll without
+a matching ``If-None-Match`` gets the rendered payload stored for the current
+token instead of a query plus serialization.
+
+Tokens are unique values rather than incremented counters: the file-based
+cache shared by worker processes cannot increment atomically, and a lost
+increment would leave a stale payload cached under the current version.
+"""
+
+import hashlib
+import uuid
+from functools import partial, wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.views import APIView
+
+CACHE_ALIAS = 'responses'
+RESOURCES = ('trains', 'ml_models', 'history')
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(resource: str) -> str:
+    return f'fleet:version:{resource}'
+
+
+def get_version(resource: str) -> str:
+    """Current version token of a resource (created on first use)."""
+    cache = _cache()
+    version = cache.get(_version_key(resource))
+    if version is None:
+        cache.add(_version_key(resource), uuid.uuid4().hex, timeout=None)
+        version = cache.get(_version_key(resource))
+    return version
+
+
+async def aget_version(resource: str) -> str:
+    cache = _cache()
+    version = await cache.aget(_version_key(resource))
+    if version is None:
+        await cache.aadd(_version_key(resource), uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(_version_key(resource))
+    return version
+
+
+def bump_version(resource: str):
+    """Invalidate every cached response of a resource."""
+    _cache().set(_version_key(resource), uuid.uuid4().hex, timeout=None)
+
+
+def bump_version_on_commit(resource: str):
+    """Bump once the current transaction commits, so no reader caches uncommitted state."""
+    transaction.on_commit(partial(bump_version, resource))
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def _request_variant(request, variant=None) -> str:
+    # Plain Django (async) views only render JSON
+    renderer = getattr(request, 'accepted_renderer', None)
+    extra = variant(request) if variant is not None else ''
+    variant_key = f'{request.get_full_path()}|{renderer.format if renderer else "json"}|{extra}'
+    return hashlib.sha1(variant_key.encode()).hexdigest()[:16]
+
+
+def _not_modified(request, etag: str):
+    if not _matches(request.headers.get('If-None-Match', ''), etag):
+        return None
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+def _finalize(response, etag: str):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(resource: str, variant=None):
+    """
+    Serve a GET view from the response cache, keyed by the resource version,
+    the full path and the negotiated format. Wrap the view itself (below
+    ``@api_view`` or as a viewset method), so authentication still runs.
+    Async views are wrapped with an async wrapper using the async cache API.
+    Only 200 responses are stored.
+
+    ``variant(request)`` returns any other state the response depends on,
+    e.g. today's date for a default date range; it is part of the key.
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f'Unknown cached resource: {resource}')
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != 'GET':
+                    return await view(request, *args, **kwargs)
+
+                variant_hash = _request_variant(request, variant)
+                version = await aget_version(resource)
+                etag = f'"{resource}-{version}-{variant_hash}"'
+                not_modified = _not_modified(request, etag)
+                if not_modified is not None:
+                    return not_modified
+
+                cache = _cache()
+                cache_key = f'fleet:response:{resource}:{version}:{variant_hash}'
+                cached = await cache.aget(cache_key)
+                if cached is not None:
+                    content, content_type = cached
+                    response = HttpResponse(content, content_type=content_type)
+                else:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code == 200:
+                        timeout = getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+                        await cache.aset(cache_key, (response.content, response['Content-Type']), timeout)
+                return _finalize(response, etag)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[1] if isinstance(args[0], APIView) else args[0]
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            variant_hash = _request_variant(request, variant)
+            version = get_version(resource)
+            etag = f'"{resource}-{version}-{variant_hash}"'
+            not_modified = _not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+            cache = _cache()
+            cache_key = f'fleet:response:{resource}:{version}:{variant_hash}'
+            cached = cache.get(cache_key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view(*args, **kwargs)
+                if response.status_code == 200:
+                    timeout = getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+                    response.add_post_render_callback(
+                        lambda rendered: cache.set(cache_key, (rendered.content, rendered['Content-Type']), timeout)
+                    )
+            return _finalize(response, etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,68 @@
+"""
+Mergeable summary statistics (count, Welford mean / M2, min, max).
+
+A summary of one chunk of data can be merged with the summary of another
+(Chan et al. parallel update), so statistics over a growing set of uploads
+are built from per-upload summaries instead of re-reading every row.
+Summaries are plain JSON-serialisable dicts.
+"""
+
+import math
+from typing import Dict, Iterable
+
+import numpy as np
+
+EMPTY = {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None}
+
+
+def summarize(values) -> Dict[str, float]:
+    """Summarise an array of values, ignoring NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return dict(EMPTY)
+
+    mean = values.mean()
+    deviations = values - mean
+    return {
+        'count': int(len(values)),
+        'mean': float(mean),
+        'm2': float(np.multiply(deviations, deviations).sum()),
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+
+
+def merge(a: Dict[str, float], b: Dict[str, float]) -> Dict[str, float]:
+    """Combine two summaries into the summary of their union."""
+    if not b['count']:
+        return dict(a)
+    if not a['count']:
+        return dict(b)
+
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    return {
+        'count': count,
+        'mean': a['mean'] + delta * b['count'] / count,
+        'm2': a['m2'] + b['m2'] + delta * delta * a['count'] * b['count'] / count,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max'])
+    }
+
+
+def merge_all(summaries: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    result = dict(EMPTY)
+    for summary in summaries:
+        result = merge(result, summary)
+    return result
+
+
+def variance(summary: Dict[str, float]) -> float:
+    """Population variance (``np.var`` semantics)."""
+    return summary['m2'] / summary['count'] if summary['count'] else float('nan')
+
+
+def std(summary: Dict[str, float]) -> float:
+    """Population standard deviation (``np.std`` semantics)."""
+    return math.sqrt(variance(summary))
@@ -0,0 +1,137 @@
+"""
+Batch what-if scenario evaluation for the Simulate page.
+
+Each scenario is a set of score weights, a target mileage and per-train
+feature overrides (e.g. ``{"TS-07": {"fc_sig": false}}``). All scenarios are
+scored against the fleet in one pass: the features become a
+(scenarios x trains) matrix and go through the same composite score formula
+as ``TrainOptimizationModel``. Rankings are compared against the baseline
+(default weights, no overrides).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ml_models import (
+    DEFAULT_SCORE_WEIGHTS, SCORE_FEATURES, TARGET_MILEAGE,
+    combine_sub_scores, score_components, score_feature_arrays
+)
+
+
+@dataclass
+class Scenario:
+    name: str
+    weights: Dict[str, float] = field(default_factory=dict)  # overrides for DEFAULT_SCORE_WEIGHTS
+    target_mileage: float = TARGET_MILEAGE
+    overrides: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # train_id -> {feature: value}
+
+
+def parse_scenarios(payload: List[Dict[str, Any]]) -> List[Scenario]:
+    """
+    Validate request scenarios.
+
+    Raises:
+        ValueError: On unknown weights or features, or non-numeric values
+    """
+    if not isinstance(payload, list):
+        raise ValueError('scenarios must be a list')
+
+    scenarios = []
+    for idx, item in enumerate(payload):
+        if not isinstance(item, dict):
+            raise ValueError(f'Scenario {idx} must be an object')
+
+        weights = item.get('weights') or {}
+        unknown = set(weights) - set(DEFAULT_SCORE_WEIGHTS)
+        if unknown:
+            raise ValueError(f'Scenario {idx}: unknown score weights {sorted(unknown)}')
+
+        overrides = item.get('overrides') or {}
+        for train_id, values in overrides.items():
+            unknown = set(values) - set(SCORE_FEATURES)
+            if unknown:
+                raise ValueError(f'Scenario {idx}: unknown features {sorted(unknown)} for {train_id}')
+
+        scenarios.append(Scenario(
+            name=str(item.get('name') or f'scenario-{idx + 1}'),
+            weights={key: float(value) for key, value in weights.items()},
+            target_mileage=float(item.get('target_mileage', TARGET_MILEAGE)),
+            overrides={train_id: {key: float(value) for key, value in values.items()}
+                       for train_id, values in overrides.items()}
+        ))
+    return scenarios
+
+
+def _rank(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Order (best first) and 1-based rank of each train, row by row; ties keep fleet order."""
+    order = np.argsort(-scores, axis=-1, kind='stable')
+    ranks = np.empty_like(order)
+    positions = np.broadcast_to(np.arange(1, scores.shape[-1] + 1), order.shape)
+    np.put_along_axis(ranks, order, positions, axis=-1)
+    return order, ranks
+
+
+def evaluate_scenarios(fleet: pd.DataFrame, scenarios: List[Scenario], top: int = None) -> Dict[str, Any]:
+    """
+    Score and rank the fleet under every scenario.
+
+    Args:
+        fleet: One row per train (``train_id`` plus the score features)
+        scenarios: Parsed scenarios
+        top: Only return the best ``top`` trains of each ranking
+
+    Returns:
+        ``baseline`` and ``scenarios`` rankings. Each ranking lists train ids
+        best first with aligned ``scores`` and, for scenarios, ``rank_deltas``
+        (baseline rank minus scenario rank, positive means moved up).
+    """
+    train_ids = np.asarray(fleet['train_id'], dtype=object)
+    position = {train_id: idx for idx, train_id in enumerate(train_ids)}
+    n_scenarios, n_trains = len(scenarios), len(train_ids)
+
+    base_features = score_feature_arrays(fleet)
+    baseline_scores = combine_sub_scores(score_components(base_features), DEFAULT_SCORE_WEIGHTS)
+    baseline_order, baseline_ranks = _rank(baseline_scores)
+
+    # (scenarios x trains) feature matrices with the overrides scattered in
+    features = {name: np.repeat(values[None, :], n_scenarios, axis=0) for name, values in base_features.items()}
+    for s_idx, scenario in enumerate(scenarios):
+        for train_id, values in scenario.overrides.items():
+            if train_id not in position:
+                raise ValueError(f'Scenario {scenario.name}: unknown train {train_id}')
+            for name, value in values.items():
+                features[name][s_idx, position[train_id]] = value
+
+    target_mileage = np.array([scenario.target_mileage for scenario in scenarios], dtype=np.float64)[:, None]
+    weights = {
+        key: np.array([scenario.weights.get(key, default) for scenario in scenarios], dtype=np.float64)[:, None]
+        for key, default in DEFAULT_SCORE_WEIGHTS.items()
+    }
+    scores = combine_sub_scores(score_components(features, target_mileage), weights)
+    order, ranks = _rank(scores)
+    rank_deltas = baseline_ranks[None, :] - ranks
+
+    limit = n_trains if top is None else max(0, min(top, n_trains))
+    order = order[:, :limit]
+    ranked_scores = np.round(np.take_along_axis(scores, order, axis=1), 2)
+    ranked_deltas = np.take_along_axis(rank_deltas, order, axis=1)
+
+    baseline_order = baseline_order[:limit]
+    baseline = {
+        'train_ids': train_ids[baseline_order].tolist(),
+        'scores': np.round(baseline_scores[baseline_order], 2).tolist()
+    }
+
+    results = []
+    for s_idx, scenario in enumerate(scenarios):
+        results.append({
+            'name': scenario.name,
+            'train_ids': train_ids[order[s_idx]].tolist(),
+            'scores': ranked_scores[s_idx].tolist(),
+            'rank_deltas': ranked_deltas[s_idx].tolist()
+        })
+
+    return {'baseline': baseline, 'scenarios': results}
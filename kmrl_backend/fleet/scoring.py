@@ -0,0 +1,50 @@
+"""
+Composite suitability score constants, and the score of a single train in
+plain Python.
+
+``fleet.ml_models`` scores whole frames with NumPy (``score_components``);
+``train_score`` is the same formula for one train, for code on the request
+path that must not import NumPy or pandas (the fleet history, appended on
+every Train save).
+"""
+
+from typing import Any, Dict, Mapping
+
+TARGET_MILEAGE = 950
+MILEAGE_TOLERANCE = 250
+CLEANING_DUE_SCORE = 0.65
+DEFAULT_SCORE_WEIGHTS = {
+    'fc': 0.4, 'jobs': 0.2, 'mileage': 0.2, 'stabling': 0.1, 'cleaning': 0.1
+}
+SCORE_FEATURES = ('fc_rs', 'fc_sig', 'fc_tel', 'open_jobs', 'mileage_km', 'stabling_penalty', 'cleaning_due')
+
+
+def _floor_zero(value: float) -> float:
+    """``max(0, x)``, with NaN -> 0 as in ``ml_models._floor_zero``."""
+    return value if value > 0 else 0.0
+
+
+def train_sub_scores(features: Mapping[str, Any], target_mileage: float = TARGET_MILEAGE) -> Dict[str, float]:
+    """The ``score_components`` of one train, from its ``SCORE_FEATURES`` values."""
+    return {
+        'fc': (int(features['fc_rs']) + int(features['fc_sig']) + int(features['fc_tel'])) / 3.0,
+        'jobs': _floor_zero(1 - (features['open_jobs'] * 0.2)),
+        'mileage': _floor_zero(1 - (abs(features['mileage_km'] - target_mileage) / MILEAGE_TOLERANCE)),
+        'stabling': _floor_zero(1 - (features['stabling_penalty'] / 100)),
+        'cleaning': CLEANING_DUE_SCORE if features['cleaning_due'] else 1.0,
+    }
+
+
+def train_score(features: Mapping[str, Any], weights: Mapping[str, float] = None) -> float:
+    """Composite score (0-100) of one train, as ``combine_sub_scores`` computes it."""
+    weights = weights or DEFAULT_SCORE_WEIGHTS
+    sub_scores = train_sub_scores(features)
+    composite = (
+        sub_scores['fc'] * weights['fc'] +
+        sub_scores['jobs'] * weights['jobs'] +
+        sub_scores['mileage'] * weights['mileage'] +
+        sub_scores['stabling'] * weights['stabling'] +
+        sub_scores['cleaning'] * weights['cleaning']
+    )
+    scaled = _floor_zero(composite * 100)
+    return scaled if scaled < 100 else 100.0
@@ -4,4 +4,27 @@ from .models import Train
 class TrainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class TrainUpsertListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        seen, duplicates = set(), set()
+        for row in attrs:
+            (duplicates if row['train_id'] in seen else seen).add(row['train_id'])
+        if duplicates:
+            raise serializers.ValidationError(f'Duplicate train_id in payload: {", ".join(sorted(duplicates))}')
+        return attrs
+
+class TrainUpsertSerializer(serializers.ModelSerializer):
+    """One train of a bulk upsert; train_id identifies the row instead of having to be new"""
+    train_id = serializers.CharField(max_length=10)
+
+    class Meta:
+        model = Train
+        exclude = ['id']
+        list_serializer_class = TrainUpsertListSerializer
+
+    def validate(self, attrs):
+        if 'train_id' not in attrs:
+            raise serializers.ValidationError({'train_id': 'This field is required.'})
+        return attrs
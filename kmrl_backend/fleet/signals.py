@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import CSVUpload, MLModel, MLTrainingSession, Train, TrainState
+from .response_cache import bump_version_on_commit
+
+@receiver(post_delete, sender=CSVUpload)
+def delete_columnar_data(sender, instance, **kwargs):
+    """Remove column files when a columnar upload is deleted"""
+    if instance.storage_format == CSVUpload.STORAGE_COLUMNAR:
+        from . import columnar
+        columnar.delete_upload(instance)
+
+@receiver(post_delete, sender=MLTrainingSession)
+def delete_model_artifacts(sender, instance, **kwargs):
+    """Remove the artifact version a deleted training session wrote"""
+    if instance.artifact_path:
+        from . import artifacts
+        artifacts.delete_artifacts(instance.artifact_path)
+
+@receiver([post_save, post_delete], sender=Train)
+def invalidate_trains(sender, instance, **kwargs):
+    """Invalidate cached train listings"""
+    bump_version_on_commit('trains')
+
+@receiver([post_save, post_delete], sender=Train)
+def update_fleet_features(sender, instance, signal, **kwargs):
+    """Version the change for fleet feature snapshots and apply it to this process's one"""
+    from .feature_store import feature_store
+    feature_store.record_change(instance, deleted=signal is post_delete)
+
+@receiver([post_save, post_delete], sender=Train)
+def record_train_state(sender, instance, signal, **kwargs):
+    """Append the saved or deleted train's state to the fleet history"""
+    from .history import record_states, state_of
+    source = TrainState.SOURCE_REMOVED if signal is post_delete else TrainState.SOURCE_CHANGE
+    record_states([state_of(instance)], source)
+
+@receiver([post_save, post_delete], sender=MLModel)
+@receiver([post_save, post_delete], sender=MLTrainingSession)
+def invalidate_ml_models(sender, instance, **kwargs):
+    """Invalidate cached ML model listings"""
+    bump_version_on_commit('ml_models')
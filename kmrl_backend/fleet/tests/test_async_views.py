@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase
+
+from ..benchmarks import synthetic_csv_rows, synthetic_fleet_frame
+from ..middleware import StaticFilesMiddleware
+from ..training import create_training_session, run_training_session
+from .utils import FleetAPITestCase
+
+
+class AsyncViewTests(FleetAPITestCase):
+    """The /api/async/ endpoints answer like their synchronous counterparts."""
+
+    def setUp(self):
+        super().setUp()
+        # The async views authenticate from the session, not through DRF
+        self.client.force_login(self.user)
+        self.rows = synthetic_csv_rows(8, trains=4)
+
+    def ingest(self, prefix, source):
+        payload = {'source': source, 'fileName': 'feed.csv', 'headers': list(self.rows[0]), 'rows': self.rows}
+        return self.client.post(f'/api{prefix}/csv/ingest/', payload, format='json')
+
+    def test_ingest_and_read(self):
+        self.assertEqual(self.ingest('', 'sync').status_code, 201)
+        response = self.ingest('/async', 'async')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['row_count'], 8)
+        self.assertTrue(self.ingest('/async', 'async').json()['duplicate'])
+
+        for source in ('sync', 'async'):
+            with self.subTest(source=source):
+                params = {'source': source, 'limit': 5}
+                expected = self.client.get('/api/csv/data/', params).json()
+                page = self.client.get('/api/async/csv/data/', params).json()
+                self.assertEqual([row['row_data'] for row in page['rows']],
+                                 [row['row_data'] for row in expected['rows']])
+                self.assertEqual(page['next_cursor'], expected['next_cursor'])
+
+        self.assertEqual(self.client.get('/api/async/csv/data/', {'source': 'missing'}).status_code, 404)
+        self.assertEqual(self.client.post('/api/async/csv/ingest/', '[]', content_type='application/json').status_code,
+                         400)
+
+    def test_predict_and_model_listing(self):
+        self.ingest('', 'feed')
+        training_session = create_training_session('train_optimization', 'model', {}, ['feed'])
+        run_training_session(training_session.id)
+
+        payload = {'model_id': training_session.model_id, 'input_data': synthetic_fleet_frame(4).to_dict('records')}
+        expected = self.client.post('/api/ml/predict/', payload, format='json').json()
+        self.assertEqual(self.client.post('/api/async/ml/predict/', payload, format='json').json(), expected)
+        self.assertEqual(self.client.post('/api/async/ml/predict/', {'model_id': 999}, format='json').status_code, 404)
+
+        self.assertEqual(self.client.get('/api/async/ml/models/').json(), self.client.get('/api/ml/models/').json())
+
+    def test_authentication_and_csrf(self):
+        self.assertEqual(Client().get('/api/async/ml/models/').status_code, 403)
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        self.assertEqual(client.get('/api/async/ml/models/').status_code, 200)
+        self.assertEqual(client.post('/api/async/ml/predict/', {'model_id': 1},
+                                     content_type='application/json').status_code, 403)
+
+
+class StaticFilesTests(SimpleTestCase):
+    """StaticFilesMiddleware serves STATIC_ROOT under WSGI and ASGI, with and without autorefresh."""
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        Path(self.static_root, 'app.js').write_text('console.log("rops");')
+
+    def get(self, path, asynchronous, autorefresh):
+        def view(request):
+            return HttpResponse('view')
+
+        async def async_view(request):
+            return HttpResponse('view')
+
+        with self.settings(STATIC_ROOT=self.static_root, WHITENOISE_AUTOREFRESH=autorefresh):
+            middleware = StaticFilesMiddleware(async_view if asynchronous else view)
+        request = RequestFactory().get(path)
+        if not asynchronous:
+            return middleware(request)
+
+        async def call():
+            return await middleware(request)
+        return async_to_sync(call)()
+
+    def test_serves_static_files_sync_and_async(self):
+        for asynchronous in (False, True):
+            for autorefresh in (False, True):
+                with self.subTest(asynchronous=asynchronous, autorefresh=autorefresh):
+                    response = self.get('/static/app.js', asynchronous, autorefresh)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(b''.join(response), b'console.log("rops");')
+                    self.assertEqual(response['Content-Type'].split(';')[0], 'text/javascript')
+                    response.close()
+
+                    self.assertEqual(self.get('/api/trains/', asynchronous, autorefresh).content, b'view')
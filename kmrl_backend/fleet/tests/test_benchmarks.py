@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from ..benchmarks import compare_to_baseline, synthetic_csv_rows, synthetic_fleet_frame
+
+
+def report(**results):
+    return {'results': {name: {'queries': 1, 'peak_memory_bytes': None, **result} for name, result in results.items()}}
+
+
+class SyntheticDataTests(SimpleTestCase):
+    def test_same_seed_gives_same_data(self):
+        self.assertTrue(synthetic_fleet_frame(50, seed=1).equals(synthetic_fleet_frame(50, seed=1)))
+        self.assertFalse(synthetic_fleet_frame(50, seed=1).equals(synthetic_fleet_frame(50, seed=2)))
+        self.assertEqual(synthetic_csv_rows(20, trains=5), synthetic_csv_rows(20, trains=5))
+
+    def test_csv_rows_cycle_over_the_fleet(self):
+        rows = synthetic_csv_rows(7, trains=3)
+        self.assertEqual([row['train_id'] for row in rows], ['TS-01', 'TS-02', 'TS-03'] * 2 + ['TS-01'])
+
+
+class BaselineComparisonTests(SimpleTestCase):
+    def test_regressions(self):
+        baseline = report(slow={'seconds': 0.1}, noisy={'seconds': 0.001}, queries={'seconds': 0.1},
+                          memory={'seconds': 0.1, 'peak_memory_bytes': 1000}, only_baseline={'seconds': 1})
+        current = report(slow={'seconds': 0.2}, noisy={'seconds': 0.003}, queries={'seconds': 0.1, 'queries': 2},
+                         memory={'seconds': 0.1, 'peak_memory_bytes': 2000}, only_current={'seconds': 9})
+
+        regressions = compare_to_baseline(current, baseline)
+        self.assertEqual([message.split(':')[0] for message in regressions], ['slow', 'queries', 'memory'])
+
+    def test_within_tolerance(self):
+        baseline = report(fast={'seconds': 0.1, 'peak_memory_bytes': 1000})
+        self.assertEqual(compare_to_baseline(report(fast={'seconds': 0.12, 'peak_memory_bytes': 1200}), baseline), [])
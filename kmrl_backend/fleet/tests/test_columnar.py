@@ -0,0 +1,33 @@
+import numpy as np
+
+from ..columnar import load_upload_frame
+from ..ingestion import CSVIngestionEngine
+from .utils import FleetAPITestCase
+
+HEADERS = ['train_id', 'mileage_km', 'open_jobs', 'fc_rs', 'note']
+ROWS = [
+    {'train_id': 'TS-01', 'mileage_km': '950', 'open_jobs': '0', 'fc_rs': 'true', 'note': 'ok'},
+    {'train_id': 'TS-02', 'mileage_km': '800', 'open_jobs': '2', 'fc_rs': 'false', 'note': '1'},
+    {'train_id': 'TS-03', 'mileage_km': '', 'open_jobs': '1', 'fc_rs': 'yes', 'note': 'hold'},
+    {'train_id': 'TS-04', 'mileage_km': '1200.5', 'open_jobs': '3', 'fc_rs': 'no', 'note': 'true'},
+]
+
+
+class ColumnarStorageTests(FleetAPITestCase):
+    def ingest(self, source, batch_size):
+        return CSVIngestionEngine(batch_size=batch_size, storage='columnar').ingest(source, 'feed.csv', HEADERS, ROWS)
+
+    def test_columns_are_typed(self):
+        frame = load_upload_frame(self.ingest('feed', batch_size=1000).upload)
+        self.assertEqual(list(frame.columns), HEADERS)
+        self.assertEqual(frame['open_jobs'].dtype, np.int64)
+        self.assertEqual(frame['fc_rs'].tolist(), [True, False, True, False])
+        self.assertEqual(frame['mileage_km'].dtype, np.float64)
+        self.assertTrue(np.isnan(frame['mileage_km'][2]))
+        self.assertEqual(frame['note'].tolist(), ['ok', '1', 'hold', 'true'])
+
+    def test_chunked_write_matches_single_chunk(self):
+        whole = load_upload_frame(self.ingest('whole', batch_size=1000).upload)
+        chunked = load_upload_frame(self.ingest('chunked', batch_size=1).upload)
+        self.assertEqual(list(chunked.dtypes), list(whole.dtypes))
+        self.assertTrue(chunked.equals(whole))
@@ -0,0 +1,70 @@
+import numpy as np
+from django.db import transaction
+
+from ..benchmarks import synthetic_csv_rows, synthetic_fleet_frame
+from ..feature_store import FEATURES, bump_version, feature_store, get_fleet
+from ..ml_models import TrainOptimizationModel
+from ..models import Train
+from ..training import create_training_session, run_training_session
+from .utils import FleetAPITestCase
+
+
+def fleet_records(n, seed=42):
+    return synthetic_fleet_frame(n, seed).to_dict('records')
+
+
+class FeatureStoreTests(FleetAPITestCase):
+    def assertMatchesTable(self, snapshot):
+        trains = list(Train.objects.order_by('train_id').values('train_id', *FEATURES))
+        self.assertEqual(snapshot.train_ids.tolist(), [train['train_id'] for train in trains])
+        for name in FEATURES:
+            self.assertEqual(snapshot[name].tolist(), [train[name] for train in trains], name)
+
+    def test_snapshot_follows_saves_without_reloading(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for record in fleet_records(4):
+                Train.objects.create(**record)
+        self.assertMatchesTable(get_fleet())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            train = Train.objects.get(train_id='TS-02')
+            train.mileage_km = 1111
+            train.save()
+            Train.objects.get(train_id='TS-03').delete()
+            Train.objects.create(**{**fleet_records(1)[0], 'train_id': 'TS-00'})
+
+        # Only the version is read: the changes were applied in this process
+        with self.assertNumQueries(1):
+            snapshot = get_fleet()
+        self.assertMatchesTable(snapshot)
+        self.assertFalse(snapshot['mileage_km'].flags.writeable)
+
+    def test_writes_without_signals_reload_after_bump(self):
+        Train.objects.create(train_id='TS-01')
+        get_fleet()
+        with transaction.atomic():
+            Train.objects.filter(train_id='TS-01').update(open_jobs=3)
+            Train.objects.bulk_create([Train(**record) for record in fleet_records(3)[1:]])
+            bump_version()
+        self.assertMatchesTable(get_fleet())
+
+        # Another process's change: this process's snapshot is stale
+        feature_store.clear()
+        self.assertEqual(len(get_fleet()), 3)
+
+    def test_fleet_predictions(self):
+        rows = synthetic_csv_rows(40, trains=10)
+        self.client.post('/api/csv/ingest/', {
+            'source': 'feed', 'fileName': 'feed.csv', 'headers': list(rows[0]), 'rows': rows
+        }, format='json')
+        training_session = create_training_session('train_optimization', 'model', {}, ['feed'])
+        run_training_session(training_session.id)
+        Train.objects.bulk_create([Train(**record) for record in fleet_records(3)])
+        bump_version()
+
+        response = self.client.post('/api/ml/predict/', {'model_id': training_session.model_id, 'fleet': True},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['train_ids'], ['TS-01', 'TS-02', 'TS-03'])
+        np.testing.assert_allclose(response.data['predictions'],
+                                   TrainOptimizationModel().score_frame(synthetic_fleet_frame(3)))
@@ -0,0 +1,103 @@
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..benchmarks import synthetic_fleet_frame
+from ..history import record_states, roll_up_pending, state_history
+from ..models import Train, TrainState, TrainStateDaily
+from .utils import FleetAPITestCase
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class HistoryTests(FleetAPITestCase):
+    def test_history_of_changes(self):
+        train = Train.objects.create(train_id='TS-01', mileage_km=900)
+        train.mileage_km = 1000
+        train.save()
+
+        raw = self.client.get('/api/history/', {'interval': 'raw'})
+        self.assertEqual(raw.status_code, 200)
+        self.assertEqual([state['mileage_km'] for state in raw.data['states']], [900, 1000])
+
+        daily = self.client.get('/api/history/', {'train_id': 'TS-01'})
+        self.assertEqual(daily.status_code, 200)
+        today = timezone.localdate().isoformat()
+        self.assertEqual(daily.data['end'], today)
+        self.assertEqual(daily.data['series'][-1]['start'], today)
+        self.assertEqual(daily.data['series'][-1]['mileage_km'], 1000)
+        self.assertEqual(daily.data['series'][-1]['samples'], 2)
+
+        for params in ({'interval': 'hour'}, {'start': '2026-02-01', 'end': '2026-01-01'}, {'limit': 0}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get('/api/history/', params).status_code, 400)
+
+    def test_saves_append_states_that_queries_roll_up_once(self):
+        train = Train.objects.create(train_id='TS-01', mileage_km=900)
+        train.mileage_km = 1000
+        # The train, the fleet version (4 with its savepoint) and the TrainState row
+        with CaptureQueriesContext(connection) as queries:
+            train.save()
+        self.assertEqual(len(queries), 6)
+        self.assertFalse(TrainStateDaily.objects.exists())
+        self.assertEqual(TrainState.objects.filter(rolled_up=False).count(), 2)
+
+        state_history(timezone.localdate(), timezone.localdate(), 'day', 'TS-01')
+        roll_up_pending()
+        rollup = TrainStateDaily.objects.get()
+        self.assertEqual((rollup.samples, rollup.mileage_km), (2, 1000))
+        self.assertFalse(TrainState.objects.filter(rolled_up=False).exists())
+
+    def test_buckets_carry_the_last_state_forward(self):
+        first = timezone.localdate() - timedelta(days=10)
+        state = {'train_id': 'TS-01', **synthetic_fleet_frame(1).drop(columns='train_id').iloc[0].to_dict()}
+        record_states([{**state, 'mileage_km': 900}], TrainState.SOURCE_CHANGE, recorded_at=at(first))
+        record_states([{**state, 'mileage_km': 950}], TrainState.SOURCE_CHANGE, recorded_at=at(first, 18))
+        record_states([{**state, 'mileage_km': 1000}], TrainState.SOURCE_CHANGE,
+                      recorded_at=at(first + timedelta(days=2)))
+
+        series = state_history(first - timedelta(days=1), first + timedelta(days=3), 'day', 'TS-01')
+        self.assertEqual([bucket['start'] for bucket in series],
+                         [(first + timedelta(days=offset)).isoformat() for offset in range(4)])
+        self.assertEqual([bucket['mileage_km'] for bucket in series], [950, 950, 1000, 1000])
+        self.assertEqual([bucket['samples'] for bucket in series], [2, 0, 1, 0])
+
+        fleet = state_history(first, first + timedelta(days=3))
+        self.assertEqual([bucket['trains'] for bucket in fleet], [1, 1, 1, 1])
+        self.assertEqual([bucket['mileage_km_mean'] for bucket in fleet], [950, 950, 1000, 1000])
+
+    def test_upserts_and_induction_runs_are_recorded(self):
+        eligible = {'fc_rs': True, 'fc_sig': True, 'fc_tel': True, 'open_jobs': 0, 'cleaning_due': False}
+        trains = [{**record, **eligible} for record in synthetic_fleet_frame(6).to_dict('records')]
+        self.client.post('/api/trains/bulk-upsert/', {'trains': trains}, format='json')
+        self.assertEqual(TrainState.objects.filter(source=TrainState.SOURCE_CHANGE).count(), 6)
+
+        self.client.post('/api/induction/plan/', {'service': 3, 'standby': 1}, format='json')
+        recorded = TrainState.objects.filter(source=TrainState.SOURCE_INDUCTION)
+        self.assertEqual(sorted(recorded.values_list('assignment', flat=True)),
+                         ['ibl', 'ibl', 'service', 'service', 'service', 'standby'])
+
+        fleet = self.client.get('/api/history/').data['series']
+        self.assertEqual(fleet[-1]['assignments'], {'service': 3, 'standby': 1, 'ibl': 2})
+
+    def test_default_range_is_not_served_from_cache_after_midnight(self):
+        Train.objects.create(train_id='TS-01')
+        today = timezone.localdate()
+        first = self.client.get('/api/history/')
+        self.assertEqual(first.data['end'], today.isoformat())
+
+        tomorrow = today + timedelta(days=1)
+        with mock.patch('django.utils.timezone.localdate', return_value=tomorrow):
+            self.assertEqual(self.client.get('/api/history/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+            self.assertEqual(self.client.get('/api/history/').json()['end'], tomorrow.isoformat())
+
+        # An explicit range does not depend on the date
+        params = {'start': today.isoformat(), 'end': today.isoformat()}
+        etag = self.client.get('/api/history/', params)['ETag']
+        with mock.patch('django.utils.timezone.localdate', return_value=tomorrow):
+            self.assertEqual(self.client.get('/api/history/', params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,72 @@
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..benchmarks import synthetic_fleet_frame
+from ..induction import FEATURE_COLUMNS, IBL, InductionTargets, solve_induction_plan
+from ..models import Train
+from .utils import FleetAPITestCase
+
+ELIGIBLE = {'fc_rs': True, 'fc_sig': True, 'fc_tel': True, 'open_jobs': 0, 'cleaning_due': False}
+
+
+def eligible_fleet(n, seed=42):
+    fleet = synthetic_fleet_frame(n, seed)
+    for name, value in ELIGIBLE.items():
+        fleet[name] = value
+    return fleet
+
+
+def assignments(plan):
+    return {item['train_id']: item['assignment'] for item in plan['assignments']}
+
+
+class InductionSolverTests(SimpleTestCase):
+    def test_hard_rules_block_service_and_standby(self):
+        fleet = eligible_fleet(8)
+        fleet.loc[0, 'open_jobs'] = 2
+        fleet.loc[1, 'fc_sig'] = False
+
+        plan = solve_induction_plan(fleet, InductionTargets(service=4, standby=2))
+
+        roles = assignments(plan)
+        self.assertEqual((roles['TS-01'], roles['TS-02']), (IBL, IBL))
+        self.assertEqual(list(roles.values()).count('service'), 4)
+        self.assertEqual(plan['summary']['standby_assigned'], 2)
+
+    def test_cleaning_capacity_and_shortfall(self):
+        fleet = eligible_fleet(4)
+        fleet['cleaning_due'] = True
+
+        plan = solve_induction_plan(fleet, InductionTargets(service=3, cleaning_capacity=2))
+
+        summary = plan['summary']
+        self.assertEqual((summary['service_assigned'], summary['service_shortfall']), (2, 1))
+        self.assertEqual(summary['cleaning_slots_used'], 2)
+
+    def test_service_goes_to_the_best_scores(self):
+        fleet = eligible_fleet(6)
+        fleet['mileage_km'] = 950
+        fleet['stabling_penalty'] = [0, 90, 0, 90, 0, 90]
+        fleet['branding_shortfall'] = 0
+
+        plan = solve_induction_plan(fleet, InductionTargets(service=3))
+        self.assertEqual(sorted(train for train, role in assignments(plan).items() if role == 'service'),
+                         ['TS-01', 'TS-03', 'TS-05'])
+
+    def test_empty_fleet(self):
+        plan = solve_induction_plan(pd.DataFrame(columns=FEATURE_COLUMNS), InductionTargets(service=2))
+        self.assertEqual(plan['assignments'], [])
+
+
+class InductionPlanTests(FleetAPITestCase):
+    def test_plan_assigns_the_fleet(self):
+        Train.objects.bulk_create([Train(**record) for record in eligible_fleet(6).to_dict('records')])
+
+        response = self.client.post('/api/induction/plan/', {'service': 3, 'standby': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        summary = response.data['summary']
+        self.assertEqual((summary['trains'], summary['service_assigned'], summary['standby_assigned']), (6, 3, 1))
+
+        for payload in ({}, {'service': -1}, {'service': 2, 'weights': {'unknown': 1}}):
+            with self.subTest(**payload):
+                self.assertEqual(self.client.post('/api/induction/plan/', payload, format='json').status_code, 400)
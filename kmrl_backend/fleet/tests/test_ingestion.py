@@ -0,0 +1,101 @@
+import json
+
+from .. import columnar
+from ..benchmarks import synthetic_csv_rows
+from ..ingestion import CSVIngestionEngine, row_hash
+from ..models import CSVUpload
+from .utils import FleetAPITestCase, csv_text
+
+
+class IngestionTests(FleetAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rows = synthetic_csv_rows(6, trains=3)
+        self.headers = list(self.rows[0])
+
+    def ingest(self, **fields):
+        payload = {'source': 'feed', 'fileName': 'feed.csv', 'headers': self.headers, 'rows': self.rows, **fields}
+        return self.client.post('/api/csv/ingest/', payload, format='json')
+
+    def test_ingest_stores_rows(self):
+        response = self.ingest()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['row_count'], 6)
+        upload = CSVUpload.objects.get(id=response.data['upload_id'])
+        self.assertEqual([row.row_data for row in upload.data_rows.all()], self.rows)
+
+    def test_identical_upload_is_acknowledged_without_storing(self):
+        first = self.ingest()
+        self.assertFalse(first.data['duplicate'])
+        second = self.ingest(fileName='again.csv')
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data['duplicate'])
+        self.assertEqual(second.data['upload_id'], first.data['upload_id'])
+        self.assertEqual(CSVUpload.objects.count(), 1)
+
+    def test_invalid_requests_are_rejected(self):
+        self.assertEqual(self.ingest(rows=[]).status_code, 400)
+        for fields in ({'batch_size': 'abc'}, {'batch_size': 0}, {'storage': 'parquet'}):
+            with self.subTest(**fields):
+                response = self.ingest(**fields)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+        self.assertFalse(CSVUpload.objects.exists())
+
+    def test_stream_ingest(self):
+        for storage in ('rows', 'columnar'):
+            with self.subTest(storage=storage):
+                response = self.client.post(
+                    f'/api/csv/ingest/stream/?source=feed-{storage}&fileName=feed.csv&storage={storage}',
+                    csv_text(self.headers, self.rows), content_type='text/csv'
+                )
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.data['row_count'], 6)
+                self.assertEqual(CSVUpload.objects.get(id=response.data['upload_id']).storage_format, storage)
+
+        response = self.client.post('/api/csv/ingest/stream/?source=feed&fileName=feed.csv&batch_size=-1',
+                                    csv_text(self.headers, self.rows), content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+
+    def test_data_pages_follow_the_cursor(self):
+        self.ingest()
+        self.ingest(fileName='columnar.csv', storage='columnar', rows=self.rows[::-1])
+
+        rows, cursor = [], None
+        while True:
+            params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get('/api/csv/data/', params)
+            self.assertEqual(response.status_code, 200)
+            rows += response.data['rows']
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(len(rows), 12)
+        self.assertEqual([row['row_index'] for row in rows], [*range(6), *range(6)])
+        self.assertEqual(rows[0]['row_data']['train_id'], self.rows[0]['train_id'])
+        self.assertEqual(self.client.get('/api/csv/data/', {'limit': 0}).status_code, 400)
+
+    def test_ndjson_stream_stops_at_the_limit_with_a_cursor(self):
+        self.ingest()
+        response = self.client.get('/api/csv/data/', {'stream': 'ndjson', 'limit': 4})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['type'] for line in lines], ['upload', 'row', 'row', 'row', 'row', 'cursor'])
+
+        rest = self.client.get('/api/csv/data/', {'stream': 'ndjson', 'cursor': lines[-1]['next_cursor']})
+        rows = [json.loads(line) for line in b''.join(rest.streaming_content).splitlines()]
+        self.assertEqual([row['row_index'] for row in rows if row['type'] == 'row'], [4, 5])
+
+    def test_streamed_rows_keep_their_hashes(self):
+        expected = [row_hash(row_data) for row_data in self.rows]
+        for storage in ('rows', 'columnar'):
+            with self.subTest(storage=storage):
+                engine = CSVIngestionEngine(batch_size=4, storage=storage)
+                result = engine.ingest(f'feed-{storage}', 'feed.csv', self.headers, iter(self.rows))
+                if storage == 'columnar':
+                    stored = columnar.load_row_hashes(result.upload).tolist()
+                else:
+                    stored = list(result.upload.data_rows.values_list('row_hash', flat=True))
+                self.assertEqual(stored, expected)
+                self.assertTrue(engine.ingest(f'feed-{storage}', 'again.csv', self.headers, iter(self.rows)).duplicate)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from ..models import MLTrainingSession
+from .utils import FleetAPITestCase
+
+
+@mock.patch('fleet.jobs.submit_training')
+class TrainingJobTests(FleetAPITestCase):
+    def enqueue(self):
+        return self.client.post('/api/ml/jobs/', {'model_type': 'train_optimization'}, format='json')
+
+    def test_job_lifecycle(self, submit_training):
+        response = self.enqueue()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        session_id = response.data['training_session_id']
+        submit_training.assert_called_once_with(session_id)
+
+        polled = self.client.get(f'/api/ml/jobs/{session_id}/')
+        self.assertEqual(polled.status_code, 200)
+        self.assertEqual(polled.data['progress'], 0)
+
+        cancelled = self.client.post(f'/api/ml/jobs/{session_id}/cancel/')
+        self.assertEqual(cancelled.status_code, 200)
+        self.assertEqual(cancelled.data['status'], 'cancelled')
+        self.assertEqual(self.client.post(f'/api/ml/jobs/{session_id}/cancel/').status_code, 409)
+        self.assertEqual(self.client.get('/api/ml/jobs/999/').status_code, 404)
+
+    def test_invalid_jobs_are_rejected(self, submit_training):
+        for payload in ({}, {'model_type': 'unknown'}, {'model_type': 'train_optimization', 'row_limit': 0}):
+            with self.subTest(**payload):
+                self.assertEqual(self.client.post('/api/ml/jobs/', payload, format='json').status_code, 400)
+        submit_training.assert_not_called()
+
+    def test_queue_limit(self, submit_training):
+        self.assertEqual([self.enqueue().status_code for _ in range(3)], [202, 202, 429])
+        self.assertEqual(submit_training.call_count, 2)
+        self.assertEqual(MLTrainingSession.objects.count(), 2)
+
+    def test_train_endpoint_is_queued_too(self, submit_training):
+        payload = {'model_type': 'train_optimization'}
+        response = self.client.post('/api/ml/train/', payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        submit_training.assert_called_once_with(response.data['training_session_id'])
+
+        # It shares the queue limit with /api/ml/jobs/
+        self.assertEqual(self.enqueue().status_code, 202)
+        self.assertEqual(self.client.post('/api/ml/train/', payload, format='json').status_code, 429)
+
+    def test_stale_sessions_are_reaped(self, submit_training):
+        beating = self.enqueue().data['training_session_id']
+        self.enqueue()
+        stale = timezone.now() - timedelta(hours=1)
+        MLTrainingSession.objects.update(started_at=stale)
+        # A recent heartbeat keeps a long-running session alive
+        MLTrainingSession.objects.filter(id=beating).update(heartbeat_at=timezone.now())
+
+        self.assertEqual(self.enqueue().status_code, 202)
+        self.assertEqual(sorted(MLTrainingSession.objects.values_list('status', flat=True)),
+                         ['failed', 'pending', 'pending'])
+        self.assertEqual(MLTrainingSession.objects.get(id=beating).status, 'pending')
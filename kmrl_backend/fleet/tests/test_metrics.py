@@ -0,0 +1,31 @@
+from ..metrics import registry
+from .utils import FleetAPITestCase
+
+
+class PerformanceMetricsTests(FleetAPITestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_server_timing_on_demand(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/trains/'))
+
+        response = self.client.get('/api/trains/', HTTP_X_SERVER_TIMING='1')
+        entries = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        self.assertEqual(entries[:2], ['total', 'db'])
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/trains/')
+        self.client.get('/api/trains/')
+
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('kmrl_http_request_duration_seconds_count{view="train-list",method="GET",status="200"} 2', body)
+        self.assertIn('kmrl_http_request_db_queries_count{view="train-list"} 2', body)
+
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
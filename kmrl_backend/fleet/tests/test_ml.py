@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from .. import forest
+from ..benchmarks import synthetic_fleet_frame
+from ..ml_models import DEFAULT_SCORE_WEIGHTS, PredictiveMaintenanceModel, TrainOptimizationModel, create_model, load_model
+from ..scoring import train_score
+
+
+def reference_score(row) -> float:
+    """The composite score of one train, computed row by row as before vectorization."""
+    fc = (int(row['fc_rs']) + int(row['fc_sig']) + int(row['fc_tel'])) / 3
+    components = {
+        'fc': fc,
+        'jobs': max(0, 1 - row['open_jobs'] * 0.2),
+        'mileage': max(0, 1 - abs(row['mileage_km'] - 950) / 250),
+        'stabling': max(0, 1 - row['stabling_penalty'] / 100),
+        'cleaning': 0.65 if row['cleaning_due'] else 1.0,
+    }
+    composite = sum(components[name] * weight for name, weight in DEFAULT_SCORE_WEIGHTS.items())
+    return min(100, max(0, composite * 100))
+
+
+def reference_risk(row) -> float:
+    """Today's maintenance risk of one train, computed row by row as before vectorization."""
+    risk = row['open_jobs'] * 0.3 + (row['mileage_km'] / 1000) * 0.4 + row['stabling_penalty'] / 100 * 0.3
+    return min(1.0, risk)
+
+
+class ScoreTests(SimpleTestCase):
+    def test_vectorized_score_matches_row_formula(self):
+        fleet = synthetic_fleet_frame(500, seed=3)
+        # Values outside the usual ranges hit the clamps
+        fleet.loc[:4, 'open_jobs'] = [0, 5, 9, 0, 1]
+        fleet.loc[:4, 'mileage_km'] = [950, 0, 1200, 5000, 700]
+        fleet.loc[:4, 'stabling_penalty'] = [0, 100, 250, 0, 99]
+
+        scores = TrainOptimizationModel().score_frame(fleet)
+
+        expected = [reference_score(row) for row in fleet.to_dict('records')]
+        np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-9)
+
+    def test_single_train_score_matches_vectorized(self):
+        fleet = synthetic_fleet_frame(200, seed=5)
+        fleet.loc[:3, 'open_jobs'] = [0, 9, 0, 1]
+        fleet.loc[:3, 'mileage_km'] = [950, 0, 5000, 700]
+        scores = TrainOptimizationModel().score_frame(fleet)
+        np.testing.assert_allclose(scores, [train_score(row) for row in fleet.to_dict('records')], rtol=0, atol=1e-9)
+
+    def test_missing_columns_use_defaults(self):
+        scores = TrainOptimizationModel().score_frame(pd.DataFrame({'fc_rs': [True, False]}))
+        defaults = {'fc_sig': False, 'fc_tel': False, 'open_jobs': 0, 'mileage_km': 950,
+                    'stabling_penalty': 0, 'cleaning_due': False}
+        expected = [reference_score({**defaults, 'fc_rs': value}) for value in (True, False)]
+        np.testing.assert_allclose(scores, expected)
+
+
+class MaintenanceRiskTests(SimpleTestCase):
+    def setUp(self):
+        self.fleet = synthetic_fleet_frame(200, seed=4)
+        self.model = PredictiveMaintenanceModel({'prediction_horizon': 10})
+        self.model.train(self.fleet)
+
+    def test_vectorized_risk_matches_row_formula(self):
+        expected = [reference_risk(row) for row in self.fleet.to_dict('records')]
+        np.testing.assert_allclose(self.model.predict(self.fleet), expected, rtol=0, atol=1e-12)
+
+    def test_horizon_accrues_daily_mileage(self):
+        forecast = self.model.predict_horizon(self.fleet)
+        self.assertEqual(forecast['risk'].shape, (200, 10))
+        np.testing.assert_array_equal(forecast['risk'][:, 0], self.model.predict(self.fleet))
+
+        # Day d: the mileage of d more days at the weekly rate
+        row = self.fleet.iloc[7].to_dict()
+        for day in (3, 9):
+            projected = {**row, 'mileage_km': row['mileage_km'] * (1 + day / 7)}
+            self.assertAlmostEqual(forecast['risk'][7, day], reference_risk(projected), places=12)
+        self.assertTrue(np.all(np.diff(forecast['risk'], axis=1) >= 0))
+        np.testing.assert_array_equal(forecast['maintenance_needed'], forecast['risk'] >= 0.7)
+
+
+
+class SklearnBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.fleet = synthetic_fleet_frame(300, seed=5)
+        self.fleet['decision'] = np.where(self.fleet['open_jobs'] < 2, 'service', 'standby')
+
+    def fit(self, **config):
+        model = create_model('train_optimization', {'backend': 'sklearn', 'n_estimators': 10, 'n_jobs': 1, **config})
+        return model, model.train(self.fleet)
+
+    def test_regressor_learns_the_formula_score(self):
+        model, metrics = self.fit()
+        self.assertEqual((metrics['backend'], metrics['target']), ('sklearn', 'formula_score'))
+        self.assertGreater(metrics['train_r2'], 0.9)
+
+        predictions = model.predict(self.fleet)
+        np.testing.assert_array_equal(predictions, model.fitted_estimator().predict(model.feature_matrix(self.fleet)))
+        self.assertEqual(set(model.get_feature_importance()), set(model.config['features']))
+
+    def test_classifier_scores_the_positive_label(self):
+        model, metrics = self.fit(target='decision')
+        self.assertIn('train_accuracy', metrics)
+        estimator = model.fitted_estimator()
+        positive = list(estimator.classes_).index('service')
+        np.testing.assert_allclose(model.predict(self.fleet),
+                                   estimator.predict_proba(model.feature_matrix(self.fleet))[:, positive] * 100)
+
+        with self.assertRaisesRegex(Exception, 'positive_label'):
+            self.fit(target='decision', positive_label='ibl')
+
+    def test_parallel_fit_matches_serial_fit(self):
+        serial, _ = self.fit(random_state=1)
+        parallel, _ = self.fit(random_state=1, n_jobs=2)
+        np.testing.assert_allclose(parallel.predict(self.fleet), serial.predict(self.fleet), rtol=0, atol=1e-9)
+
+    def test_warm_start_grows_the_forest(self):
+        model, _ = self.fit(warm_start=True)
+        metrics = model.train(synthetic_fleet_frame(100, seed=6))
+        self.assertEqual(metrics['n_estimators'], 20)
+        self.assertFalse(model.supports_incremental)
+
+
+class ForestTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.random((2000, 8))
+        self.X[rng.random(self.X.shape) < 0.05] = np.nan
+        self.y = np.nan_to_num(self.X).sum(axis=1)
+        self.X_test = rng.random((1000, 8))
+        self.X_test[rng.random(self.X_test.shape) < 0.05] = np.nan
+
+    def test_flattened_regressor_predicts_like_sklearn(self):
+        estimator = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(self.X, self.y)
+        np.testing.assert_allclose(forest.predict(forest.flatten(estimator), self.X_test),
+                                   estimator.predict(self.X_test), rtol=0, atol=1e-9)
+
+    def test_flattened_classifier_predicts_like_sklearn(self):
+        labels = np.where(self.y > 4, 'service', 'standby')
+        estimator = RandomForestClassifier(n_estimators=20, random_state=0).fit(self.X, labels)
+        positive = list(estimator.classes_).index('service')
+        np.testing.assert_allclose(forest.predict(forest.flatten(estimator, positive), self.X_test),
+                                   estimator.predict_proba(self.X_test)[:, positive], rtol=0, atol=1e-9)
+
+    def test_model_loaded_from_artifacts_predicts_like_fitted_model(self):
+        fleet = synthetic_fleet_frame(300, seed=5)
+        fleet['decision'] = np.where(fleet['open_jobs'] < 2, 'service', 'standby')
+        for target in ('decision', 'suitability_score'):
+            with self.subTest(target=target):
+                model = create_model('train_optimization', {
+                    'backend': 'sklearn', 'n_estimators': 10, 'n_jobs': 1, 'target': target
+                })
+                model.train(fleet)
+                loaded = load_model('train_optimization', model.save_model_state(), model.save_artifacts())
+
+                self.assertIsNone(loaded.model)
+                np.testing.assert_allclose(loaded.predict(fleet), model.predict(fleet), rtol=0, atol=1e-9)
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .. import views
+from ..benchmarks import synthetic_csv_rows, synthetic_fleet_frame
+from ..ml_models import TrainOptimizationModel
+from ..models import MLModel
+from ..training import create_training_session, run_training_session
+from .utils import TEST_CACHES, FleetAPITestCase
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+
+class ModelTests(FleetAPITestCase):
+    def setUp(self):
+        super().setUp()
+        rows = synthetic_csv_rows(40, trains=10)
+        self.client.post('/api/csv/ingest/', {
+            'source': 'feed', 'fileName': 'feed.csv', 'headers': list(rows[0]), 'rows': rows
+        }, format='json')
+
+    def train(self, model_name='model'):
+        training_session = create_training_session('train_optimization', model_name, {}, ['feed'])
+        run_training_session(training_session.id)
+        return training_session.model_id
+
+    def predict(self, **fields):
+        return self.client.post('/api/ml/predict/', fields, format='json')
+
+    def test_predict_with_trained_model(self):
+        model_id = self.train()
+        response = self.predict(model_id=model_id, input_data=synthetic_fleet_frame(5).to_dict('records'))
+        self.assertEqual(response.status_code, 200)
+        expected = TrainOptimizationModel().score_frame(synthetic_fleet_frame(5))
+        self.assertEqual(response.data['predictions'], expected.tolist())
+
+        self.assertEqual(self.predict(model_id=999).status_code, 404)
+        self.assertEqual(self.predict().status_code, 400)
+
+    def test_loaded_model_is_reused_until_retrained(self):
+        model_id = self.train()
+        inputs = synthetic_fleet_frame(3).to_dict('records')
+        with mock.patch('fleet.views._load_model_instance', wraps=views._load_model_instance) as load:
+            self.predict(model_id=model_id, input_data=inputs)
+            self.predict(model_id=model_id, input_data=inputs)
+            self.assertEqual(load.call_count, 1)
+
+            # Editing the model bumps updated_at
+            MLModel.objects.get(id=model_id).save()
+            self.predict(model_id=model_id, input_data=inputs)
+            self.assertEqual(load.call_count, 2)
+
+    def test_model_listing_is_revalidated_with_etag(self):
+        self.train('first')
+        etag = self.client.get('/api/ml/models/')['ETag']
+        self.assertEqual(self.client.get('/api/ml/models/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/ml/models/?model_type=train_optimization',
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.train('second')
+        self.assertEqual(self.client.get('/api/ml/models/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_model_listing_pages_with_latest_training(self):
+        first = self.train('first')
+        self.train('second')
+        self.train('third')
+
+        response = self.client.get('/api/ml/models/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([model['name'] for model in response.data['models']], ['third', 'second'])
+        self.assertEqual(response.data['models'][0]['latest_training']['data_points'], 40)
+
+        rest = self.client.get('/api/ml/models/', {'limit': 2, 'cursor': response.data['next_cursor']})
+        self.assertEqual([model['id'] for model in rest.data['models']], [first])
+        self.assertIsNone(rest.data['next_cursor'])
+        for params in ({'limit': 0}, {'cursor': 'abc'}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get('/api/ml/models/', params).status_code, 400)
+
+    def test_model_listing_queries_do_not_grow_with_models(self):
+        def listing_queries():
+            with self.settings(CACHES={'default': TEST_CACHES['default'], 'responses': DUMMY_CACHE}):
+                with CaptureQueriesContext(connection) as captured:
+                    self.assertEqual(self.client.get('/api/ml/models/').status_code, 200)
+            return len(captured)
+
+        self.train('first')
+        one_model = listing_queries()
+        for idx in range(4):
+            self.train(f'model-{idx}')
+        self.assertEqual(listing_queries(), one_model)
@@ -0,0 +1,61 @@
+from ..ingestion import CSVIngestionEngine
+from .utils import FleetAPITestCase, csv_text
+
+HEADERS = ['train_id', 'mileage_km', 'status']
+FEED = [
+    {'train_id': 'TS-01', 'mileage_km': '950', 'status': 'ok'},
+    {'train_id': 'TS-02', 'mileage_km': '500', 'status': 'hold'},
+    {'train_id': 'TS-03', 'mileage_km': '1200', 'status': 'ok'},
+    {'train_id': 'TS-04', 'mileage_km': 'unknown', 'status': 'ok'},
+]
+
+
+class RowQueryTests(FleetAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # CSV feeds store every cell as a string; JSON uploads may carry numbers
+        self.client.post('/api/csv/ingest/stream/?source=feed&fileName=feed.csv',
+                         csv_text(HEADERS, FEED), content_type='text/csv')
+        CSVIngestionEngine().ingest('feed', 'typed.json', HEADERS,
+                                    [{'train_id': 'TS-05', 'mileage_km': 1000, 'status': 'ok'}])
+
+    def query(self, **params):
+        response = self.client.get('/api/csv/query/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['row_data'] for row in response.data['rows']]
+
+    def train_ids(self, **params):
+        return [row['train_id'] for row in self.query(**params)]
+
+    def test_numeric_filters_compare_by_value(self):
+        self.assertEqual(self.train_ids(where='mileage_km:gt:900'), ['TS-01', 'TS-03', 'TS-05'])
+        self.assertEqual(self.train_ids(where='mileage_km:lt:1000'), ['TS-01', 'TS-02'])
+        self.assertEqual(self.train_ids(where='mileage_km:eq:1000'), ['TS-05'])
+        self.assertEqual(self.train_ids(where='mileage_km:in:500,1200.0'), ['TS-02', 'TS-03'])
+        self.assertEqual(self.train_ids(where=['mileage_km:gte:950', 'status:eq:ok'], order_by='train_id'),
+                         ['TS-01', 'TS-03', 'TS-05'])
+
+    def test_sorting_is_numeric(self):
+        self.assertEqual(self.train_ids(order_by='-mileage_km'), ['TS-03', 'TS-05', 'TS-01', 'TS-02', 'TS-04'])
+        self.assertEqual(self.train_ids(order_by='mileage_km'), ['TS-02', 'TS-01', 'TS-05', 'TS-03', 'TS-04'])
+
+    def test_projection_returns_values_as_stored(self):
+        rows = self.query(fields='mileage_km,missing', order_by='train_id')
+        self.assertEqual([row['mileage_km'] for row in rows], ['950', '500', '1200', 'unknown', 1000])
+        self.assertEqual({row['missing'] for row in rows}, {None})
+
+    def test_columnar_uploads_are_reported_as_skipped(self):
+        self.assertEqual(self.client.get('/api/csv/query/').data['skipped_uploads'], [])
+        columnar = CSVIngestionEngine(storage='columnar')
+        upload = columnar.ingest('feed', 'columnar.csv', HEADERS, [{**row, 'status': 'late'} for row in FEED]).upload.id
+        columnar.ingest('other', 'other.csv', HEADERS, FEED)
+
+        response = self.client.get('/api/csv/query/', {'source': 'feed', 'where': 'train_id:eq:TS-01'})
+        self.assertEqual(len(response.data['rows']), 1)
+        self.assertEqual(response.data['skipped_uploads'], [upload])
+
+    def test_text_ranges_and_invalid_filters(self):
+        self.assertEqual(self.train_ids(where='status:lt:ok'), ['TS-02'])
+        for where in ('mileage_km:gt:true', 'mileage_km:between:1', 'bad key!:eq:1'):
+            with self.subTest(where=where):
+                self.assertEqual(self.client.get('/api/csv/query/', {'where': where}).status_code, 400)
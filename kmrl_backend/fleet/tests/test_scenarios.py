@@ -0,0 +1,76 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..benchmarks import synthetic_fleet_frame
+from ..ml_models import DEFAULT_SCORE_WEIGHTS, combine_sub_scores, compute_sub_scores
+from ..models import Train
+from ..scenarios import evaluate_scenarios, parse_scenarios
+from .utils import FleetAPITestCase
+
+SCENARIOS = [
+    {'name': 'as is'},
+    {'name': 'signalling fault', 'overrides': {'TS-03': {'fc_sig': False}, 'TS-07': {'open_jobs': 4}}},
+    {'name': 'mileage first', 'weights': {'mileage': 0.6, 'fc': 0.1}, 'target_mileage': 1100},
+]
+
+
+def scenario_scores(fleet, scenario):
+    """Scores of one scenario, computed on its own copy of the fleet."""
+    fleet = fleet.copy()
+    for train_id, values in scenario.overrides.items():
+        for name, value in values.items():
+            fleet[name] = fleet[name].astype(np.float64)
+            fleet.loc[fleet['train_id'] == train_id, name] = value
+    sub_scores = compute_sub_scores(fleet, scenario.target_mileage)
+    return combine_sub_scores(sub_scores, {**DEFAULT_SCORE_WEIGHTS, **scenario.weights})
+
+
+class ScenarioTests(SimpleTestCase):
+    def setUp(self):
+        self.fleet = synthetic_fleet_frame(12, seed=9)
+        self.scenarios = parse_scenarios(SCENARIOS)
+
+    def test_batch_matches_scenarios_scored_one_by_one(self):
+        result = evaluate_scenarios(self.fleet, self.scenarios)
+        self.assertEqual(result['scenarios'][0]['train_ids'], result['baseline']['train_ids'])
+        self.assertEqual(set(result['scenarios'][0]['rank_deltas']), {0})
+
+        for scenario, ranking in zip(self.scenarios, result['scenarios']):
+            with self.subTest(scenario=scenario.name):
+                scores = scenario_scores(self.fleet, scenario)
+                by_train = dict(zip(self.fleet['train_id'], scores))
+                np.testing.assert_allclose(ranking['scores'], [by_train[train_id] for train_id in ranking['train_ids']],
+                                           atol=0.005)
+                self.assertEqual(ranking['scores'], sorted(ranking['scores'], reverse=True))
+
+    def test_rank_deltas_and_top(self):
+        full = evaluate_scenarios(self.fleet, self.scenarios)
+        baseline, fault = full['baseline']['train_ids'], full['scenarios'][1]
+        self.assertTrue(any(fault['rank_deltas']))
+        for train_id, delta in zip(fault['train_ids'], fault['rank_deltas']):
+            self.assertEqual(delta, baseline.index(train_id) - fault['train_ids'].index(train_id))
+
+        top = evaluate_scenarios(self.fleet, self.scenarios, top=3)['scenarios'][1]
+        self.assertEqual(top['train_ids'], fault['train_ids'][:3])
+        self.assertEqual(top['rank_deltas'], fault['rank_deltas'][:3])
+
+    def test_invalid_scenarios(self):
+        for payload in ({}, [{'weights': {'speed': 1}}], [{'overrides': {'TS-01': {'colour': 1}}}],
+                        [{'weights': {'fc': 'high'}}]):
+            with self.subTest(payload=payload):
+                self.assertRaises(ValueError, parse_scenarios, payload)
+        with self.assertRaises(ValueError):
+            evaluate_scenarios(self.fleet, parse_scenarios([{'overrides': {'TS-99': {'open_jobs': 1}}}]))
+
+
+class ScenarioEndpointTests(FleetAPITestCase):
+    def test_scenarios_over_the_train_table(self):
+        Train.objects.bulk_create([Train(**record) for record in synthetic_fleet_frame(12).to_dict('records')])
+
+        response = self.client.post('/api/simulate/scenarios/', {'scenarios': SCENARIOS, 'top': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([ranking['name'] for ranking in response.data['scenarios']],
+                         [scenario['name'] for scenario in SCENARIOS])
+        self.assertEqual(len(response.data['baseline']['train_ids']), 2)
+
+        self.assertEqual(self.client.post('/api/simulate/scenarios/', {'scenarios': []}, format='json').status_code, 400)
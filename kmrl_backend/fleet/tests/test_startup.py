@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from ..benchmarks import import_profile
+
+ML_STACK = ('numpy', 'pandas', 'scipy', 'sklearn')
+
+
+class StartupImportTests(SimpleTestCase):
+    """The ML stack is imported lazily (see fleet.warmup), not when the URLconf loads."""
+
+    def test_url_conf_does_not_import_ml_stack(self):
+        profile = import_profile('import django; django.setup(); import kmrl_backend.urls')
+        self.assertEqual([name for name in profile['heavy_modules'] if name in ML_STACK], [])
+
+    def test_saving_a_train_does_not_import_ml_stack(self):
+        code = '; '.join((
+            'import django',
+            'from django.conf import settings',
+            "settings.DATABASES['default']['NAME'] = ':memory:'",
+            'django.setup()',
+            'from django.core.management import call_command',
+            "call_command('migrate', verbosity=0)",
+            'from fleet.models import Train',
+            "train = Train.objects.create(train_id='TS-01')",
+            'train.mileage_km = 1000',
+            'train.save()',
+            'train.delete()',
+        ))
+        profile = import_profile(code)
+        self.assertEqual([name for name in profile['heavy_modules'] if name in ML_STACK], [])
+
+    def test_profile_detects_ml_stack(self):
+        profile = import_profile('import django; django.setup(); import fleet.ml_models')
+        self.assertTrue({'numpy', 'pandas'} <= set(profile['heavy_modules']))
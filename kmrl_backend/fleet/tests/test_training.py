@@ -0,0 +1,158 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from .. import artifacts, training
+from ..benchmarks import synthetic_csv_rows
+from ..ingestion import CSVIngestionEngine
+from ..ml_models import TrainOptimizationModel, load_model
+from ..models import CSVUploadStatistics, MLModel, MLTrainingSession
+from ..training import compact_frame, create_training_session, load_training_frame, run_training_session
+from .utils import FleetAPITestCase
+
+
+class IncrementalTrainingTests(FleetAPITestCase):
+    def ingest(self, filename, seed, storage='rows'):
+        rows = synthetic_csv_rows(50, trains=10, seed=seed)
+        CSVIngestionEngine(storage=storage).ingest('feed', filename, list(rows[0]), rows)
+        return rows
+
+    def train(self):
+        training_session = create_training_session('train_optimization', 'model', {}, ['feed'])
+        return training_session, run_training_session(training_session.id)
+
+    def assertSameMetrics(self, metrics, expected):
+        self.assertEqual(metrics['data_points'], expected['data_points'])
+        self.assertAlmostEqual(metrics['mean_score'], expected['mean_score'], places=9)
+        self.assertAlmostEqual(metrics['std_score'], expected['std_score'], places=9)
+
+    def test_retrain_matches_training_from_scratch(self):
+        rows = self.ingest('a.csv', seed=1)
+        self.train()
+        rows += self.ingest('b.csv', seed=2, storage='columnar')
+
+        _, metrics = self.train()
+        self.assertEqual(CSVUploadStatistics.objects.count(), 2)
+
+        # The same data, summarised from the rows at once
+        full = TrainOptimizationModel().train(pd.DataFrame(rows))
+        self.assertSameMetrics(metrics, full)
+
+        CSVUploadStatistics.objects.all().delete()
+        _, scratch = self.train()
+        self.assertSameMetrics(metrics, scratch)
+
+    def test_retrain_reads_only_new_uploads(self):
+        self.ingest('a.csv', seed=1)
+        self.train()
+        self.ingest('b.csv', seed=2)
+
+        with mock.patch('fleet.training.load_upload_frame', wraps=training.load_upload_frame) as load_upload_frame:
+            self.train()
+        self.assertEqual([call.args[0].filename for call in load_upload_frame.call_args_list], ['b.csv'])
+
+
+class RowDeduplicationTests(FleetAPITestCase):
+    def test_rows_repeated_across_uploads_are_trained_once(self):
+        rows = synthetic_csv_rows(50, trains=10, seed=1)
+        CSVIngestionEngine().ingest('feed', 'a.csv', list(rows[0]), rows[:30])
+        CSVIngestionEngine(storage='columnar').ingest('feed', 'b.csv', list(rows[0]), rows[20:])
+
+        for deduplicate_rows, expected in ((False, 60), (True, 50)):
+            with self.subTest(deduplicate_rows=deduplicate_rows):
+                training_session = create_training_session('train_optimization', 'model', {}, ['feed'],
+                                                           deduplicate_rows=deduplicate_rows)
+                self.assertEqual(run_training_session(training_session.id)['data_points'], expected)
+
+
+class ArtifactStoreTests(FleetAPITestCase):
+    def test_forest_is_served_from_memory_mapped_artifacts(self):
+        rows = synthetic_csv_rows(200, trains=10, seed=3)
+        CSVIngestionEngine().ingest('feed', 'a.csv', list(rows[0]), rows)
+        config = {'backend': 'sklearn', 'n_estimators': 5, 'n_jobs': 1}
+        training_session = create_training_session('train_optimization', 'model', config, ['feed'])
+        run_training_session(training_session.id)
+
+        ml_model = MLModel.objects.get(id=training_session.model_id)
+        self.assertEqual(ml_model.artifact_path, f'{ml_model.id}/{training_session.id}')
+        self.assertNotIn('estimator', ml_model.model_state)
+
+        stored = artifacts.load_artifacts(ml_model.artifact_path)
+        model = load_model(ml_model.model_type, ml_model.model_state, stored)
+        self.assertIsInstance(model.forest['leaf_value'], np.memmap)
+        self.assertFalse(model.forest['leaf_value'].flags.writeable)
+        fleet = pd.DataFrame(rows)
+        np.testing.assert_allclose(model.predict(fleet), model.fitted_estimator().predict(model.feature_matrix(fleet)),
+                                   rtol=0, atol=1e-9)
+
+        MLTrainingSession.objects.get(id=training_session.id).delete()
+        self.assertFalse(stored.directory.exists())
+
+    def test_cancel_after_the_last_checkpoint_discards_the_model(self):
+        rows = synthetic_csv_rows(200, trains=10, seed=3)
+        CSVIngestionEngine().ingest('feed', 'a.csv', list(rows[0]), rows)
+        config = {'backend': 'sklearn', 'n_estimators': 5, 'n_jobs': 1}
+        training_session = create_training_session('train_optimization', 'model', config, ['feed'])
+        write_artifacts, written = artifacts.write_artifacts, []
+
+        def write_then_cancel(session, model_artifacts):
+            written.append(write_artifacts(session, model_artifacts))
+            MLTrainingSession.objects.filter(id=session.id).update(status='cancelled')
+            return written[0]
+
+        with mock.patch.object(artifacts, 'write_artifacts', side_effect=write_then_cancel):
+            with self.assertRaises(training.TrainingCancelled):
+                run_training_session(training_session.id)
+
+        self.assertEqual(MLTrainingSession.objects.get(id=training_session.id).status, 'cancelled')
+        ml_model = MLModel.objects.get(id=training_session.model_id)
+        self.assertFalse(ml_model.is_active)
+        self.assertEqual(ml_model.artifact_path, '')
+        self.assertFalse((artifacts.get_storage_dir() / written[0]).exists())
+
+
+class TrainingLoaderTests(FleetAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.rows = synthetic_csv_rows(120, trains=10, seed=8)
+        CSVIngestionEngine().ingest('feed', 'a.csv', list(self.rows[0]), self.rows)
+
+    def session(self, **options):
+        return create_training_session('train_optimization', 'model', {}, ['feed'], **options)
+
+    def test_compact_frame_keeps_values(self):
+        frame = pd.DataFrame({
+            'open_jobs': ['0', '3', '5'], 'mileage_km': [950.5, 1000.0, 800.25], 'fc_rs': ['True', 'false', 'yes'],
+            'train_id': ['TS-01', 'TS-02', 'TS-01'], 'notes': ['a', None, 'b'],
+        })
+        compact = compact_frame(frame)
+        self.assertEqual(compact['open_jobs'].dtype, np.int8)
+        self.assertEqual(compact['mileage_km'].dtype, np.float32)
+        self.assertEqual(compact['fc_rs'].tolist(), [True, False, True])
+        self.assertEqual(compact['open_jobs'].tolist(), [0, 3, 5])
+        self.assertEqual(compact['mileage_km'].tolist(), [950.5, 1000.0, 800.25])
+        self.assertIs(compact['train_id'][0], compact['train_id'][2])
+        self.assertTrue(compact['notes'].equals(frame['notes']))
+
+    def test_chunked_load_matches_one_chunk(self):
+        whole = load_training_frame(self.session())
+        with self.settings(ML_TRAINING_CHUNK_SIZE=7):
+            chunked = load_training_frame(self.session())
+        self.assertTrue(chunked.equals(whole))
+        np.testing.assert_allclose(TrainOptimizationModel().score_frame(whole),
+                                   TrainOptimizationModel().score_frame(pd.DataFrame(self.rows)))
+
+    def test_row_limit_and_sample(self):
+        self.assertEqual(len(load_training_frame(self.session(row_limit=50))), 50)
+
+        sample = load_training_frame(self.session(sample_fraction=0.5))
+        self.assertLess(abs(len(sample) - 60), 25)
+        self.assertTrue(sample.equals(load_training_frame(self.session(sample_fraction=0.5))))
+
+    @mock.patch('fleet.jobs.submit_training')
+    def test_invalid_sampling_is_rejected(self, submit_training):
+        for options in ({'row_limit': 0}, {'sample_fraction': 0}, {'sample_fraction': 2}, {'row_limit': 'all'}):
+            with self.subTest(**options):
+                payload = {'model_type': 'train_optimization', **options}
+                self.assertEqual(self.client.post('/api/ml/jobs/', payload, format='json').status_code, 400)
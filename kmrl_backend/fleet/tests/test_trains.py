@@ -0,0 +1,44 @@
+from ..models import Train
+from .utils import FleetAPITestCase
+
+
+class TrainTests(FleetAPITestCase):
+    def test_bulk_upsert_reports_changes(self):
+        Train.objects.create(train_id='TS-01', mileage_km=900)
+        Train.objects.create(train_id='TS-02', mileage_km=800)
+
+        response = self.client.post('/api/trains/bulk-upsert/', {'trains': [
+            {'train_id': 'TS-01', 'mileage_km': 950},
+            {'train_id': 'TS-02', 'mileage_km': 800},
+            {'train_id': 'TS-03', 'open_jobs': 2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], ['TS-03'])
+        self.assertEqual(response.data['updated'], {'TS-01': {'mileage_km': [900, 950]}})
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertEqual(Train.objects.get(train_id='TS-01').mileage_km, 950)
+        self.assertEqual(Train.objects.get(train_id='TS-03').open_jobs, 2)
+
+    def test_invalid_upserts_write_nothing(self):
+        Train.objects.create(train_id='TS-01', mileage_km=900)
+        for trains in ([], [{'mileage_km': 1}], [{'train_id': 'TS-01', 'mileage_km': 'far'}, {'train_id': 'TS-02'}]):
+            with self.subTest(trains=trains):
+                response = self.client.post('/api/trains/bulk-upsert/', {'trains': trains}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(Train.objects.values_list('train_id', 'mileage_km')), [('TS-01', 900)])
+
+    def test_listing_is_revalidated_with_etag(self):
+        Train.objects.create(train_id='TS-01')
+        first = self.client.get('/api/trains/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        self.assertEqual(self.client.get('/api/trains/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Train.objects.create(train_id='TS-02')
+        changed = self.client.get('/api/trains/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(len(changed.data), 2)
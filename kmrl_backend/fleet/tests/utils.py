@@ -0,0 +1,57 @@
+"""Shared setup for the fleet tests."""
+
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from rest_framework.test import APITestCase
+
+from ..feature_store import feature_store
+from ..model_cache import model_cache
+
+# The file-based response cache of the settings would outlive the test database
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fleet-tests'},
+    'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fleet-tests-responses'},
+}
+
+
+def csv_text(headers, rows) -> str:
+    """Rows (dicts) as the CSV body of a streaming upload."""
+    lines = [','.join(headers)]
+    lines += [','.join(str(row[name]) for name in headers) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+class FleetAPITestCase(APITestCase):
+    """
+    Authenticated API client, with columnar data, model artifacts and
+    response caches kept apart from the development setup.
+
+    The response caches, the in-process fleet snapshot and the model cache
+    are keyed by database versions and ids, which repeat once a test's
+    transaction is rolled back, so all of them are cleared before every test.
+    """
+
+    def setUp(self):
+        storage = tempfile.TemporaryDirectory()
+        self.addCleanup(storage.cleanup)
+        overrides = self.settings(
+            CACHES=TEST_CACHES,
+            CSV_COLUMNAR_STORAGE_DIR=Path(storage.name) / 'columnar',
+            ML_ARTIFACT_DIR=Path(storage.name) / 'artifacts',
+            ML_TRAINING_MAX_PENDING=2
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+
+        feature_store.clear()
+        model_cache.clear()
+        self.addCleanup(feature_store.clear)
+        self.addCleanup(model_cache.clear)
+
+        self.user = User.objects.create(username='staff', is_staff=True)
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,440 @@
+"""
+Training pipeline shared by the synchronous train endpoint and background jobs.
+
+A training run is driven entirely by its ``MLTrainingSession`` row: status,
+progress and interim metrics are written back as it goes, and a session set
+to ``cancelled`` is noticed at the next checkpoint.
+
+Models that support incremental training (``BaseMLModel.supports_incremental``)
+are trained from per-upload statistics. Uploads never change after ingestion,
+so each upload's statistics are computed once per model type and
+configuration, stored in ``CSVUploadStatistics`` and merged (in upload order)
+on every later retrain: a retrain only reads uploads it has not seen, and its
+metrics are the same as those of a retrain from scratch.
+
+Row-stored uploads are streamed from the database ``ML_TRAINING_CHUNK_SIZE``
+rows at a time; each chunk becomes a compact DataFrame (``compact_frame``)
+before the next is read, so the decoded JSON of a whole upload is never held
+at once. A session can train on a random sample (``sample_fraction``) and/or
+the first ``row_limit`` rows.
+"""
+
+import hashlib
+import json
+from functools import reduce
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import artifacts, columnar
+from .metrics import timed
+from .ml_models import BaseMLModel, create_model, load_model
+from .response_cache import bump_version_on_commit
+from .models import CSVDataSource, CSVUpload, CSVUploadStatistics, MLModel, MLTrainingSession
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+DEFAULT_CHUNK_SIZE = 10_000
+SAMPLE_SEED = 0  # The same data and fraction always give the same sample
+INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+# Known fleet features, coerced whatever form the CSV values arrived in
+BOOL_FEATURES = ('fc_rs', 'fc_sig', 'fc_tel', 'cleaning_due')
+NUMERIC_FEATURES = ('open_jobs', 'mileage_km', 'stabling_penalty')
+BOOL_TEXT = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False,
+             '1.0': True, '0.0': False}
+
+# Part of the statistics key: changing how frames are loaded invalidates stored statistics
+LOADER_VERSION = 2
+
+
+class NoTrainingData(ValueError):
+    """Raised when the selected data sources contain no rows."""
+
+
+class TrainingCancelled(Exception):
+    """Raised inside a run when its session has been cancelled."""
+
+
+def create_training_session(model_type: str, model_name: str, config: Dict[str, Any],
+                            data_sources: List[str], status: str = 'pending',
+                            deduplicate_rows: bool = False, row_limit: int = None,
+                            sample_fraction: float = None) -> MLTrainingSession:
+    """
+    Create the MLModel and MLTrainingSession records for a training run.
+    Unknown data source names are ignored.
+    """
+    ml_model = MLModel.objects.create(
+        name=model_name,
+        model_type=model_type,
+        configuration=config,
+        description=f'ML model for {model_type}'
+    )
+
+    training_session = MLTrainingSession.objects.create(
+        model=ml_model,
+        status=status,
+        deduplicate_rows=deduplicate_rows,
+        row_limit=row_limit,
+        sample_fraction=sample_fraction
+    )
+    training_session.data_sources.add(*CSVDataSource.objects.filter(name__in=data_sources))
+
+    return training_session
+
+
+def _update_session(training_session: MLTrainingSession, **fields) -> int:
+    """
+    Write progress fields without overwriting a concurrent cancellation.
+
+    Returns:
+        The number of rows updated: 0 if the session was cancelled
+    """
+    for name, value in fields.items():
+        setattr(training_session, name, value)
+    updated = MLTrainingSession.objects.filter(id=training_session.id).exclude(status='cancelled').update(**fields)
+    if 'status' in fields:
+        # update() sends no post_save signal
+        bump_version_on_commit('ml_models')
+    return updated
+
+
+def _check_cancelled(training_session: MLTrainingSession):
+    if MLTrainingSession.objects.filter(id=training_session.id, status='cancelled').exists():
+        raise TrainingCancelled(f'Training session {training_session.id} was cancelled')
+
+
+def _session_uploads(training_session: MLTrainingSession) -> List[CSVUpload]:
+    return list(CSVUpload.objects.filter(source__in=training_session.data_sources.all()).order_by('id'))
+
+
+def _as_bool(column: pd.Series):
+    if pd.api.types.is_bool_dtype(column):
+        return column
+    values = column.astype(str).str.strip().str.lower().map(BOOL_TEXT)
+    # Missing or unrecognised values: leave the column as it is
+    return None if values.isna().any() else values.to_numpy(dtype=bool)
+
+
+def _smallest_int(values: np.ndarray) -> np.ndarray:
+    if not len(values):
+        return values
+    low, high = values.min(), values.max()
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _as_compact_number(column: pd.Series):
+    """The smallest integer dtype holding every value, else float32 where exact, else float64"""
+    if pd.api.types.is_numeric_dtype(column):
+        values = column.to_numpy()
+    else:
+        missing = column.isna() | column.astype(str).str.strip().eq('')  # Empty CSV cells
+        values = pd.to_numeric(column.mask(missing), errors='coerce').to_numpy()
+        if np.isnan(values.astype(np.float64)).sum() > missing.sum():
+            return None  # Text that is not a number
+
+    if values.dtype.kind == 'f':
+        integral = not np.isnan(values).any() and (values % 1 == 0).all()
+        if not integral:
+            narrow = values.astype(np.float32)
+            exact = (narrow == values) | np.isnan(values)
+            return narrow if exact.all() else values
+        values = values.astype(np.int64)
+    return _smallest_int(values)
+
+
+def _share_strings(column: pd.Series):
+    """Point repeated strings (train ids, labels) at one object each"""
+    codes, uniques = pd.factorize(column)
+    return pd.array(np.asarray(uniques, dtype=object).take(codes), dtype=column.dtype)
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a DataFrame built from CSV row dicts.
+
+    Known boolean features become ``bool`` and known numeric features (also
+    when stored as text) and other numeric columns the smallest integer
+    dtype, or float32 where that loses nothing; the values themselves, and so
+    every score and statistic, are unchanged. Columns that do not parse
+    cleanly are left as they are. Repeated strings share one object.
+    """
+    columns = {}
+    for name, column in frame.items():
+        if name in BOOL_FEATURES:
+            compact = _as_bool(column)
+        elif name in NUMERIC_FEATURES or (pd.api.types.is_numeric_dtype(column)
+                                          and not pd.api.types.is_bool_dtype(column)):
+            compact = _as_compact_number(column)
+        elif pd.api.types.is_string_dtype(column) and column.notna().all():
+            compact = _share_strings(column)
+        else:
+            compact = None
+        columns[name] = column if compact is None else compact
+    return pd.DataFrame(columns, index=frame.index, copy=False)
+
+
+def _chunk_size() -> int:
+    return int(getattr(settings, 'ML_TRAINING_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+
+def iter_row_frames(upload: CSVUpload, seen_hashes: set = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a row-stored upload as compact DataFrames of up to
+    ``ML_TRAINING_CHUNK_SIZE`` rows, in row order.
+
+    Args:
+        upload: CSVUpload stored in row mode
+        seen_hashes: Skip rows whose ``row_hash`` is in the set, and add the
+            hashes of the rows returned
+    """
+    chunk_size = _chunk_size()
+    fields = ('row_hash', 'row_data') if seen_hashes is not None else ('row_data',)
+    rows = upload.data_rows.values_list(*fields).iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for values in rows:
+        if seen_hashes is not None:
+            row_hash, row_data = values
+            if row_hash:
+                if row_hash in seen_hashes:
+                    continue
+                seen_hashes.add(row_hash)
+        else:
+            row_data = values[0]
+        chunk.append(row_data)
+        if len(chunk) == chunk_size:
+            with timed('pandas'):
+                yield compact_frame(pd.DataFrame(chunk))
+            chunk = []
+    if chunk:
+        with timed('pandas'):
+            yield compact_frame(pd.DataFrame(chunk))
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    with timed('pandas'):
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+
+def load_upload_frame(upload: CSVUpload) -> pd.DataFrame:
+    """Load one upload's rows into a DataFrame."""
+    if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+        return columnar.load_upload_frame(upload)
+    frames = list(iter_row_frames(upload))
+    return _concat(frames) if frames else pd.DataFrame()
+
+
+def load_training_frame(training_session: MLTrainingSession, progress_span: float = 0) -> pd.DataFrame:
+    """
+    Load every upload of the session's data sources into one DataFrame.
+
+    With ``training_session.deduplicate_rows``, a row whose stored content
+    hash was already loaded (from any upload) is skipped. Rows stored before
+    hashing was introduced have no hash and are always kept. Deduplication
+    comes first, then ``sample_fraction`` keeps each row with that
+    probability, then ``row_limit`` stops loading.
+
+    Args:
+        training_session: Session whose data sources are loaded
+        progress_span: Share of overall progress (percent) to spread across uploads
+    """
+    uploads = _session_uploads(training_session)
+    seen_hashes = set() if training_session.deduplicate_rows else None
+    sample_fraction = training_session.sample_fraction
+    rng = np.random.default_rng(SAMPLE_SEED) if sample_fraction is not None else None
+    remaining = training_session.row_limit
+
+    training_frames = []
+    for idx, upload in enumerate(uploads, start=1):
+        if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+            frame = columnar.load_upload_frame(upload)
+            if seen_hashes is not None:
+                frame = _drop_seen_rows(frame, columnar.load_row_hashes(upload), seen_hashes)
+            frames = [frame]
+        else:
+            frames = iter_row_frames(upload, seen_hashes)
+
+        for frame in frames:
+            if rng is not None:
+                frame = frame[rng.random(len(frame)) < sample_fraction]
+            if remaining is not None:
+                frame = frame.head(remaining)
+                remaining -= len(frame)
+            training_frames.append(frame)
+            if remaining == 0:
+                break
+
+        if progress_span:
+            _check_cancelled(training_session)
+            _update_session(training_session, progress=round(progress_span * idx / len(uploads), 1))
+        if remaining == 0:
+            break
+
+    if not any(len(frame) for frame in training_frames):
+        raise NoTrainingData('No training data found')
+
+    return _concat(training_frames)
+
+
+def _drop_seen_rows(frame: pd.DataFrame, row_hashes, seen_hashes: set) -> pd.DataFrame:
+    if row_hashes is None:
+        return frame
+
+    keep = []
+    for row_hash in row_hashes.tolist():
+        keep.append(row_hash not in seen_hashes)
+        seen_hashes.add(row_hash)
+    return frame[keep] if not all(keep) else frame
+
+
+def statistics_config_key(model_instance: BaseMLModel) -> str:
+    """Identify the configuration that per-upload statistics were computed under."""
+    payload = json.dumps({'class': type(model_instance).__name__, 'config': model_instance.config,
+                          'loader': LOADER_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def collect_upload_statistics(training_session: MLTrainingSession, model_instance: BaseMLModel,
+                              progress_span: float = 0) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Merge the per-upload statistics of the session's data sources,
+    computing (and storing) them only for uploads not summarised before.
+
+    Args:
+        training_session: Session whose data sources are used
+        model_instance: Model that computes and merges the statistics
+        progress_span: Share of overall progress (percent) to spread across new uploads
+
+    Returns:
+        Merged statistics, and counts of ``rows_loaded``, ``uploads_loaded`` and ``uploads_reused``
+    """
+    model_type = training_session.model.model_type
+    config_key = statistics_config_key(model_instance)
+    uploads = _session_uploads(training_session)
+    if not uploads:
+        raise NoTrainingData('No training data found')
+
+    statistics = dict(CSVUploadStatistics.objects.filter(
+        upload__in=uploads, model_type=model_type, config_key=config_key
+    ).values_list('upload_id', 'statistics'))
+
+    new_uploads = [upload for upload in uploads if upload.id not in statistics]
+    rows_loaded = 0
+    for idx, upload in enumerate(new_uploads, start=1):
+        frame = load_upload_frame(upload)
+        with timed('model'):
+            upload_statistics = model_instance.partial_statistics(frame)
+        CSVUploadStatistics.objects.get_or_create(
+            upload=upload, model_type=model_type, config_key=config_key,
+            defaults={'statistics': upload_statistics}
+        )
+        statistics[upload.id] = upload_statistics
+        rows_loaded += len(frame)
+
+        if progress_span:
+            _check_cancelled(training_session)
+            _update_session(training_session, progress=round(progress_span * idx / len(new_uploads), 1))
+
+    with timed('model'):
+        merged = reduce(model_instance.merge_statistics, (statistics[upload.id] for upload in uploads))
+    if not merged['data_points']:
+        raise NoTrainingData('No training data found')
+
+    return merged, {
+        'rows_loaded': rows_loaded,
+        'uploads_loaded': len(new_uploads),
+        'uploads_reused': len(uploads) - len(new_uploads)
+    }
+
+
+def run_training_session(training_session_id: int) -> Dict[str, Any]:
+    """
+    Run a training session to completion.
+
+    Loads the data, trains the model, stores the metrics on the session and
+    the trained state on the model. On failure the session is marked
+    ``failed`` (or left ``cancelled``) and the exception is re-raised.
+
+    Returns:
+        Training metrics
+    """
+    training_session = MLTrainingSession.objects.select_related('model').get(id=training_session_id)
+    if training_session.status in TERMINAL_STATUSES:
+        raise TrainingCancelled(f'Training session {training_session.id} is already {training_session.status}')
+
+    ml_model = training_session.model
+
+    try:
+        _update_session(training_session, status='training', progress=0)
+
+        model_instance = create_model(ml_model.model_type, ml_model.configuration)
+        warm_start_from = ml_model.configuration.get('warm_start_from')
+        if warm_start_from:
+            # Continue from an earlier model's fitted estimator (with warm_start, a forest grows)
+            previous = MLModel.objects.get(id=warm_start_from, model_type=ml_model.model_type)
+            model_instance.model = load_model(
+                previous.model_type, previous.model_state, artifacts.load_artifacts(previous.artifact_path)
+            ).fitted_estimator()
+
+        # Per-upload statistics cannot see duplicates across uploads, nor a sample of the rows
+        whole_uploads = not (training_session.deduplicate_rows or training_session.row_limit
+                             or training_session.sample_fraction is not None)
+        if model_instance.supports_incremental and whole_uploads:
+            statistics, load_info = collect_upload_statistics(training_session, model_instance, progress_span=80)
+            _update_session(training_session, progress=80, metrics=load_info)
+            _check_cancelled(training_session)
+
+            with timed('model'):
+                metrics = model_instance.train_from_statistics(statistics)
+        else:
+            df = load_training_frame(training_session, progress_span=80)
+            _update_session(training_session, progress=80, metrics={'rows_loaded': len(df)})
+            _check_cancelled(training_session)
+
+            with timed('model'):
+                metrics = model_instance.train(df)
+        _check_cancelled(training_session)
+
+        # Large fitted parameters go to a new artifact version, not into model_state
+        model_artifacts = model_instance.save_artifacts()
+        artifact_path = artifacts.write_artifacts(training_session, model_artifacts) if model_artifacts else ''
+
+        try:
+            # The completing UPDATE locks the session row until the model is active,
+            # so a cancellation lands either before both or after both
+            with transaction.atomic():
+                if not _update_session(
+                    training_session,
+                    status='completed',
+                    progress=100,
+                    metrics=metrics,
+                    artifact_path=artifact_path,
+                    completed_at=timezone.now()
+                ):
+                    raise TrainingCancelled(f'Training session {training_session.id} was cancelled')
+
+                # Persist trained state and mark model as active if training successful
+                ml_model.model_state = model_instance.save_model_state()
+                ml_model.artifact_path = artifact_path
+                ml_model.is_active = True
+                ml_model.save()
+        except Exception:
+            # Neither the session nor the model refers to the new version
+            artifacts.delete_artifacts(artifact_path)
+            raise
+
+        return metrics
+
+    except TrainingCancelled:
+        raise
+    except Exception as e:
+        _update_session(training_session, status='failed', error=str(e), completed_at=timezone.now())
+        raise
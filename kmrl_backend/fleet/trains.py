@@ -0,0 +1,74 @@
+"""
+Bulk upsert of the Train fleet table, for nightly status feeds.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from django.db import transaction
+
+from .models import Train, TrainState
+from .response_cache import bump_version_on_commit
+
+
+def upsert_trains(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Create or update trains keyed by ``train_id``, in one transaction.
+
+    Fields missing from a row keep their current value (or the model default
+    for new trains). Rows are written with one ``bulk_create(update_conflicts=True)``
+    statement per set of provided fields; unchanged trains are not written.
+    The new state of every written train is appended to the fleet history.
+
+    Args:
+        rows: Validated train dicts, each with a ``train_id``
+
+    Returns:
+        Compact diff: ``created`` train ids, ``updated`` as
+        ``{train_id: {field: [old, new]}}`` and the ``unchanged`` count
+    """
+    from . import feature_store, history
+
+    created = []
+    updated = {}
+    unchanged = 0
+    writes = defaultdict(list)  # provided fields -> Train instances
+
+    with transaction.atomic():
+        existing = Train.objects.select_for_update().in_bulk(
+            [row['train_id'] for row in rows], field_name='train_id'
+        )
+
+        for row in rows:
+            fields = frozenset(row) - {'train_id'}
+            current = existing.get(row['train_id'])
+            if current is None:
+                created.append(row['train_id'])
+            else:
+                changes = {
+                    field: [getattr(current, field), row[field]]
+                    for field in sorted(fields) if getattr(current, field) != row[field]
+                }
+                if not changes:
+                    unchanged += 1
+                    continue
+                updated[row['train_id']] = changes
+            writes[fields].append(Train(**row))
+
+        for fields, trains in writes.items():
+            if fields:
+                Train.objects.bulk_create(
+                    trains, update_conflicts=True, unique_fields=['train_id'], update_fields=sorted(fields)
+                )
+            else:
+                # Only new trains can get here: existing ones without fields are unchanged
+                Train.objects.bulk_create(trains)
+
+        # bulk_create sends no post_save signals
+        if writes:
+            bump_version_on_commit('trains')
+            feature_store.bump_version()
+            written = Train.objects.filter(train_id__in=[*created, *updated]).order_by('train_id')
+            history.record_states([history.state_of(train) for train in written], TrainState.SOURCE_CHANGE)
+
+    return {'created': created, 'updated': updated, 'unchanged': unchanged}
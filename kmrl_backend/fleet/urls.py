@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'trains', views.TrainViewSet)
@@ -12,8 +12,22 @@ urlpatterns = [
     path('auth/logout/', views.staff_logout, name='staff_logout'),
     path('auth/profile/', views.staff_profile, name='staff_profile'),
     path('csv/ingest/', views.ingest_csv_data, name='ingest_csv_data'),
+    path('csv/ingest/stream/', views.ingest_csv_stream, name='ingest_csv_stream'),
     path('csv/data/', views.get_csv_data, name='get_csv_data'),
+    path('csv/query/', views.query_csv_data, name='query_csv_data'),
     path('ml/train/', views.train_ml_model, name='train_ml_model'),
+    path('ml/jobs/', views.enqueue_training_job, name='enqueue_training_job'),
+    path('ml/jobs/<int:session_id>/', views.get_training_job, name='get_training_job'),
+    path('ml/jobs/<int:session_id>/cancel/', views.cancel_training_job, name='cancel_training_job'),
     path('ml/predict/', views.predict_with_model, name='predict_with_model'),
     path('ml/models/', views.get_ml_models, name='get_ml_models'),
+    path('induction/plan/', views.plan_induction, name='plan_induction'),
+    path('simulate/scenarios/', views.simulate_scenarios, name='simulate_scenarios'),
+    path('history/', views.get_fleet_history, name='get_fleet_history'),
+    path('metrics/', views.get_metrics, name='get_metrics'),
+    # Async variants of the I/O-bound endpoints, for ASGI deployments (see fleet.async_views)
+    path('async/csv/ingest/', async_views.ingest_csv_data, name='async_ingest_csv_data'),
+    path('async/csv/data/', async_views.get_csv_data, name='async_get_csv_data'),
+    path('async/ml/predict/', async_views.predict_with_model, name='async_predict_with_model'),
+    path('async/ml/models/', async_views.get_ml_models, name='async_get_ml_models'),
 ]
\ No newline at end of file
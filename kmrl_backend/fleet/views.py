@@ -1,5 +1,6 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import action, api_view, permission_classes, authentication_classes, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import authenticate, login, logout
@@ -7,18 +8,52 @@ from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.db.models import JSONField, OuterRef, Subquery
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-import pandas as pd
-from .models import Train, CSVDataSource, CSVUpload, CSVDataRow, MLModel, MLTrainingSession
-from .serializers import TrainSerializer
-from .ml_models import create_model, get_available_models
+import csv
+import itertools
+from datetime import date, timedelta
+from .models import Train, TrainState, CSVDataSource, CSVUpload, CSVDataRow, MLModel, MLTrainingSession
+from .serializers import TrainSerializer, TrainUpsertSerializer
+from .trains import upsert_trains
+from .model_cache import model_cache
+from .response_cache import cached_response
+from .metrics import registry as metrics_registry, timed
 from .authentication import CsrfExemptSessionAuthentication
+from .ingestion import CSVIngestionEngine, open_csv_stream
+from . import queries, readers
+from .parsers import CSVStreamParser, GzipCSVStreamParser
+
+# The ML stack (pandas, NumPy, SciPy and the fleet modules built on them) is
+# imported inside the views that use it, so management commands, worker
+# start-up and non-ML requests don't pay for it; see fleet.warmup to preload it.
 
 class TrainViewSet(viewsets.ModelViewSet):
     queryset = Train.objects.all()
     serializer_class = TrainSerializer
     permission_classes = [IsAuthenticated]
 
+    @cached_response('trains')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='bulk-upsert')
+    def bulk_upsert(self, request):
+        """Create or update many trains keyed by train_id, atomically; returns what changed"""
+        payload = request.data.get('trains') if isinstance(request.data, dict) else request.data
+        if not isinstance(payload, list) or not payload:
+            return Response({'error': 'Expected a non-empty list of trains'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = TrainUpsertSerializer(data=payload, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response({'error': 'Invalid train data', 'details': serializer.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        diff = upsert_trains(serializer.validated_data)
+        return Response({'success': True, **diff}, status=status.HTTP_200_OK)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
@@ -111,6 +146,26 @@ def staff_profile(request):
     else:
         return Response({'error': 'Not a staff member'}, status=status.HTTP_403_FORBIDDEN)
 
+def _ingestion_payload(result, filename):
+    """Response body and status for an ingestion result"""
+    # Re-sent feeds are acknowledged with the upload that already holds them
+    if result.duplicate:
+        return {
+            'success': True,
+            'message': f'{filename} is identical to upload {result.upload.id}; nothing was stored',
+            **result.as_dict()
+        }, status.HTTP_200_OK
+    
+    return {
+        'success': True,
+        'message': f'Successfully ingested {result.row_count} rows from {filename}',
+        **result.as_dict()
+    }, status.HTTP_201_CREATED
+
+def _ingestion_response(result, filename):
+    payload, status_code = _ingestion_payload(result, filename)
+    return Response(payload, status=status_code)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @csrf_exempt
@@ -126,59 +181,128 @@ def ingest_csv_data(request):
         if not all([source_name, filename, headers, rows]):
             return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get or create data source
-        data_source, created = CSVDataSource.objects.get_or_create(
-            name=source_name,
-            defaults={'description': f'Data source for {source_name}'}
-        )
+        try:
+            engine = CSVIngestionEngine(batch_size=data.get('batch_size'), storage=data.get('storage'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create CSV upload record
-        csv_upload = CSVUpload.objects.create(
-            source=data_source,
-            filename=filename,
-            row_count=len(rows),
-            headers=headers
+        # Store the upload and its rows in batches, atomically
+        result = engine.ingest(
+            source_name, filename, headers, rows
         )
         
-        # Store individual rows
-        for idx, row_data in enumerate(rows):
-            CSVDataRow.objects.create(
-                upload=csv_upload,
-                row_data=row_data,
-                row_index=idx
+        return _ingestion_response(result, filename)
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([CSVStreamParser, GzipCSVStreamParser, MultiPartParser])
+@csrf_exempt
+def ingest_csv_stream(request):
+    """Stream raw CSV (text/csv, gzip or multipart file) straight into CSVDataRow batches"""
+    try:
+        if request.content_type.startswith('multipart/form-data'):
+            csv_file = request.FILES.get('file')
+            stream = csv_file
+            source_name = request.data.get('source') or request.query_params.get('source')
+            filename = request.data.get('fileName') or request.query_params.get('fileName') or getattr(csv_file, 'name', None)
+        else:
+            stream = request.data
+            source_name = request.query_params.get('source')
+            filename = request.query_params.get('fileName')
+        
+        if not source_name or not filename or not hasattr(stream, 'read'):
+            return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            engine = CSVIngestionEngine(
+                batch_size=request.query_params.get('batch_size'),
+                storage=request.query_params.get('storage')
             )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'success': True,
-            'message': f'Successfully ingested {len(rows)} rows from {filename}',
-            'upload_id': csv_upload.id
-        }, status=status.HTTP_201_CREATED)
+        # Parse incrementally; only one batch of rows is held in memory at a time
+        headers, rows = open_csv_stream(stream)
+        first_row = next(rows, None)
+        if not headers or first_row is None:
+            return Response({'error': 'CSV contains no data rows'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = engine.ingest(source_name, filename, headers, itertools.chain([first_row], rows))
+        
+        return _ingestion_response(result, filename)
         
+    except (csv.Error, UnicodeDecodeError, EOFError, OSError) as e:
+        return Response({'error': f'Malformed CSV: {e}'}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_csv_data(request):
-    """Get stored CSV data for ML training"""
+    """
+    Get stored CSV data for ML training.
+    
+    Query params:
+        source: Restrict to one data source
+        limit, cursor: Cursor pagination over rows ordered by (upload_id, row_index);
+            pass the returned ``next_cursor`` to fetch the next page
+        stream=ndjson: Stream rows as newline-delimited JSON (optionally with cursor/limit)
+    
+    Without any of these, every upload and row is returned in a single response.
+    """
     try:
         source_name = request.GET.get('source')
+        uploads = CSVUpload.objects.select_related('source').order_by('id')
         if source_name:
             data_source = CSVDataSource.objects.get(name=source_name)
-            uploads = CSVUpload.objects.filter(source=data_source)
-        else:
-            uploads = CSVUpload.objects.all()
+            uploads = uploads.filter(source=data_source)
+        
+        cursor = readers.decode_cursor(request.GET.get('cursor'))
+        limit = request.GET.get('limit')
+        if limit is not None:
+            limit = int(limit)
+            max_limit = settings.CSV_DATA_MAX_PAGE_SIZE
+            if not 1 <= limit <= max_limit:
+                return Response({'error': f'limit must be between 1 and {max_limit}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.GET.get('stream') == 'ndjson':
+            response = StreamingHttpResponse(
+                readers.iter_ndjson(uploads, cursor=cursor, limit=limit),
+                content_type='application/x-ndjson'
+            )
+            response['Cache-Control'] = 'no-cache'
+            return response
+        
+        if cursor is not None or limit is not None:
+            page = readers.read_page(uploads, cursor=cursor, limit=limit or settings.CSV_DATA_PAGE_SIZE)
+            return Response(page, status=status.HTTP_200_OK)
+        
+        # Unpaginated: one query for row-stored data, grouped per upload
+        uploads = list(uploads)
+        rows_by_upload = {upload.id: [] for upload in uploads}
+        row_uploads = [upload.id for upload in uploads if upload.storage_format == CSVUpload.STORAGE_ROWS]
+        row_values = (
+            CSVDataRow.objects
+            .filter(upload_id__in=row_uploads)
+            .order_by('upload_id', 'row_index')
+            .values_list('upload_id', 'row_data', 'row_index')
+        )
+        for upload_id, row_data, row_index in row_values.iterator(chunk_size=readers.get_chunk_size()):
+            rows_by_upload[upload_id].append({'row_data': row_data, 'row_index': row_index})
         
         result = []
         for upload in uploads:
-            rows = list(upload.data_rows.values('row_data', 'row_index'))
+            if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+                from . import columnar
+                records = columnar.frame_to_records(columnar.load_upload_frame(upload))
+                rows = [{'row_data': row_data, 'row_index': idx} for idx, row_data in enumerate(records)]
+            else:
+                rows = rows_by_upload[upload.id]
             result.append({
-                'upload_id': upload.id,
-                'source': upload.source.name,
-                'filename': upload.filename,
-                'headers': upload.headers,
-                'row_count': upload.row_count,
-                'uploaded_at': upload.uploaded_at,
+                **readers.serialize_upload(upload),
                 'rows': rows
             })
         
@@ -186,103 +310,264 @@ def get_csv_data(request):
         
     except CSVDataSource.DoesNotExist:
         return Response({'error': 'Data source not found'}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['POST'])
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@csrf_exempt
-def train_ml_model(request):
-    """Train an ML model with stored CSV data"""
+def query_csv_data(request):
+    """
+    Filter, project and sort stored CSV rows server-side.
+    
+    Query params:
+        source: Restrict to one data source
+        where: Filter ``<key>:<op>:<value>`` (repeatable, all must match);
+            ops are eq, ne, gt, gte, lt, lte and in (comma-separated values)
+        fields: Comma-separated keys to return instead of the whole row
+        order_by: Comma-separated keys, ``-`` prefix for descending
+        limit, offset: Page of results; pass the returned ``next_offset`` for the next page
+    
+    Columnar uploads are not searched; their ids are listed in ``skipped_uploads``.
+    """
+    try:
+        uploads = CSVUpload.objects.all()
+        source_name = request.GET.get('source')
+        if source_name:
+            data_source = CSVDataSource.objects.get(name=source_name)
+            uploads = uploads.filter(source=data_source)
+        
+        filters = [queries.parse_filter(token) for token in request.GET.getlist('where')]
+        order = queries.parse_order(request.GET.get('order_by', ''))
+        fields = queries.parse_fields(request.GET['fields']) if request.GET.get('fields') else None
+        
+        limit = int(request.GET.get('limit', settings.CSV_DATA_PAGE_SIZE))
+        offset = int(request.GET.get('offset', 0))
+        max_limit = settings.CSV_DATA_MAX_PAGE_SIZE
+        if not 1 <= limit <= max_limit:
+            return Response({'error': f'limit must be between 1 and {max_limit}'}, status=status.HTTP_400_BAD_REQUEST)
+        if offset < 0:
+            return Response({'error': 'offset must not be negative'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with timed('query'):
+            result = queries.run_query(uploads, filters, order, fields, limit=limit, offset=offset)
+        
+        return Response(result, status=status.HTTP_200_OK)
+        
+    except CSVDataSource.DoesNotExist:
+        return Response({'error': 'Data source not found'}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _sampling_options(data):
+    """``row_limit`` and ``sample_fraction`` of a training request. Raises ValueError if invalid."""
+    row_limit = data.get('row_limit')
+    sample_fraction = data.get('sample_fraction')
+    if row_limit is not None:
+        row_limit = int(row_limit)
+        if row_limit < 1:
+            raise ValueError('row_limit must be at least 1')
+    if sample_fraction is not None:
+        sample_fraction = float(sample_fraction)
+        if not 0 < sample_fraction <= 1:
+            raise ValueError('sample_fraction must be greater than 0 and at most 1')
+    return {'row_limit': row_limit, 'sample_fraction': sample_fraction}
+
+def _serialize_training_job(training_session):
+    return {
+        'training_session_id': training_session.id,
+        'model_id': training_session.model_id,
+        'status': training_session.status,
+        'progress': training_session.progress,
+        'deduplicate_rows': training_session.deduplicate_rows,
+        'row_limit': training_session.row_limit,
+        'sample_fraction': training_session.sample_fraction,
+        'metrics': training_session.metrics,
+        'error': training_session.error,
+        'started_at': training_session.started_at,
+        'completed_at': training_session.completed_at
+    }
+
+def _queue_training(request):
+    """Queue an ML model training run in the background executor; poll /api/ml/jobs/<id>/ for it"""
+    from . import jobs
+    from .ml_models import get_available_models
+    from .training import create_training_session
+    
     try:
         data = request.data
         model_type = data.get('model_type')
         model_name = data.get('model_name', f'{model_type}_model')
         config = data.get('config', {})
         data_sources = data.get('data_sources', [])
+        deduplicate_rows = bool(data.get('deduplicate_rows', False))
         
         if not model_type:
             return Response({'error': 'model_type is required'}, status=status.HTTP_400_BAD_REQUEST)
         
+        try:
+            sampling = _sampling_options(data)
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
         if model_type not in get_available_models():
             return Response({
                 'error': f'Invalid model type. Available types: {get_available_models()}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create ML model record
-        ml_model = MLModel.objects.create(
-            name=model_name,
-            model_type=model_type,
-            configuration=config,
-            description=f'ML model for {model_type}'
-        )
-        
-        # Create training session
-        training_session = MLTrainingSession.objects.create(
-            model=ml_model,
-            status='training'
+        training_session = jobs.enqueue_training(
+            lambda: create_training_session(model_type, model_name, config, data_sources,
+                                            deduplicate_rows=deduplicate_rows, **sampling)
         )
+        if training_session is None:
+            return Response({'error': 'Too many training jobs queued, try again later'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
         
-        # Add data sources to training session
-        for source_name in data_sources:
-            try:
-                data_source = CSVDataSource.objects.get(name=source_name)
-                training_session.data_sources.add(data_source)
-            except CSVDataSource.DoesNotExist:
-                continue
-        
-        # Prepare training data
-        training_data = []
-        for data_source in training_session.data_sources.all():
-            uploads = CSVUpload.objects.filter(source=data_source)
-            for upload in uploads:
-                rows = upload.data_rows.all()
-                for row in rows:
-                    training_data.append(row.row_data)
-        
-        if not training_data:
-            training_session.status = 'failed'
-            training_session.save()
-            return Response({'error': 'No training data found'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create and train the model
-        model_instance = create_model(model_type, config)
-        df = pd.DataFrame(training_data)
+        return Response({
+            'success': True,
+            'message': 'Training job queued',
+            **_serialize_training_job(training_session)
+        }, status=status.HTTP_202_ACCEPTED)
         
-        # Train the model
-        metrics = model_instance.train(df)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def train_ml_model(request):
+    """Train an ML model with stored CSV data, queued like /api/ml/jobs/ (202 with the session to poll)"""
+    return _queue_training(request)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def enqueue_training_job(request):
+    """Queue an ML model training run in the background executor"""
+    return _queue_training(request)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_training_job(request, session_id):
+    """Poll the status and progress of a training job"""
+    try:
+        training_session = MLTrainingSession.objects.get(id=session_id)
+        return Response(_serialize_training_job(training_session), status=status.HTTP_200_OK)
         
-        # Update training session
-        training_session.status = 'completed'
-        training_session.metrics = metrics
-        training_session.completed_at = timezone.now()
-        training_session.save()
+    except MLTrainingSession.DoesNotExist:
+        return Response({'error': 'Training job not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def cancel_training_job(request, session_id):
+    """Cancel a queued or running training job"""
+    from . import jobs
+    
+    try:
+        training_session = MLTrainingSession.objects.get(id=session_id)
         
-        # Mark model as active if training successful
-        ml_model.is_active = True
-        ml_model.save()
+        if not jobs.cancel_training(training_session):
+            return Response({
+                'error': f'Training job already {training_session.status}'
+            }, status=status.HTTP_409_CONFLICT)
         
+        training_session.refresh_from_db()
         return Response({
             'success': True,
-            'message': 'Model trained successfully',
-            'model_id': ml_model.id,
-            'training_session_id': training_session.id,
-            'metrics': metrics
-        }, status=status.HTTP_201_CREATED)
+            'message': 'Training job cancelled',
+            **_serialize_training_job(training_session)
+        }, status=status.HTTP_200_OK)
         
+    except MLTrainingSession.DoesNotExist:
+        return Response({'error': 'Training job not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        # Update training session to failed if it exists
-        if 'training_session' in locals():
-            training_session.status = 'failed'
-            training_session.save()
-        
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _load_model_instance(ml_model):
+    """Build a ready-to-predict model instance from an MLModel record"""
+    import pandas as pd
+    from . import columnar
+    from . import artifacts
+    from .ml_models import create_model, load_model
+    
+    if ml_model.model_state.get('is_trained'):
+        return load_model(ml_model.model_type, ml_model.model_state, artifacts.load_artifacts(ml_model.artifact_path))
+    
+    # Models trained before their state was persisted: retrain on a data sample
+    model_instance = create_model(ml_model.model_type, ml_model.configuration)
+    
+    training_data = []
+    latest_session = ml_model.training_sessions.filter(status='completed').first()
+    if latest_session:
+        for data_source in latest_session.data_sources.all():
+            uploads = CSVUpload.objects.filter(source=data_source)
+            for upload in uploads:
+                if upload.storage_format == CSVUpload.STORAGE_COLUMNAR:
+                    training_data.extend(columnar.frame_to_records(columnar.load_upload_frame(upload).head(10)))
+                    continue
+                rows = upload.data_rows.all()[:10]  # Just get some sample data
+                for row in rows:
+                    training_data.append(row.row_data)
+    
+    if training_data:
+        with timed('pandas'):
+            df_train = pd.DataFrame(training_data)
+        with timed('model'):
+            model_instance.train(df_train)  # Quick training for demo
+    
+    return model_instance
+
+def _predict_payload(ml_model, model_instance, input_data, fleet=None):
+    """
+    Score ``input_data``, or the live ``fleet`` snapshot (``feature_store.FleetSnapshot``),
+    with a loaded model (CPU-bound) and build the response body
+    """
+    import pandas as pd
+    
+    if fleet is not None:
+        df_input = fleet
+    else:
+        with timed('pandas'):
+            df_input = pd.DataFrame(input_data)
+    with timed('model'):
+        predictions = model_instance.predict(df_input)
+        feature_importance = model_instance.get_feature_importance()
+    
+    response_data = {
+        'success': True,
+        **({'train_ids': fleet.train_ids.tolist()} if fleet is not None else {}),
+        'predictions': predictions.tolist(),
+        'feature_importance': feature_importance,
+        'model_info': {
+            'name': ml_model.name,
+            'type': ml_model.model_type,
+            'is_active': ml_model.is_active
+        }
+    }
+    
+    # Per-day risk matrix (trains x days) for horizon-based models
+    if hasattr(model_instance, 'predict_horizon'):
+        with timed('model'):
+            forecast = model_instance.predict_horizon(df_input)
+        response_data['forecast'] = {key: value.tolist() for key, value in forecast.items()}
+    
+    return response_data
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @csrf_exempt
 def predict_with_model(request):
-    """Make predictions using a trained ML model"""
+    """
+    Make predictions using a trained ML model, for the rows in ``input_data``
+    or, with ``fleet: true``, for every train in the Train table
+    """
+    from .feature_store import get_fleet
+    
     try:
         data = request.data
         model_id = data.get('model_id')
@@ -297,69 +582,252 @@ def predict_with_model(request):
         if not ml_model.is_active:
             return Response({'error': 'Model is not active'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create model instance
-        model_instance = create_model(ml_model.model_type, ml_model.configuration)
-        
-        # For this demo, we'll simulate training by getting some data
-        # In a real implementation, you'd load the trained model state
-        training_data = []
-        latest_session = ml_model.training_sessions.filter(status='completed').first()
-        if latest_session:
-            for data_source in latest_session.data_sources.all():
-                uploads = CSVUpload.objects.filter(source=data_source)
-                for upload in uploads:
-                    rows = upload.data_rows.all()[:10]  # Just get some sample data
-                    for row in rows:
-                        training_data.append(row.row_data)
-        
-        if training_data:
-            df_train = pd.DataFrame(training_data)
-            model_instance.train(df_train)  # Quick training for demo
-        
-        # Make predictions
-        df_input = pd.DataFrame(input_data)
-        predictions = model_instance.predict(df_input)
-        feature_importance = model_instance.get_feature_importance()
+        # Reuse the loaded instance until the model is retrained or edited
+        model_instance = model_cache.get_or_load(ml_model, _load_model_instance)
+        fleet = get_fleet() if data.get('fleet') else None
         
-        return Response({
-            'success': True,
-            'predictions': predictions.tolist(),
-            'feature_importance': feature_importance,
-            'model_info': {
-                'name': ml_model.name,
-                'type': ml_model.model_type,
-                'is_active': ml_model.is_active
-            }
-        }, status=status.HTTP_200_OK)
+        return Response(_predict_payload(ml_model, model_instance, input_data, fleet), status=status.HTTP_200_OK)
         
     except MLModel.DoesNotExist:
         return Response({'error': 'Model not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _ml_models_query(params):
+    """
+    One page of the ML model listing as a single annotated query (``limit + 1``
+    rows, to detect a next page). Raises ValueError on invalid parameters.
+    """
+    limit = int(params.get('limit', settings.ML_MODELS_PAGE_SIZE))
+    max_limit = settings.ML_MODELS_MAX_PAGE_SIZE
+    if not 1 <= limit <= max_limit:
+        raise ValueError(f'limit must be between 1 and {max_limit}')
+    
+    # Metrics of each model's newest completed session, in the same query
+    latest_metrics = (
+        MLTrainingSession.objects
+        .filter(model=OuterRef('pk'), status='completed')
+        .order_by('-completed_at', '-id')
+        .values('metrics')[:1]
+    )
+    models = (
+        MLModel.objects
+        .annotate(latest_training=Subquery(latest_metrics, output_field=JSONField()))
+        .order_by('-id')
+    )
+    
+    if params.get('model_type'):
+        models = models.filter(model_type=params['model_type'])
+    is_active = params.get('is_active')
+    if is_active is not None:
+        models = models.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+    cursor = params.get('cursor')
+    if cursor:
+        if not cursor.isdigit():
+            raise ValueError(f'Invalid cursor: {cursor}')
+        models = models.filter(id__lt=int(cursor))
+    
+    return models.values('id', 'name', 'model_type', 'is_active', 'created_at', 'latest_training')[:limit + 1], limit
+
+def _ml_models_page(page, limit):
+    from .ml_models import get_available_models
+    
+    next_cursor = str(page[limit - 1]['id']) if len(page) > limit else None
+    return {
+        'models': page[:limit],
+        'next_cursor': next_cursor,
+        'available_types': get_available_models()
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response('ml_models')
 def get_ml_models(request):
-    """Get list of available ML models"""
+    """
+    Get list of available ML models, newest first.
+    
+    Query params:
+        model_type: Only models of this type
+        is_active: Only active (true) or inactive (false) models
+        limit, cursor: Page size, and the ``next_cursor`` of the previous page
+    """
     try:
-        models = MLModel.objects.all()
-        result = []
+        models, limit = _ml_models_query(request.GET)
+        page = list(models)
+        return Response(_ml_models_page(page, limit), status=status.HTTP_200_OK)
         
-        for model in models:
-            latest_session = model.training_sessions.filter(status='completed').first()
-            result.append({
-                'id': model.id,
-                'name': model.name,
-                'model_type': model.model_type,
-                'is_active': model.is_active,
-                'created_at': model.created_at,
-                'latest_training': latest_session.metrics if latest_session else None
-            })
-        
-        return Response({
-            'models': result,
-            'available_types': get_available_models()
-        }, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def plan_induction(request):
+    """
+    Assign the current fleet to service / standby / IBL for the next induction,
+    and record the run in the fleet state history
+    """
+    from .feature_store import get_fleet
+    from .history import record_states
+    from .induction import InductionTargets, solve_induction_plan
+    
+    try:
+        data = request.data
+        if data.get('service') is None:
+            return Response({'error': 'service is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cleaning_capacity = data.get('cleaning_capacity')
+            targets = InductionTargets(
+                service=int(data['service']),
+                standby=int(data.get('standby', 0)),
+                cleaning_capacity=None if cleaning_capacity is None else int(cleaning_capacity),
+                weights=data.get('weights'),
+                branding_weight=float(data.get('branding_weight', InductionTargets.branding_weight)),
+                mileage_relief_weight=float(data.get('mileage_relief_weight', InductionTargets.mileage_relief_weight))
+            )
+            targets.validate()
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with timed('pandas'):
+            fleet = get_fleet().to_frame()
+        with timed('model'):
+            plan = solve_induction_plan(fleet, targets)
+        record_states(fleet.to_dict('records'), TrainState.SOURCE_INDUCTION,
+                      {item['train_id']: item['assignment'] for item in plan['assignments']})
+
+        return Response({'success': True, **plan}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def simulate_scenarios(request):
+    """Score and rank the fleet under many what-if scenarios in one call"""
+    import pandas as pd
+    from .feature_store import get_fleet
+    from .scenarios import evaluate_scenarios, parse_scenarios
+    
+    try:
+        data = request.data
+        try:
+            scenarios = parse_scenarios(data.get('scenarios', []))
+            top = data.get('top')
+            top = None if top is None else int(top)
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not scenarios:
+            return Response({'error': 'scenarios is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(scenarios) > settings.SCENARIO_MAX_COUNT:
+            return Response({'error': f'At most {settings.SCENARIO_MAX_COUNT} scenarios per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Score the given fleet, or the Train table's snapshot
+        with timed('pandas'):
+            fleet = pd.DataFrame(data['fleet']) if data.get('fleet') else get_fleet()
+        if 'train_id' not in fleet.columns:
+            return Response({'error': 'fleet rows need a train_id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with timed('model'):
+            try:
+                result = evaluate_scenarios(fleet, scenarios, top=top)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'success': True, **result}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _history_params(params):
+    """
+    Range, interval and filters of a history query. Raises ValueError on
+    invalid parameters.
+    """
+    end = date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+    start = (date.fromisoformat(params['start']) if params.get('start')
+             else end - timedelta(days=settings.HISTORY_DEFAULT_DAYS - 1))
+    if start > end:
+        raise ValueError('start must not be after end')
+    if (end - start).days >= settings.HISTORY_MAX_DAYS:
+        raise ValueError(f'At most {settings.HISTORY_MAX_DAYS} days per request')
+    
+    interval = params.get('interval', 'day')
+    if interval not in ('raw', 'day', 'week'):
+        raise ValueError(f'Unknown interval: {interval}')
+    
+    limit = int(params.get('limit', settings.HISTORY_PAGE_SIZE))
+    max_limit = settings.HISTORY_MAX_PAGE_SIZE
+    if not 1 <= limit <= max_limit:
+        raise ValueError(f'limit must be between 1 and {max_limit}')
+    cursor = params.get('cursor')
+    if cursor and not cursor.isdigit():
+        raise ValueError(f'Invalid cursor: {cursor}')
+    
+    return {
+        'start': start, 'end': end, 'interval': interval, 'train_id': params.get('train_id') or None,
+        'limit': limit, 'cursor': int(cursor) if cursor else None
+    }
+
+def _history_variant(request):
+    # Without an end date the range ends today, so a new day is a new response
+    return '' if request.GET.get('end') else timezone.localdate().isoformat()
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_response('history', variant=_history_variant)
+def get_fleet_history(request):
+    """
+    State history of one train (``train_id``) or the whole fleet between
+    ``start`` and ``end`` (ISO dates, inclusive; default: the last
+    ``HISTORY_DEFAULT_DAYS`` days).
+    
+    ``interval=day`` (default) or ``week`` returns downsampled buckets;
+    ``interval=raw`` returns the recorded states, a page at a time
+    (``limit`` / ``cursor``).
+    """
+    from .history import raw_states, state_history
+    
+    try:
+        params = _history_params(request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        query = {
+            'train_id': params['train_id'], 'start': params['start'].isoformat(),
+            'end': params['end'].isoformat(), 'interval': params['interval']
+        }
+        if params['interval'] == 'raw':
+            states, next_cursor = raw_states(params['start'], params['end'], params['train_id'],
+                                             params['cursor'], params['limit'])
+            return Response({**query, 'states': states, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+        
+        series = state_history(params['start'], params['end'], params['interval'], params['train_id'])
+        return Response({**query, 'series': series}, status=status.HTTP_200_OK)
         
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_metrics(request):
+    """Expose per-view performance metrics in Prometheus text format"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorized = (
+        (token and request.headers.get('Authorization') == f'Bearer {token}') or
+        request.user.is_authenticated
+    )
+    if not authorized:
+        return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    return HttpResponse(
+        metrics_registry.render(getattr(settings, 'PERF_METRICS_SAMPLE_RATE', 1.0)),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
\ No newline at end of file
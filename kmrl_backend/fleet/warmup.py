@@ -0,0 +1,55 @@
+"""
+Optional preloading of the lazily imported ML stack.
+
+NumPy, pandas, SciPy, scikit-learn and the fleet modules built on them are
+imported on first use (see ``fleet.views``), so management commands and
+worker start-up stay fast. With ``ML_PRELOAD = True`` the WSGI/ASGI entry
+points import them up front instead. Under gunicorn, ``gunicorn.conf.py`` then also preloads the
+application in the master, so the stack is imported once before forking and
+the workers share those pages copy-on-write.
+"""
+
+import importlib
+import time
+from typing import Dict, Iterable
+
+from django.conf import settings
+
+ML_MODULES = (
+    'numpy',
+    'pandas',
+    'scipy.optimize',
+    'sklearn.ensemble',
+    'fleet.ml_models',
+    'fleet.forest',
+    'fleet.artifacts',
+    'fleet.columnar',
+    'fleet.training',
+    'fleet.jobs',
+    'fleet.induction',
+    'fleet.scenarios',
+    'fleet.feature_store',
+    'fleet.history',
+)
+
+
+def warm_up(modules: Iterable[str] = None) -> Dict[str, float]:
+    """
+    Import the ML stack and the URLconf (Django must be set up).
+
+    Returns:
+        Seconds spent importing each module (0 for modules already loaded)
+    """
+    timings = {}
+    for name in (*(modules or ML_MODULES), settings.ROOT_URLCONF):
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_up_if_enabled() -> bool:
+    if not getattr(settings, 'ML_PRELOAD', False):
+        return False
+    warm_up()
+    return True
@@ -0,0 +1,11 @@
+"""
+Gunicorn configuration, read from the working directory (see procfile).
+
+With ML_PRELOAD=true the application is loaded in the master before forking,
+and with it the ML stack (see fleet.warmup): workers share those pages
+copy-on-write and start serving ML requests without importing anything.
+"""
+
+import os
+
+preload_app = os.getenv('ML_PRELOAD', 'False').lower() == 'true'
@@ -2,6 +2,9 @@
 ASGI config for kmrl_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with ``uvicorn kmrl_backend.asgi:application --workers N`` (or
+gunicorn with ``-k uvicorn.workers.UvicornWorker``) to run the async API
+views in ``fleet.async_views`` natively, with ``DB_CONN_MAX_AGE=0``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kmrl_backend.settings')
 
 application = get_asgi_application()
+
+# ML_PRELOAD: import the ML stack now rather than on first use (see fleet.warmup)
+from fleet.warmup import warm_up_if_enabled  # noqa: E402
+
+warm_up_if_enabled()
@@ -49,9 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'fleet.middleware.PerformanceMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'fleet.middleware.StaticFilesMiddleware',  # WhiteNoise, ASGI-capable
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -88,7 +89,8 @@ SUPABASE_DATABASE_URL = os.getenv('SUPABASE_DATABASE_URL')
 if SUPABASE_DATABASE_URL:
     # Always use Supabase database for all environments
     DATABASES = {
-    'default': dj_database_url.config(conn_max_age=600, ssl_require=False)
+    # Set DB_CONN_MAX_AGE=0 under uvicorn: async requests run their queries on short-lived threads
+    'default': dj_database_url.config(conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '600')), ssl_require=False)
 }
     # Supabase always requires SSL
     DATABASES['default']['OPTIONS'] = {
@@ -145,6 +147,25 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# CSV ingestion
+# Rows are written in batches inside one transaction per upload.
+# CSV_INGEST_METHOD: 'auto' (COPY on PostgreSQL, bulk_create elsewhere), 'bulk' or 'copy'
+CSV_INGEST_BATCH_SIZE = int(os.getenv('CSV_INGEST_BATCH_SIZE', '1000'))
+CSV_INGEST_METHOD = os.getenv('CSV_INGEST_METHOD', 'auto')
+
+# CSV_STORAGE_FORMAT: 'rows' (one CSVDataRow per line) or 'columnar' (typed .npy column files)
+CSV_STORAGE_FORMAT = os.getenv('CSV_STORAGE_FORMAT', 'rows')
+CSV_COLUMNAR_STORAGE_DIR = Path(os.getenv('CSV_COLUMNAR_STORAGE_DIR', BASE_DIR / 'columnar_data'))
+
+# CSV data reads (get_csv_data pagination and streaming)
+CSV_DATA_PAGE_SIZE = int(os.getenv('CSV_DATA_PAGE_SIZE', '1000'))
+CSV_DATA_MAX_PAGE_SIZE = int(os.getenv('CSV_DATA_MAX_PAGE_SIZE', '10000'))
+CSV_DATA_CHUNK_SIZE = int(os.getenv('CSV_DATA_CHUNK_SIZE', '2000'))
+
+# ML model listing (get_ml_models cursor pagination)
+ML_MODELS_PAGE_SIZE = int(os.getenv('ML_MODELS_PAGE_SIZE', '100'))
+ML_MODELS_MAX_PAGE_SIZE = int(os.getenv('ML_MODELS_MAX_PAGE_SIZE', '1000'))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -182,3 +203,57 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Per-process cache of loaded ML model instances (see fleet.model_cache)
+ML_MODEL_CACHE_SIZE = int(os.getenv('ML_MODEL_CACHE_SIZE', '32'))
+ML_MODEL_CACHE_TTL = int(os.getenv('ML_MODEL_CACHE_TTL', '3600'))  # seconds
+
+# Training data is read from CSVDataRow in chunks of this many rows (see fleet.training)
+ML_TRAINING_CHUNK_SIZE = int(os.getenv('ML_TRAINING_CHUNK_SIZE', '10000'))
+
+# Fitted model artifacts (forest nodes as memory-mapped .npy files), one version per training session (see fleet.artifacts)
+ML_ARTIFACT_DIR = Path(os.getenv('ML_ARTIFACT_DIR', BASE_DIR / 'model_artifacts'))
+
+# Background ML training jobs (see fleet.jobs)
+# ML_TRAINING_EXECUTOR: 'process' (spawned worker processes) or 'thread'
+ML_TRAINING_EXECUTOR = os.getenv('ML_TRAINING_EXECUTOR', 'process')
+ML_TRAINING_MAX_WORKERS = int(os.getenv('ML_TRAINING_MAX_WORKERS', '1'))  # per API worker process
+ML_TRAINING_MAX_PENDING = int(os.getenv('ML_TRAINING_MAX_PENDING', '4'))  # across all API workers
+# Queued and running sessions refresh heartbeat_at this often; ones silent for ML_TRAINING_STALE_SECONDS are marked failed
+ML_TRAINING_HEARTBEAT_SECONDS = int(os.getenv('ML_TRAINING_HEARTBEAT_SECONDS', '30'))
+ML_TRAINING_STALE_SECONDS = int(os.getenv('ML_TRAINING_STALE_SECONDS', '300'))
+
+# Request performance metrics (see fleet.middleware / fleet.metrics)
+# PERF_METRICS_SAMPLE_RATE: fraction of requests measured (0 disables, 1 measures all)
+# PERF_SERVER_TIMING: add Server-Timing to every measured response (otherwise only on X-Server-Timing: 1)
+# METRICS_TOKEN: bearer token accepted by /api/metrics/ for scrapers without a session
+PERF_METRICS_SAMPLE_RATE = float(os.getenv('PERF_METRICS_SAMPLE_RATE', '1.0'))
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', 'False').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Start-up: the ML stack is imported on first use unless ML_PRELOAD is set (see fleet.warmup)
+ML_PRELOAD = os.getenv('ML_PRELOAD', 'False').lower() == 'true'
+
+# Async API views under ASGI (see fleet.async_views)
+ASYNC_SCORING_WORKERS = int(os.getenv('ASYNC_SCORING_WORKERS', '4'))  # model scoring threads per worker process
+
+# Batch what-if scenario evaluation (see fleet.scenarios)
+SCENARIO_MAX_COUNT = int(os.getenv('SCENARIO_MAX_COUNT', '1000'))  # scenarios per request
+
+# Fleet state history queries (see fleet.history)
+HISTORY_DEFAULT_DAYS = int(os.getenv('HISTORY_DEFAULT_DAYS', '30'))  # range when no start is given
+HISTORY_MAX_DAYS = int(os.getenv('HISTORY_MAX_DAYS', '1096'))  # longest range per request
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '1000'))  # raw states per page
+HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', '10000'))
+
+# Conditional-GET response cache for polled listings (see fleet.response_cache).
+# Shared by all worker processes on a host by default; point it at Redis/Memcached for several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', str(BASE_DIR / 'response_cache')),
+    },
+}
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))  # seconds a rendered payload is kept
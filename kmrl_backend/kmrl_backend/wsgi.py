@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kmrl_backend.settings')
 
 application = get_wsgi_application()
+
+# ML_PRELOAD: import the ML stack now rather than on first use (see fleet.warmup)
+from fleet.warmup import warm_up_if_enabled  # noqa: E402
+
+warm_up_if_enabled()